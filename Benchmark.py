@@ -0,0 +1,57 @@
+"""
+Endpoint for comparing compile strategies of regexes.
+
+Print compile time, peak memory and DFA size of every preloaded regex and of
+larger synthetic patterns, compiled as a whole and bottom-up, and optionally
+the time of compiling all of them as a registry with given numbers of processes.
+With --search, print the time of finding all matches in generated texts instead:
+    python Benchmark.py [--size size] [--preloaded | --synthetic] [--jobs jobs [jobs ...]]
+    python Benchmark.py --search megabytes
+"""
+import argparse
+import misc.benchmark as bm
+
+PARSER = argparse.ArgumentParser(description='Benchmarks compile strategies of regexes.')
+PARSER.add_argument('--size', type=int, default=8, help='Number of repeated parts of synthetic patterns.')
+PARSER.add_argument('--preloaded', help='Only benchmark preloaded regexes.', action='store_true')
+PARSER.add_argument('--synthetic', help='Only benchmark synthetic patterns.', action='store_true')
+PARSER.add_argument('--jobs', type=int, nargs='+', default=[],
+                    help='Also time warming up a registry of the patterns with each number of processes.')
+PARSER.add_argument('--search', type=float, metavar='megabytes',
+                    help='Benchmark searching generated texts of this size instead of compiling.')
+
+def main(args):
+    """
+    Runs the benchmarks and prints a table of results with totals per strategy.
+
+    :param args: parsed command line arguments
+    :return:
+    """
+    if args.search is not None:
+        size = int(args.search * 2 ** 20)
+        print('{:<14}{:>10}{:>12}{:>10}'.format('pattern', 'matches', 'time (ms)', 'MiB/s'))
+        for name, seconds, matches in bm.search(bm.searches(size)):
+            print('{:<14}{:>10}{:>12.2f}{:>10.2f}'.format(name, matches, seconds * 1000, size / 2 ** 20 / seconds))
+        return
+    patterns = dict()
+    if not args.synthetic:
+        patterns.update(bm.preloaded())
+    if not args.preloaded:
+        patterns.update(bm.synthetic(args.size))
+    totals = dict()
+    print('{:<14}{:<11}{:>12}{:>14}{:>8}'.format('pattern', 'strategy', 'time (ms)', 'peak (KiB)', 'states'))
+    for name, label, seconds, peak, states in bm.run(patterns):
+        print('{:<14}{:<11}{:>12.2f}{:>14.1f}{:>8}'.format(name, label, seconds * 1000, peak / 1024, states))
+        total = totals.setdefault(label, [0, 0])
+        total[0] += seconds
+        total[1] = max(total[1], peak)
+    for label, (seconds, peak) in totals.items():
+        print('{:<14}{:<11}{:>12.2f}{:>14.1f}'.format('TOTAL', label, seconds * 1000, peak / 1024))
+    if args.jobs:
+        print()
+        print('{:<14}{:<11}{:>12}'.format('registry', 'jobs', 'time (ms)'))
+        for jobs in args.jobs:
+            print('{:<14}{:<11}{:>12.2f}'.format('warm up', jobs, bm.warm_up(patterns, jobs) * 1000))
+
+if __name__ == '__main__':
+    main(PARSER.parse_args())
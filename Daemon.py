@@ -0,0 +1,20 @@
+"""
+Endpoint for the matching daemon.
+
+Start a daemon:
+    python Daemon.py serve [socket path]
+Run SimEnka, SimPa, SimTS or MinDka on standard input through a running daemon:
+    python Daemon.py SimEnka [socket path] < input
+"""
+import sys
+import misc.daemon as dm
+import form.readers as rs
+
+COMMAND = sys.argv[1] if len(sys.argv) > 1 else 'serve'
+PATH = sys.argv[2] if len(sys.argv) > 2 else dm.DEFAULT_SOCKET
+
+if COMMAND == 'serve':
+    dm.Daemon(PATH).serve_forever()
+else:
+    with dm.Client(PATH) as CLIENT:
+        print(CLIENT.request(COMMAND, text=rs.Reader.read_input()))
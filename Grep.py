@@ -0,0 +1,68 @@
+"""
+Endpoint for searching files with a regex, using every core.
+
+Print matching lines, prefixed with file names when searching many files:
+    python Grep.py [-n] [-b] [-c | -l] [-j jobs] pattern file [file ...]
+
+The pattern uses the syntax of grammar.regular_expressions.RegEx and a line
+matches if any part of it matches. Exits with 0 if a line matched, 1 if none did
+and 2 if the pattern is invalid or a file couldn't be read; other files are
+still searched.
+"""
+import argparse
+import sys
+import misc.errors as err
+import misc.grep as gr
+
+PARSER = argparse.ArgumentParser(description='Searches files for lines matching a regex.')
+PARSER.add_argument('pattern', help='Regex in the syntax of this project.')
+PARSER.add_argument('files', nargs='+', help='Files to search.')
+PARSER.add_argument('-n', help='Print line numbers.', action='store_true')
+PARSER.add_argument('-b', help='Print byte offsets of lines.', action='store_true')
+MODES = PARSER.add_mutually_exclusive_group()
+MODES.add_argument('-c', help='Print the number of matching lines of every file.', action='store_true')
+MODES.add_argument('-l', help='Print only names of files with a matching line.', action='store_true')
+PARSER.add_argument('-j', type=int, help='Number of processes. All cores by default.')
+PARSER.add_argument('--chunk', type=int, default=gr.DEFAULT_CHUNK_SIZE,
+                    help='Minimum chunk size in bytes. The default is {}.'.format(gr.DEFAULT_CHUNK_SIZE))
+
+def main(args)->int:
+    """
+    Runs a search and prints its results.
+
+    :param args: parsed command line arguments
+    :return int: exit status
+    """
+    many = len(set(args.files)) > 1 # every file is searched once
+    found = False
+    failed = []
+    def report(path, error):
+        print('{}: {}: {}'.format(PARSER.prog, path, error.strerror), file=sys.stderr)
+        failed.append(path)
+    if args.c:
+        for path, lines in gr.count(args.pattern, args.files, args.j, args.chunk, report):
+            print('{}:{}'.format(path, lines) if many else lines)
+            found = found or lines > 0
+    elif args.l:
+        for path in gr.files(args.pattern, args.files, args.j, args.chunk, report):
+            print(path)
+            found = True
+    else:
+        for path, number, offset, line in gr.grep(args.pattern, args.files, args.j, args.chunk, report):
+            prefix = [path] if many else []
+            if args.n:
+                prefix.append(str(number))
+            if args.b:
+                prefix.append(str(offset))
+            print(':'.join(prefix + [line]))
+            found = True
+    if failed:
+        return 2
+    return 0 if found else 1
+
+if __name__ == '__main__':
+    try:
+        sys.exit(main(PARSER.parse_args()))
+    except err.RegexSyntaxError as error:
+        print(error, file=sys.stderr)
+        sys.exit(2)
@@ -1,4 +1,4 @@
 """
 Defines all automata types.
 """
-from . import dfa, fa, nfa, packs, pda, state, cast_api, turing
+from . import dfa, fa, nfa, packs, pda, state, cast_api, turing, tables, binary, lazy
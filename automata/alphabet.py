@@ -0,0 +1,101 @@
+"""
+Defines alphabet partitions.
+
+A partition maps characters to input symbols through sorted, disjoint code point
+intervals, so an automaton over wide character classes needs one input symbol per
+interval instead of one per character. A character is mapped by a binary search
+over interval starts, which costs O(log #intervals).
+"""
+import bisect
+
+MAX_CODE_POINT = 0x10FFFF
+
+def normalize(intervals)->list:
+    """
+    Sorts intervals and merges the overlapping and adjacent ones.
+
+    :param intervals: iterable of (first, last) code point pairs, both included
+    :return list: sorted, disjoint (first, last) pairs
+    """
+    result = []
+    for first, last in sorted(intervals):
+        if result and first <= result[-1][1] + 1:
+            if last > result[-1][1]:
+                result[-1] = (result[-1][0], last)
+        else:
+            result.append((first, last))
+    return result
+
+class Partition:
+    """
+    Maps characters to input symbols through sorted, disjoint code point intervals.
+    Interval i covers code points from starts[i] up to starts[i + 1] (excluded);
+    the last interval reaches the end of Unicode.
+    """
+
+    def __init__(self, starts: list, symbols: list):
+        """
+        Initialises a partition. Neighbouring intervals with the same symbol are merged.
+
+        :param list starts: sorted code points where intervals start
+        :param list symbols: input symbol of each interval, None for characters outside the alphabet
+        """
+        assert len(starts) == len(symbols)
+        self.starts = []
+        self.symbols = []
+        for start, symbol in zip(starts, symbols):
+            if not self.symbols or self.symbols[-1] != symbol:
+                self.starts.append(start)
+                self.symbols.append(symbol)
+
+    def merge(self, representatives: dict):
+        """
+        Creates a partition in which symbols are replaced by their representatives.
+
+        :param dict representatives: symbol -> symbol that replaces it
+        :return Partition: new partition
+        """
+        return Partition(self.starts, [representatives.get(symbol, symbol) for symbol in self.symbols])
+
+    def symbol(self, char):
+        """
+        Returns an input symbol of a character.
+
+        :param str char: a single character
+        :return: input symbol or None if the character is outside the alphabet
+        """
+        if not isinstance(char, str) or len(char) != 1:
+            return None
+        index = bisect.bisect_right(self.starts, ord(char)) - 1
+        return self.symbols[index] if index >= 0 else None
+
+    def intervals(self)->list:
+        """
+        Returns all intervals inside the alphabet.
+
+        :return list: (first, last, symbol) tuples, first and last are code points
+        """
+        ends = self.starts[1:] + [MAX_CODE_POINT + 1]
+        return [(start, end - 1, symbol) for start, end, symbol in zip(self.starts, ends, self.symbols)
+                if symbol is not None]
+
+    def to_list(self)->list:
+        """
+        :return list: JSON-serializable [start, symbol] pairs
+        """
+        return [[start, symbol] for start, symbol in zip(self.starts, self.symbols)]
+
+    @staticmethod
+    def from_list(pairs: list):
+        """
+        :param list pairs: [start, symbol] pairs created by to_list
+        :return Partition: partition
+        """
+        return Partition([start for start, _ in pairs], [symbol for _, symbol in pairs])
+
+    def __eq__(self, other):
+        return isinstance(other, Partition) and \
+            self.starts == other.starts and self.symbols == other.symbols
+
+    def __repr__(self):
+        return 'Partition({!r})'.format(self.to_list())
@@ -0,0 +1,465 @@
+"""
+Defines a compact, versioned binary format for finite automata.
+
+Layout (little-endian, every section aligned to 4 bytes):
+    header          magic, version, kind, state count, symbol count, start state, target count,
+                    size of the string blob, interval count
+    strings         epsilon, sorted alphabet and sorted state names (lengths + UTF-8 blob)
+    accepting       bitmap, one bit per state
+    partition       DFA alphabet partition (see automata.alphabet): uint32 interval starts
+                    and int32 symbol indexes (-1 outside the alphabet), empty if there is none
+    transitions     DFA: dense int32 table [state * symbols + symbol] -> state or -1
+                    NFA: uint32 offsets [state * symbols + symbol] and uint32 targets (CSR)
+
+States and symbols are referenced by their index in the sorted order, so the
+transition arrays can be used directly without creating any State objects.
+Every section is found in O(1) from the header, so a
+memory-mapped artifact (see MappedDFA) is usable without reading it.
+"""
+import array
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import automata.alphabet as ab
+import automata.dfa as dfa
+import automata.nfa as nfa
+import automata.state as st
+import automata.tables as tb
+
+MAGIC = b'LNGA'
+VERSION = 3
+
+DFA_KIND = 1
+NFA_KIND = 2
+EPSILON_NFA_KIND = 3
+
+HEADER = struct.Struct('<4sHBxIIIIII')
+LENGTH = struct.Struct('<I')
+
+def _kind(automaton)->int:
+    """
+    Returns a kind code of an automaton. Derived types (PDA, Turing machine) are not supported.
+
+    :param FA automaton: automaton
+    :return int: kind code
+    """
+    kinds = {dfa.DFA: DFA_KIND, nfa.NFA: NFA_KIND, nfa.EpsilonNFA: EPSILON_NFA_KIND}
+    if type(automaton) not in kinds:
+        raise TypeError('{} can not be stored in a binary format.'.format(type(automaton).__name__))
+    return kinds[type(automaton)]
+
+def _pad(data: bytearray):
+    """
+    Pads data with zeroes to a multiple of 4 bytes.
+
+    :param bytearray data: data to pad
+    :return:
+    """
+    data += b'\0' * (-len(data) % 4)
+
+def _array(typecode: str, items=())->array.array:
+    """
+    Creates a little-endian array.
+
+    :param str typecode: 'i' or 'I' (both 4 bytes)
+    :param items: initial items
+    :return array: array
+    """
+    result = array.array(typecode, items)
+    assert result.itemsize == 4
+    return result
+
+def _read_array(typecode: str, buffer)->array.array:
+    """
+    Reads a little-endian array out of a buffer.
+
+    :param str typecode: 'i' or 'I' (both 4 bytes)
+    :param buffer: buffer protocol object
+    :return array: array
+    """
+    result = _array(typecode)
+    result.frombytes(buffer)
+    return _little_endian(result)
+
+def _little_endian(data: array.array)->array.array:
+    """
+    Converts an array to or from little-endian byte order in place.
+
+    :param array data: array
+    :return array: the same array
+    """
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data
+
+class Layout:
+    """
+    Describes where all sections of a binary automaton are.
+    Used both by load and by views that work directly on the binary data.
+    State names and the accepting bitmap are decoded only when asked for.
+    """
+
+    def __init__(self, data):
+        """
+        Reads a header and the alphabet of a binary automaton.
+
+        :param data: buffer protocol object containing a binary automaton
+        """
+        self._data = data
+        with memoryview(data) as view:
+            self._read(view)
+
+    def _read(self, view: memoryview):
+        """
+        Reads a header and the alphabet.
+
+        :param memoryview view: binary automaton
+        :return:
+        """
+        if len(view) < HEADER.size:
+            raise ValueError('Binary automaton is truncated.')
+        magic, version, self.kind, self.state_count, self.symbol_count, \
+            start, self.target_count, strings_size, self.interval_count = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a binary automaton.')
+        if version != VERSION:
+            raise ValueError('Unsupported binary automaton version {}.'.format(version))
+        self.start = start
+
+        self.lengths_offset = HEADER.size
+        self.strings_offset = self.lengths_offset + 4 * (1 + self.symbol_count + self.state_count)
+        offset = self.strings_offset + strings_size
+        offset += -offset % 4
+
+        self.accepting_offset = offset
+        offset += (self.state_count + 7) // 8
+        offset += -offset % 4
+
+        self.partition_offset = offset
+        offset += 8 * self.interval_count
+
+        cells = self.state_count * self.symbol_count
+        if self.kind == DFA_KIND:
+            self.table_offset = offset
+            offset += 4 * cells
+        else:
+            self.offsets_offset = offset
+            offset += 4 * (cells + 1)
+            self.targets_offset = offset
+            offset += 4 * self.target_count
+        self.size = offset
+        if len(view) < self.size:
+            raise ValueError('Binary automaton is truncated.')
+
+        strings = self._strings(view, 0, 1 + self.symbol_count)
+        self.epsilon = strings[0]
+        self.symbols = strings[1:]
+
+    def _strings(self, view: memoryview, first: int, last: int)->list:
+        """
+        Decodes a range of strings.
+
+        :param memoryview view: binary automaton
+        :param int first: index of the first string (0 is epsilon)
+        :param int last: index after the last string
+        :return list: strings
+        """
+        lengths = _read_array('I', view[self.lengths_offset:self.lengths_offset + 4 * last])
+        offset = self.strings_offset + sum(lengths[:first])
+        strings = []
+        for length in lengths[first:]:
+            strings.append(str(view[offset:offset + length], 'utf-8'))
+            offset += length
+        return strings
+
+    @property
+    def names(self)->list:
+        """
+        :return list: state names in the sorted order
+        """
+        with memoryview(self._data) as view:
+            return self._strings(view, 1 + self.symbol_count, 1 + self.symbol_count + self.state_count)
+
+    @property
+    def partition(self):
+        """
+        :return Partition: alphabet partition or None if there is none
+        """
+        if not self.interval_count:
+            return None
+        with memoryview(self._data) as view:
+            offset = self.partition_offset
+            starts = _read_array('I', view[offset:offset + 4 * self.interval_count])
+            offset += 4 * self.interval_count
+            indexes = _read_array('i', view[offset:offset + 4 * self.interval_count])
+        return ab.Partition(starts, [self.symbols[index] if index >= 0 else None for index in indexes])
+
+    @property
+    def accepting(self)->list:
+        """
+        :return list: True for every accepting state
+        """
+        with memoryview(self._data) as view:
+            bitmap = _Bitmap(view[self.accepting_offset:self.accepting_offset + (self.state_count + 7) // 8])
+            return [bitmap[index] for index in range(self.state_count)]
+
+class _Bitmap:
+    """
+    Read-only bit indexing over a bitmap section.
+    """
+
+    def __init__(self, view: memoryview):
+        self.view = view
+
+    def __getitem__(self, index: int)->bool:
+        return bool(self.view[index >> 3] & (1 << (index & 7)))
+
+class MappedDFA(tb.TransitionTable):
+    """
+    A read-only DFA that runs directly over a memory-mapped binary artifact.
+
+    The transition table and the accepting bitmap are used in place; only the
+    alphabet and its partition are decoded, so opening doesn't depend on the
+    number of states and all processes mapping the same file share one copy
+    of the table in the page cache.
+    Unlike a TransitionTable, transitions into states that can never accept
+    are not marked DEAD, so rejection is found only at the end of the input.
+
+    The file must not be modified while it is mapped; artifacts written by
+    dump or CompileCache are replaced atomically, which is safe.
+    """
+
+    def __init__(self, path: str):
+        """
+        Maps a binary DFA file.
+
+        :param str path: file path
+        """
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.layout = Layout(self._map)
+            if self.layout.kind != DFA_KIND:
+                raise ValueError('Only a binary DFA can be mapped.')
+        except BaseException:
+            self._map.close()
+            raise
+
+        self.symbols = self.layout.symbols
+        self.columns = {symbol: column for column, symbol in enumerate(self.symbols)}
+        self.width = len(self.symbols)
+        self.start = self.layout.start
+
+        self._view = memoryview(self._map)
+        table = self._view[self.layout.table_offset:self.layout.size]
+        # the mapped table is little-endian, big-endian hosts have to use a converted copy.
+        self.table = table.cast('i') if sys.byteorder == 'little' else _read_array('i', table)
+        self.accepting = _Bitmap(self._view[self.layout.accepting_offset:self.layout.partition_offset])
+        self._set_alphabet(self.layout.partition)
+
+    @property
+    def names(self)->list:
+        """
+        :return list: state names in the sorted order, decoded on every call
+        """
+        return self.layout.names
+
+    @property
+    def size(self)->int:
+        """
+        :return int: number of states
+        """
+        return self.layout.state_count
+
+    def close(self):
+        """
+        Unmaps the file. The view can't be used afterwards.
+
+        :return:
+        """
+        if self._map.closed:
+            return
+        if isinstance(self.table, memoryview):
+            self.table.release()
+        self.accepting.view.release()
+        self._view.release()
+        self.layout = None
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def dumps(automaton)->bytes:
+    """
+    Serializes a DFA, NFA or epsilon NFA into the binary format.
+
+    :param FA automaton: automaton
+    :return bytes: binary automaton
+    """
+    kind = _kind(automaton)
+    symbols = sorted(automaton.inputs)
+    states = sorted(automaton.states.values())
+    columns = {symbol: column for column, symbol in enumerate(symbols)}
+    rows = {state.name: row for row, state in enumerate(states)}
+    epsilon = automaton.epsilon if kind == EPSILON_NFA_KIND else ''
+
+    strings = [string.encode() for string in [epsilon] + symbols + [str(state.name) for state in states]]
+
+    cells = len(states) * len(symbols)
+    if kind == DFA_KIND:
+        table = _array('i', [-1]) * cells
+        targets = ()
+        for row, state in enumerate(states):
+            for symbol, ends in state.transitions.items():
+                for end in ends:
+                    table[row * len(symbols) + columns[symbol]] = \
+                        rows[automaton._get_alias(end.name)]
+    else:
+        offsets = _array('I')
+        targets = _array('I')
+        for state in states:
+            for symbol in symbols:
+                offsets.append(len(targets))
+                targets.extend(sorted(rows[automaton._get_alias(end.name)]
+                                      for end in state.forward(symbol)))
+        offsets.append(len(targets))
+
+    partition = automaton.partition if kind == DFA_KIND else None
+    intervals = list(zip(partition.starts, partition.symbols)) if partition is not None else []
+
+    data = bytearray(HEADER.pack(MAGIC, VERSION, kind, len(states), len(symbols),
+                                 rows[automaton.start_state.name], len(targets),
+                                 sum(map(len, strings)), len(intervals)))
+    data += _little_endian(_array('I', map(len, strings))).tobytes()
+    data += b''.join(strings)
+    _pad(data)
+
+    bitmap = bytearray((len(states) + 7) // 8)
+    for row, state in enumerate(states):
+        if state.accepted:
+            bitmap[row >> 3] |= 1 << (row & 7)
+    data += bitmap
+    _pad(data)
+
+    data += _little_endian(_array('I', [start for start, _ in intervals])).tobytes()
+    data += _little_endian(_array('i', [-1 if symbol is None else columns[symbol]
+                                        for _, symbol in intervals])).tobytes()
+
+    if kind == DFA_KIND:
+        data += _little_endian(table).tobytes()
+    else:
+        data += _little_endian(offsets).tobytes()
+        data += _little_endian(targets).tobytes()
+    return bytes(data)
+
+def loads(data):
+    """
+    Deserializes an automaton from the binary format.
+
+    :param data: buffer protocol object containing a binary automaton
+    :return FA: DFA, NFA or epsilon NFA
+    """
+    layout = Layout(data)
+    view = memoryview(data)
+    epsilon = layout.epsilon or '$'
+    states = [st.State(name, int(accepted), epsilon)
+              for name, accepted in zip(layout.names, layout.accepting)]
+    symbols = layout.symbols
+    width = len(symbols)
+
+    if layout.kind == DFA_KIND:
+        table = _read_array('i', view[layout.table_offset:layout.table_offset + 4 * width * len(states)])
+        for row, state in enumerate(states):
+            transitions = state.transitions
+            for column, target in enumerate(table[row * width:(row + 1) * width]):
+                if target >= 0:
+                    transitions[symbols[column]] = {states[target]}
+    else:
+        offsets = _read_array('I', view[layout.offsets_offset:layout.targets_offset])
+        targets = _read_array('I', view[layout.targets_offset:layout.size])
+        for row, state in enumerate(states):
+            transitions = state.transitions
+            for column in range(width):
+                cell = row * width + column
+                if offsets[cell] != offsets[cell + 1]:
+                    transitions[symbols[column]] = {states[target] for target in
+                                                    targets[offsets[cell]:offsets[cell + 1]]}
+
+    named = {state.name: state for state in states}
+    start = states[layout.start]
+    if layout.kind == DFA_KIND:
+        automaton = dfa.DFA(named, symbols, start)
+        automaton.partition = layout.partition
+        return automaton
+    if layout.kind == NFA_KIND:
+        return nfa.NFA(named, symbols, start)
+    return nfa.EpsilonNFA(named, [symbol for symbol in symbols if symbol != epsilon], start, epsilon)
+
+def frame(*blobs)->bytes:
+    """
+    Packs blobs (bytes or str) one after another, each prefixed with its length.
+    Used to embed binary automata and strings into larger bundles.
+
+    :param blobs: bytes or str items
+    :return bytes: packed blobs
+    """
+    data = bytearray()
+    for blob in blobs:
+        if isinstance(blob, str):
+            blob = blob.encode()
+        data += LENGTH.pack(len(blob))
+        data += blob
+    return bytes(data)
+
+def unframe(data, offset: int = 0, count: int = 1)->tuple:
+    """
+    Unpacks blobs packed by frame.
+
+    :param data: buffer protocol object
+    :param int offset: offset of the first blob
+    :param int count: number of blobs to unpack
+    :return tuple: (list of memoryviews, offset after the last blob)
+    """
+    view = memoryview(data)
+    blobs = []
+    for _ in range(count):
+        length, = LENGTH.unpack_from(view, offset)
+        offset += LENGTH.size
+        blobs.append(view[offset:offset + length])
+        offset += length
+    return blobs, offset
+
+def dump(automaton, path: str):
+    """
+    Saves an automaton into a binary file.
+    The data is written to a temporary file in the same directory that then atomically
+    replaces the file, so processes that have the old file mapped keep reading it intact.
+
+    :param FA automaton: automaton
+    :param str path: file path
+    :return:
+    """
+    data = dumps(automaton)
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+def load(path: str):
+    """
+    Loads an automaton from a binary file.
+
+    :param str path: file path
+    :return FA: DFA, NFA or epsilon NFA
+    """
+    with open(path, 'rb') as file:
+        return loads(file.read())
@@ -81,70 +81,37 @@ def nfa_to_dfa(nfa: automata.nfa.NFA)->automata.dfa.DFA:
         return name[:-1], acc
 
     assert type(nfa) is automata.nfa.NFA
-    work = nfa.deepcopy() #created so that I don't have to copy existing States manually.
-
-    created_states = dict()
-
-    epsilon = work.start_state.epsilon
-    empty_state = st.State('empty', 0, epsilon)
-
-    created_states[work.start_state.name] = work.start_state
-    associations = dict() #holds references for new states to old states
-    for alias in nfa.states.values():
-        state = work.states[alias.name] #this neat trick allows me to change work nfa on the fly
-        for single_input in nfa.inputs:
-            empty_state.transitions[single_input] = {empty_state}
-
-            throughput = state.forward(single_input)
-            if not throughput:
-                new_state = empty_state
-            elif len(throughput) > 1:
-                new_state_name, accepted = concatenate(*throughput)
-                new_state = st.State(new_state_name, accepted, epsilon)
-            else:
-                new_state, = throughput
-            if not new_state in associations and len(throughput) > 1:
-                associations[new_state] = set(throughput)
-            if new_state.name not in created_states:
-                created_states[new_state.name] = new_state
-            state.transitions[single_input] = {created_states[new_state.name]}
-    done_assoc = dict()
-    while associations:
-        state = list(associations.keys())[0]
-        for single_input in sorted(work.inputs):
-            if single_input in state.transitions:
-                continue
+    epsilon = nfa.start_state.epsilon
+    inputs = sorted(nfa.inputs)
+
+    created_states = dict() # frozen set of NFA states -> DFA state
+    pending = [] # subsets whose transitions haven't been created yet
+
+    def subset_state(subset: frozenset)->st.State:
+        """
+        Returns a DFA state of a subset of NFA states, creating it the first time.
+
+        :param frozenset subset: NFA states
+        :return State: DFA state
+        """
+        if subset not in created_states:
+            name, accepted = concatenate(*subset) if subset else ('empty', 0)
+            created_states[subset] = st.State(name, accepted, epsilon)
+            pending.append(subset)
+        return created_states[subset]
+
+    start_state = subset_state(frozenset({nfa.start_state}))
+    while pending:
+        subset = pending.pop()
+        state = created_states[subset]
+        for single_input in inputs:
             transition = set()
-            for _ in sorted(associations[state]):
-                link = nfa.states[_.name]
-                output = link.forward(single_input)
-                transition |= output
-            if not transition:
-                transition = {empty_state}
-                state.transitions[single_input] = transition
-                continue
-            if transition in associations.values():
-                for key, value in sorted(associations.items()):
-                    if transition == value:
-                        # print('matched {} with hash {} on input {} for state {} with hash {}..'.format(
-                        #     key, hash(key), single_input, state, hash(state)))
-                        state.transitions[single_input] = {created_states[key.name]}
-                        break
-            else:
-                name, accept = concatenate(*transition)
-                new_state = st.State(name, accept, epsilon)
-                if new_state in done_assoc:
-                    new_state = done_assoc[new_state]
-                # print('creating {} with hash {}..'.format(name, hash(new_state)))
-                created_states[new_state.name] = new_state
-                associations[new_state] = transition
-                state.transitions[single_input] = {created_states[new_state.name]}
-        if len(state.transitions) == len(work.inputs):
-            done_assoc[state] = state
-            del(associations[state])
-    # for state in created_states.values():
-    #     print(state, state.transitions, state.value)
-    return automata.dfa.DFA(created_states, work.inputs, work.start_state)
+            for nfa_state in subset:
+                transition |= nfa_state.forward(single_input)
+            state.transitions[single_input] = {subset_state(frozenset(transition))}
+
+    states = {state.name: state for state in created_states.values()}
+    return automata.dfa.DFA(states, set(nfa.inputs), start_state)
 
 def epsilon_nfa_to_dfa(automaton: automata.nfa.EpsilonNFA)->automata.dfa.DFA:
     """
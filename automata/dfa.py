@@ -2,6 +2,7 @@
 Defines Deterministic finite automata.
 """
 import automata.fa as fa
+import automata.tables as tb
 
 class DFA(fa.FiniteAutomaton):
     '''
@@ -14,6 +15,11 @@ class DFA(fa.FiniteAutomaton):
 
         self.current = list(self.current)[0]
 
+        self._table = None
+
+        # maps characters to inputs when inputs stand for character intervals, see automata.alphabet.
+        self.partition = None
+
     @property
     def accepted(self) -> bool:
         """
@@ -21,7 +27,7 @@ class DFA(fa.FiniteAutomaton):
 
         :return bool: True if accepted, False if not
         """
-        return self.current in self.accepted_states
+        return self.current.accepted
 
     def _check_structure(self):
         error_msg = 'Incorrect {} structure.'.format(self.__class__.__name__)
@@ -53,9 +59,81 @@ class DFA(fa.FiniteAutomaton):
         super().reset()
         self.current = self.start_state
 
+    def _snapshot_state(self):
+        return {'current': [str(self._get_alias(self.current.name))]}
+
+    def _restore_state(self, state):
+        super()._restore_state(state)
+        self.current, = self.current
+
     def _access(self, value):
 
-        self.current = self.states[self._get_alias(self.current.clean_forward(value).name)]
+        symbol = value if self.partition is None else self.partition.symbol(value)
+
+        if symbol not in self.inputs:
+            raise ValueError(self._input_error(value))
+
+        self.current = self.states[self._get_alias(self.current.clean_forward(symbol).name)]
+
+    def compress_alphabet(self):
+        """
+        Merges inputs that move every state into the same state, so each remaining
+        input stands for an equivalence class of characters. Merged inputs are still
+        accepted through the alphabet partition, which is why only DFAs that have
+        one are compressed.
+
+        :return:
+        """
+        if self.partition is None:
+            return
+        states = sorted(self.states.values())
+        classes = dict() # column -> representative input
+        representatives = dict()
+        for symbol in sorted(self.inputs):
+            column = tuple(self._get_alias(state.clean_forward(symbol).name) for state in states)
+            representatives[symbol] = classes.setdefault(column, symbol)
+        if len(classes) == len(self.inputs):
+            return
+        for symbol, representative in representatives.items():
+            if symbol != representative:
+                for state in states:
+                    state.transitions.pop(symbol, None)
+        self.inputs = set(classes.values())
+        self.partition = self.partition.merge(representatives)
+        self._table = None
+        self._fingerprint = None
+
+    def _create_copy(self, *args):
+        copied = super()._create_copy(*args)
+        copied.partition = self.partition
+        return copied
+
+    def _fingerprint_extra(self)->str:
+        return '' if self.partition is None else repr(self.partition)
+
+    @property
+    def table(self)->tb.TransitionTable:
+        """
+        Returns a compiled transition table of this DFA.
+        The table is compiled on first use and cached until the DFA is minimized.
+
+        :return TransitionTable: compiled transition table
+        """
+        if self._table is None:
+            self._table = tb.TransitionTable(self)
+        return self._table
+
+    def match_buffer(self, buffer)->bool:
+        """
+        Checks if a whole buffer is accepted, reading bytes as latin-1 characters.
+
+        Accepts any buffer protocol object (bytes, bytearray, memoryview, mmap).
+        The buffer is not copied and the current DFA state is not changed.
+
+        :param buffer: buffer protocol object
+        :return bool: True if accepted, False if not
+        """
+        return self.table.match_buffer(buffer)
 
     def distinguish(self):
 
@@ -126,6 +204,9 @@ class DFA(fa.FiniteAutomaton):
 
         self._check_structure()
 
+        self._table = None
+        self._fingerprint = None
+
     @staticmethod
     def factory(input_text, lexer):
         lexer.scan(input_text)
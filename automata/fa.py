@@ -2,7 +2,7 @@
 Defines finite automata abstract class.
 In other words, it defines an interface that all derived classes have to follow.
 """
-import abc, copy
+import abc, copy, hashlib, json
 import automata.state as st
 import automata.packs as pk
 
@@ -54,6 +54,10 @@ class FiniteAutomaton(abc.ABC):
 
         self._alias = dict() # used to ensure backwards compatibility after FA minimization.
 
+        self._accepting = None # acceptance cached by feed, see accepting property.
+
+        self._fingerprint = None # structure hash cached by fingerprint property.
+
     @abc.abstractmethod
     def _check_structure(self) -> bool:
         """
@@ -134,6 +138,7 @@ class FiniteAutomaton(abc.ABC):
             states[state.name] = state
 
         self.states = states
+        self._fingerprint = None
 
     def reset(self):
         """
@@ -143,6 +148,7 @@ class FiniteAutomaton(abc.ABC):
         """
         # self.records.clear()
         self.current = {self.start_state}
+        self._accepting = None
 
     def _not_defined_substring(self):
         """
@@ -294,6 +300,7 @@ class FiniteAutomaton(abc.ABC):
         :param entry: entries that have to be handled.
         :return:
         """
+        self._accepting = None
         records = pk.Records()
         records.add_record(pk.RecordPack(self.current, self.accepted))
         for inp in entry:
@@ -342,6 +349,43 @@ class FiniteAutomaton(abc.ABC):
         self.enter(*entry)
         return self.accepted
 
+    def feed(self, chunk)->bool:
+        """
+        Feeds a chunk of inputs through the FA, continuing from the current state.
+
+        Unlike enter, no records are stored, so a stream of any length can be
+        fed chunk by chunk in constant memory. Use finish to end the stream.
+
+        :param chunk: iterable of inputs (for example a str chunk)
+        :return bool: True if the inputs fed so far are accepted
+        """
+        for inp in chunk:
+            self._access(inp)
+        self._accepting = self.accepted
+        return self._accepting
+
+    def finish(self)->bool:
+        """
+        Ends a stream started with feed and resets the FA.
+
+        :return bool: True if the whole stream was accepted
+        """
+        accepted = self.accepting
+        self.reset()
+        return accepted
+
+    @property
+    def accepting(self)->bool:
+        """
+        Returns acceptance of the inputs fed so far.
+        Cached by feed, so querying it between chunks is O(1).
+
+        :return bool: True if accepted, False if not
+        """
+        if self._accepting is None:
+            self._accepting = self.accepted
+        return self._accepting
+
     def distinguish(self):
         """
         Distinguishes identical states from non-identical and updates the automatum.
@@ -475,3 +519,78 @@ class FiniteAutomaton(abc.ABC):
         state = self.states.pop(old_name)
         state.name.name = new_name
         self.states[state.name] = state
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self)->str:
+        """
+        Returns a hash of the FA structure (type, states, inputs, transitions, start state).
+        Identical automata have identical fingerprints in every process.
+
+        Cached; the cache is cleared when the FA is minimized or its states are renamed.
+
+        :return str: hexadecimal fingerprint
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha1(type(self).__name__.encode())
+            for state in sorted(self.states.values()):
+                digest.update('\0{}={}'.format(repr(state), state.value).encode())
+                for event, ends in sorted(state.transitions.items(), key=lambda t: repr(t[0])):
+                    digest.update('\1{}->{}'.format(repr(event), sorted(map(repr, ends))).encode())
+            for inp in sorted(map(repr, self.inputs)):
+                digest.update('\2{}'.format(inp).encode())
+            digest.update('\3{}'.format(repr(self.start_state)).encode())
+            digest.update('\4{}'.format(self._fingerprint_extra()).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def _fingerprint_extra(self)->str:
+        """
+        Returns a text describing additional structure of derived types, included in the fingerprint.
+
+        :return str: additional structure
+        """
+        return ''
+
+    def _snapshot_state(self)->dict:
+        """
+        Returns the current execution state in JSON-serializable form.
+        Derived classes extend it with their own execution state (stack, tape...).
+
+        :return dict: execution state
+        """
+        return {'current': sorted(str(self._get_alias(state.name)) for state in self.current)}
+
+    def _restore_state(self, state: dict):
+        """
+        Restores execution state returned by _snapshot_state.
+
+        :param dict state: execution state
+        :return:
+        """
+        self.current = {self.states[st.StateName(name)] for name in state['current']}
+
+    def snapshot(self)->bytes:
+        """
+        Serializes the current execution state (not the structure) of the FA.
+        The snapshot can be restored in any process into an FA with the same fingerprint.
+
+        :return bytes: execution state snapshot
+        """
+        return json.dumps({'type': type(self).__name__,
+                           'fingerprint': self.fingerprint,
+                           'state': self._snapshot_state()}, separators=(',', ':')).encode()
+
+    def restore(self, snapshot: bytes):
+        """
+        Restores execution state from a snapshot.
+        Raises a ValueError if the snapshot was taken on a different automaton.
+
+        :param bytes snapshot: snapshot created by snapshot method
+        :return:
+        """
+        data = json.loads(snapshot.decode())
+        if data['type'] != type(self).__name__ or data['fingerprint'] != self.fingerprint:
+            raise ValueError('Snapshot does not belong to this {}.'.format(type(self).__name__))
+        self._restore_state(data['state'])
+        self._accepting = None
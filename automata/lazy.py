@@ -0,0 +1,311 @@
+"""
+Defines a lazy DFA: a Thompson NFA (see automata.thompson) determinized while it runs.
+
+Only DFA states that are actually reached by the input are created, so a pattern whose
+full DFA is exponentially large costs at most one new state per input character.
+Created states are cached up to a limit; a full cache is replaced by an empty one, so
+memory stays bounded whatever the pattern and the input are.
+
+A LazyDFA mimics a compiled DFA: its table is itself and it has the methods of
+a TransitionTable (see automata.tables). Rows given out by start and run are sorted
+tuples of NFA states instead of cache indexes, so they stay valid after the cache is
+replaced and can be serialized.
+"""
+import hashlib
+import threading
+import automata.alphabet as ab
+import automata.tables as tb
+
+DEAD = tb.DEAD
+
+MAX_CACHED_STATES = 10000 # default number of DFA states kept, see LazyDFA
+
+class _Cache:
+    """
+    DFA states created so far. Indexes are only meaningful within one cache.
+    """
+
+    def __init__(self, width: int):
+        self.width = width
+        self.rows = dict() # subset -> index
+        self.subsets = []
+        self.accepting = []
+        self.moves = [] # index * width + column -> index, DEAD or None if unknown
+
+    def add(self, subset: frozenset, accepted: bool)->int:
+        """
+        Adds a DFA state.
+
+        :param frozenset subset: NFA states
+        :param bool accepted: True if the state is accepting
+        :return int: index of the state
+        """
+        self.rows[subset] = len(self.subsets)
+        self.subsets.append(subset)
+        self.accepting.append(accepted)
+        self.moves.extend([None] * self.width)
+        return len(self.subsets) - 1
+
+class LazyDFA:
+    """
+    Determinizes a built Thompson NFA on demand.
+    Safe to share between threads: the cache only grows under a lock and every run
+    keeps using the cache it started with even if another run replaces it.
+    """
+
+    def __init__(self, builder, fragment: tuple, max_states: int = None, cause=None):
+        """
+        :param Builder builder: builder holding the NFA, it mustn't change afterwards
+        :param tuple fragment: the whole automaton
+        :param int max_states: maximum number of cached DFA states, MAX_CACHED_STATES by default
+        :param StateExplosionError cause: why the DFA wasn't built eagerly, if it wasn't
+        """
+        bounds, atom_classes, self._expanded, symbols, inputs = builder._expand()
+        self._builder = builder
+        self._fragment = fragment
+        self._accepting_state = fragment[1]
+        self.max_states = MAX_CACHED_STATES if max_states is None else max_states
+        self.cause = cause
+
+        self.symbols = [symbols[atom_class] for atom_class in inputs]
+        self._classes = list(inputs) # column -> class
+        self.columns = {symbol: column for column, symbol in enumerate(self.symbols)}
+        self.width = len(self.symbols)
+        self.inputs = set(self.symbols)
+        self.partition = ab.Partition(bounds, [None if atom_class is None else symbols[atom_class]
+                                               for atom_class in atom_classes])
+        self._columns = dict(self.columns) # character -> column, grows as characters are seen
+        self.byte_classes = [self.column(chr(byte)) for byte in range(256)]
+
+        self._lock = threading.Lock()
+        self._cache = _Cache(self.width)
+        self._start = builder.closure((fragment[0],))
+        self.start = self._row(self._start)
+        self._fingerprint = None
+
+    @property
+    def table(self):
+        """
+        :return LazyDFA: this automaton, which runs like a transition table
+        """
+        return self
+
+    @property
+    def size(self)->int:
+        """
+        :return int: number of currently cached DFA states
+        """
+        return len(self._cache.subsets)
+
+    @property
+    def fingerprint(self)->str:
+        """
+        Returns a hash of the NFA structure, identical for identical NFAs in every process.
+
+        :return str: hexadecimal fingerprint
+        """
+        if self._fingerprint is None:
+            digest = hashlib.sha256(b'lazy')
+            digest.update(repr((self._builder.transitions, self._builder.epsilons,
+                                self._fragment)).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def __repr__(self):
+        return '<LazyDFA of {} NFA states, {} cached>'.format(self._builder.size, self.size)
+
+    def _row(self, subset: frozenset):
+        """
+        :param frozenset subset: NFA states
+        :return: sorted tuple of NFA states or DEAD if there are none
+        """
+        return tuple(sorted(subset)) if subset else DEAD
+
+    def column(self, char)->int:
+        """
+        Returns the column of a character, see TransitionTable.column.
+
+        :param char: input character
+        :return int: column or DEAD if the character is not in the alphabet
+        """
+        column = self._columns.get(char)
+        if column is None:
+            column = self.columns.get(self.partition.symbol(char), DEAD)
+            if len(self._columns) < tb.MAX_CACHED_CHARACTERS:
+                self._columns[char] = column
+        return column
+
+    def _enter(self, subset: frozenset)->tuple:
+        """
+        Finds or creates the DFA state of a subset, replacing a full cache.
+
+        :param frozenset subset: non-empty set of NFA states
+        :return tuple: (cache, index of the state in it)
+        """
+        with self._lock:
+            cache = self._cache
+            index = cache.rows.get(subset)
+            if index is None:
+                if len(cache.subsets) >= self.max_states:
+                    cache = self._cache = _Cache(self.width)
+                index = cache.add(subset, self._accepting_state in subset)
+            return cache, index
+
+    def _move(self, cache: _Cache, index: int, column: int)->tuple:
+        """
+        Moves from a DFA state on a column, determinizing the move on first use.
+
+        :param _Cache cache: cache the state belongs to
+        :param int index: index of the state
+        :param int column: input column
+        :return tuple: (cache, index of the next state or DEAD)
+        """
+        target = cache.moves[index * self.width + column]
+        if target is not None:
+            return cache, target
+        atom_class = self._classes[column]
+        ends = set()
+        for state in cache.subsets[index]:
+            ends.update(self._expanded[state].get(atom_class, ()))
+        if not ends:
+            cache.moves[index * self.width + column] = DEAD
+            return cache, DEAD
+        subset = self._builder.closure(ends)
+        with self._lock:
+            target = cache.rows.get(subset)
+            if target is None and len(cache.subsets) < self.max_states:
+                target = cache.add(subset, self._accepting_state in subset)
+            if target is not None:
+                cache.moves[index * self.width + column] = target
+                return cache, target
+        return self._enter(subset)
+
+    def _run(self, row, columns)->tuple:
+        """
+        Moves from a row through columns.
+
+        :param row: sorted tuple of NFA states or DEAD
+        :param columns: iterable of columns
+        :return tuple: (cache, index of the resulting state or DEAD)
+        """
+        if row == DEAD:
+            return self._cache, DEAD
+        cache, index = self._enter(frozenset(row))
+        for column in columns:
+            if column == DEAD:
+                return cache, DEAD
+            cache, index = self._move(cache, index, column)
+            if index == DEAD:
+                break
+        return cache, index
+
+    def step(self, row, symbol):
+        """
+        Moves from a row on a single input.
+
+        :param row: sorted tuple of NFA states or DEAD
+        :param symbol: input symbol
+        :return: next row or DEAD
+        """
+        return self.run(row, (symbol,))
+
+    def run(self, row, symbols):
+        """
+        Moves from a row through all symbols, see TransitionTable.run.
+
+        :param row: sorted tuple (or list) of NFA states or DEAD
+        :param symbols: iterable of input symbols (for example a str chunk)
+        :return: resulting row or DEAD
+        """
+        cache, index = self._run(row, map(self.column, symbols))
+        return DEAD if index == DEAD else self._row(cache.subsets[index])
+
+    def match(self, symbols)->bool:
+        """
+        Checks if all symbols are accepted from the start row.
+
+        :param symbols: iterable of input symbols (for example a str)
+        :return bool: True if accepted, False if not
+        """
+        cache, index = self._run(self.start, map(self.column, symbols))
+        return index != DEAD and cache.accepting[index]
+
+    def accepts(self, row)->bool:
+        """
+        :param row: sorted tuple (or list) of NFA states or DEAD
+        :return bool: True if the row is accepting
+        """
+        return row != DEAD and self._accepting_state in row
+
+    def longest(self, text, start: int = 0, end: int = None, seen: set = None)->int:
+        """
+        Finds the longest accepted part of text[start:end] that starts at start, see TransitionTable.longest.
+        Seen pairs hold subsets of NFA states instead of rows, which change when the cache is replaced.
+
+        :param text: indexable input symbols (for example a str)
+        :param int start: index where the match starts
+        :param int end: index where the search stops, the end of the text by default
+        :param set seen: (index, subset) pairs shared by successive searches, if any
+        :return int: index after the longest match or -1 if nothing is accepted
+        """
+        if self.start == DEAD:
+            return -1
+        cache, index = self._enter(self._start)
+        found = start if cache.accepting[index] else -1
+        reached = []
+        for position in range(start, len(text) if end is None else end):
+            column = self.column(text[position])
+            if column == DEAD:
+                break
+            cache, index = self._move(cache, index, column)
+            if index == DEAD:
+                break
+            if cache.accepting[index]:
+                found = position + 1
+                reached.clear()
+            elif seen is not None and not (position + 1) % tb.SEEN_STRIDE:
+                pair = (position + 1, cache.subsets[index])
+                if pair in seen:
+                    break
+                reached.append(pair)
+        if seen is not None:
+            seen.update(reached)
+        return found
+
+    def accepted_suffixes(self, text, end: int)->bytearray:
+        """
+        Reads text[:end] backwards and marks every accepted index, see TransitionTable.accepted_suffixes.
+
+        :param text: indexable input symbols (for example a str)
+        :param int end: index where reading starts
+        :return bytearray: end + 1 flags, 1 where accepted
+        """
+        marks = bytearray(end + 1)
+        if self.start == DEAD:
+            return marks
+        cache, index = self._enter(self._start)
+        marks[end] = cache.accepting[index]
+        for position in range(end - 1, -1, -1):
+            column = self.column(text[position])
+            if column == DEAD:
+                break
+            cache, index = self._move(cache, index, column)
+            if index == DEAD:
+                break
+            marks[position] = cache.accepting[index]
+        return marks
+
+    def match_buffer(self, buffer)->bool:
+        """
+        Checks if the whole buffer is accepted, reading bytes as latin-1 characters.
+
+        :param buffer: buffer protocol object
+        :return bool: True if accepted, False if not
+        """
+        with memoryview(buffer) as view:
+            if view.format != 'B' or view.ndim != 1:
+                with view.cast('B') as cast:
+                    return self.match_buffer(cast)
+            classes = self.byte_classes
+            cache, index = self._run(self.start, (classes[byte] for byte in view))
+        return index != DEAD and cache.accepting[index]
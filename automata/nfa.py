@@ -24,7 +24,7 @@ class NFA(fa.FiniteAutomaton):
     @property
     def accepted(self):
         for state in self.current:
-            if state in self.accepted_states:
+            if state.accepted:
                 return True
         return False
 
@@ -74,7 +74,7 @@ class EpsilonNFA(NFA):
     @property
     def accepted(self):
         for state in self._all_closures():
-            if state in self.accepted_states:
+            if state.accepted:
                 return True
         return False
 
@@ -137,6 +137,12 @@ class EpsilonNFA(NFA):
 
         return super()._process(*entry)
 
+    def feed(self, chunk):
+
+        self.current = self._all_closures()
+
+        return super().feed(chunk)
+
     def __add__(self, other):
         """
         Allows for epsilon NFA addition.
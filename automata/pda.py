@@ -73,6 +73,27 @@ class DeterministicPDA(dfa.DFA): # the correct implementation would be to inheri
         # print('Go on: {}'.form(go_on), self.stack, self.current)
         return go_on
 
+    def _snapshot_state(self):
+        if self.current == self.failed_state:
+            state = {'current': []}
+        else:
+            state = {'current': [str(self._get_alias(self.current.name))]}
+        state['stack'] = self.stack.container
+        state['processed_all'] = self.processed_all
+        return state
+
+    def _restore_state(self, state):
+        if state['current']:
+            super()._restore_state(state)
+        else:
+            self.current = self.failed_state
+        self.stack = pk.Stack(*state['stack'])
+        self.processed_all = state['processed_all']
+
+    def feed(self, chunk):
+        # acceptance of a DPDA depends on epsilon moves made after the whole input is read.
+        raise NotImplementedError('Streaming is not supported by {}.'.format(self.__class__.__name__))
+
     def _access_epsilon(self):
 
         """
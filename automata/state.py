@@ -230,7 +230,7 @@ class State:
     def indirect_reach(self):
         """
         Returns an indirect reach.
-        Recursively finds all States that can be reached out of this State.
+        Finds all States that can be reached out of this State.
 
         Differs from direct_reach because it also returns all reachable
         states of directly reachable states.
@@ -260,19 +260,22 @@ class State:
 
     def _epsilon_closure(self, visited):
         """
-        Internal recursive epsilon closure finder.
+        Internal epsilon closure finder.
         Do not use directly.
 
-        Does NOT return the whole epsilon closure.
+        Iterative, so long chains of epsilon transitions can't exceed the recursion limit.
 
         :param set visited: set of currently visited States
-        :return set: part of epsilon closure
+        :return set: visited States and the epsilon closure
         """
 
         visited.add(self)
-        for state in self.forward(self.epsilon):
-            if not state in visited:
-                visited |= state._epsilon_closure(visited)
+        stack = [self]
+        while stack:
+            for state in stack.pop().forward(self.epsilon):
+                if not state in visited:
+                    visited.add(state)
+                    stack.append(state)
         return visited
 
     def _reachable(self, state, visited):
@@ -285,10 +288,13 @@ class State:
         :param set visited: set of all currently visited States.
         :return:
         """
-        visited |= {state}
-        for i in state.direct_reach:
-            if not i in visited:
-                self._reachable(i, visited)
+        visited.add(state)
+        stack = [state]
+        while stack:
+            for i in stack.pop().direct_reach:
+                if not i in visited:
+                    visited.add(i)
+                    stack.append(i)
 
     def __contains__(self, item):
 
@@ -0,0 +1,310 @@
+"""
+Defines compiled transition tables.
+
+A transition table is a flat, integer indexed snapshot of a DFA.
+States and inputs are numbered, so running the table doesn't touch
+State objects, sets or dictionaries at all.
+"""
+
+MAX_CACHED_CHARACTERS = 65536 # characters whose column is remembered, see TransitionTable.column
+
+DEAD = -1 # marks a transition into a state that can never accept.
+
+SEEN_STRIDE = 16 # searches sharing seen pairs only record every SEEN_STRIDE-th index, see TransitionTable.longest
+
+class TransitionTable:
+    """
+    A compiled, read-only view of a DFA.
+
+    States are numbered by their sorted names, inputs by their sorted values.
+    Transitions into states from which no accepting state can be reached
+    point to DEAD, which allows early rejection.
+
+    The table does not follow later changes made to the original DFA.
+    """
+
+    def __init__(self, automaton):
+        """
+        Compiles a DFA into a transition table.
+
+        :param DFA automaton: a complete deterministic automaton
+        """
+        self.symbols = sorted(automaton.inputs)
+        self.columns = {symbol: column for column, symbol in enumerate(self.symbols)}
+        self.width = len(self.symbols)
+
+        states = sorted(automaton.states.values())
+        rows = {state.name: row for row, state in enumerate(states)}
+        self.names = [state.name for state in states]
+        self.accepting = [bool(state.accepted) for state in states]
+        self.start = rows[automaton.start_state.name]
+
+        self.table = [DEAD] * (len(states) * self.width)
+        for row, state in enumerate(states):
+            for symbol, column in self.columns.items():
+                end = state.forward(symbol)
+                if end:
+                    end, = end
+                    self.table[row * self.width + column] = rows[automaton._get_alias(end.name)]
+
+        live = self._live_states()
+        for index, row in enumerate(self.table):
+            if row != DEAD and row not in live:
+                self.table[index] = DEAD
+        if self.start not in live:
+            self.start = DEAD
+
+        self._set_alphabet(automaton.partition)
+
+    def _set_alphabet(self, partition):
+        """
+        Prepares character lookups.
+
+        :param Partition partition: alphabet partition of the DFA or None
+        :return:
+        """
+        self.partition = partition
+        self._columns = dict(self.columns) # character -> column, grows as characters are seen
+        # bytes are interpreted as latin-1 characters: byte b is the input chr(b).
+        self.byte_classes = [self.column(chr(byte)) for byte in range(256)]
+
+    def column(self, char)->int:
+        """
+        Returns the column of a character, mapping it through the alphabet partition if there is one.
+
+        :param char: input character
+        :return int: column or DEAD if the character is not in the alphabet
+        """
+        column = self._columns.get(char)
+        if column is None:
+            if self.partition is None:
+                return DEAD
+            column = self.columns.get(self.partition.symbol(char), DEAD)
+            if len(self._columns) < MAX_CACHED_CHARACTERS:
+                self._columns[char] = column
+        return column
+
+    def _live_states(self)->set:
+        """
+        Finds all states from which an accepting state can be reached.
+
+        :return set: row indexes of all live states
+        """
+        predecessors = [set() for _ in self.names]
+        for index, row in enumerate(self.table):
+            if row != DEAD:
+                predecessors[row].add(index // self.width)
+
+        live = {row for row, accepted in enumerate(self.accepting) if accepted}
+        stack = list(live)
+        while stack:
+            for previous in predecessors[stack.pop()]:
+                if previous not in live:
+                    live.add(previous)
+                    stack.append(previous)
+        return live
+
+    @property
+    def size(self)->int:
+        """
+        :return int: number of states in the table
+        """
+        return len(self.names)
+
+    def step(self, row: int, symbol)->int:
+        """
+        Moves from a row on a single input.
+
+        :param int row: current row (state index)
+        :param symbol: input symbol
+        :return int: next row or DEAD
+        """
+        if row == DEAD:
+            return DEAD
+        column = self.column(symbol)
+        if column == DEAD:
+            return DEAD
+        return self.table[row * self.width + column]
+
+    def run(self, row: int, symbols)->int:
+        """
+        Moves from a row through all symbols.
+        Used to carry a match across chunks of a stream.
+
+        :param int row: current row (state index)
+        :param symbols: iterable of input symbols (for example a str chunk)
+        :return int: resulting row or DEAD
+        """
+        table = self.table
+        width = self.width
+        columns = self._columns
+        for symbol in symbols:
+            if row == DEAD:
+                break
+            column = columns.get(symbol)
+            if column is None:
+                column = self.column(symbol)
+            if column == DEAD:
+                return DEAD
+            row = table[row * width + column]
+        return row
+
+    def match(self, symbols)->bool:
+        """
+        Checks if all symbols are accepted from the start row.
+
+        :param symbols: iterable of input symbols (for example a str)
+        :return bool: True if accepted, False if not
+        """
+        return self.accepts(self.run(self.start, symbols))
+
+    def longest(self, text, start: int = 0, end: int = None, seen: set = None)->int:
+        """
+        Finds the longest part of text[start:end] that starts at start and is accepted.
+        Stops as soon as the table gets into DEAD.
+
+        Searches for successive matches can share a set of seen (index, row) pairs:
+        every search then adds the pairs it reaches after its last accepted index and
+        stops at a pair added by an earlier one, because no match can follow it. Each
+        search must start at or after the end of the previous match and stop at the same end,
+        which keeps the searches linear in the text even if the table stays alive long
+        after every match. Only indexes divisible by SEEN_STRIDE are recorded: a search
+        that reaches the row of an earlier one follows it to the next recorded index.
+
+        :param text: indexable input symbols (for example a str)
+        :param int start: index where the match starts
+        :param int end: index where the search stops, the end of the text by default
+        :param set seen: (index, row) pairs shared by successive searches, if any
+        :return int: index after the longest match or -1 if nothing is accepted
+        """
+        if seen is not None:
+            return self._longest_unseen(text, start, end, seen)
+        table = self.table
+        width = self.width
+        columns = self._columns
+        accepting = self.accepting
+        row = self.start
+        if row == DEAD:
+            return -1
+        found = start if accepting[row] else -1
+        for index in range(start, len(text) if end is None else end):
+            symbol = text[index]
+            column = columns.get(symbol)
+            if column is None:
+                column = self.column(symbol)
+            if column == DEAD:
+                break
+            row = table[row * width + column]
+            if row == DEAD:
+                break
+            if accepting[row]:
+                found = index + 1
+        return found
+
+    def _longest_unseen(self, text, start: int, end: int, seen: set)->int:
+        """
+        Finds the longest match like longest, stopping at seen pairs.
+
+        :param text: indexable input symbols (for example a str)
+        :param int start: index where the match starts
+        :param int end: index where the search stops or None
+        :param set seen: (index, row) pairs reached after earlier matches, updated
+        :return int: index after the longest match or -1 if nothing is accepted
+        """
+        table = self.table
+        width = self.width
+        columns = self._columns
+        accepting = self.accepting
+        row = self.start
+        if row == DEAD:
+            return -1
+        found = start if accepting[row] else -1
+        reached = []
+        for index in range(start, len(text) if end is None else end):
+            symbol = text[index]
+            column = columns.get(symbol)
+            if column is None:
+                column = self.column(symbol)
+            if column == DEAD:
+                break
+            row = table[row * width + column]
+            if row == DEAD:
+                break
+            if accepting[row]:
+                found = index + 1
+                reached.clear()
+            elif not (index + 1) % SEEN_STRIDE:
+                pair = (index + 1, row)
+                if pair in seen:
+                    break
+                reached.append(pair)
+        seen.update(reached)
+        return found
+
+    def accepted_suffixes(self, text, end: int)->bytearray:
+        """
+        Reads text[:end] backwards and marks every index i at which the
+        reversed text[i:end] is accepted. Stops as soon as the table gets into DEAD.
+
+        :param text: indexable input symbols (for example a str)
+        :param int end: index where reading starts
+        :return bytearray: end + 1 flags, 1 where accepted
+        """
+        table = self.table
+        width = self.width
+        columns = self._columns
+        accepting = self.accepting
+        marks = bytearray(end + 1)
+        row = self.start
+        if row == DEAD:
+            return marks
+        marks[end] = accepting[row]
+        for index in range(end - 1, -1, -1):
+            symbol = text[index]
+            column = columns.get(symbol)
+            if column is None:
+                column = self.column(symbol)
+            if column == DEAD:
+                break
+            row = table[row * width + column]
+            if row == DEAD:
+                break
+            marks[index] = accepting[row]
+        return marks
+
+    def accepts(self, row: int)->bool:
+        """
+        :param int row: row (state index) or DEAD
+        :return bool: True if the row is accepting
+        """
+        return row != DEAD and self.accepting[row]
+
+    def match_buffer(self, buffer)->bool:
+        """
+        Checks if the whole buffer is accepted.
+
+        Works on any object supporting the buffer protocol (bytes, bytearray,
+        memoryview, mmap...) without copying it or creating per-character strings.
+
+        :param buffer: buffer protocol object
+        :return bool: True if accepted, False if not
+        """
+        with memoryview(buffer) as view:
+            if view.format != 'B' or view.ndim != 1:
+                with view.cast('B') as cast:
+                    return self.match_buffer(cast)
+
+            table = self.table
+            width = self.width
+            classes = self.byte_classes
+            row = self.start
+            if row == DEAD:
+                return False
+            for byte in view:
+                column = classes[byte]
+                if column == DEAD:
+                    return False
+                row = table[row * width + column]
+                if row == DEAD:
+                    return False
+        return self.accepting[row]
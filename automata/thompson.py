@@ -0,0 +1,591 @@
+"""
+Defines an in-place Thompson construction of epsilon NFAs.
+
+States are integers and transitions are kept in lists indexed by state, so
+fragments are connected by adding epsilon transitions instead of copying
+automata, and no state names or texts are created while building.
+A fragment is a (start state, end state) tuple; the end state of the
+whole construction is its only accepting state.
+
+Transitions are labelled with code point intervals. Before determinization the
+intervals are split into disjoint atoms, atoms that no transition tells apart are
+grouped into classes, and every class becomes one DFA input symbol (its first
+character); the DFA maps characters to classes through an alphabet partition.
+A wide class therefore costs O(#intervals), not O(#characters).
+"""
+import bisect
+import time
+import automata.alphabet as ab
+import automata.dfa as dfa
+import automata.nfa as nfa
+import automata.state as st
+import misc.errors as err
+
+class Budget:
+    """
+    Limits the work of a single determinization, see Builder.to_dfa.
+    Subset construction can create exponentially many states, so
+    a pattern supplied by a user should never be determinized without one.
+    """
+
+    def __init__(self, max_states: int = None, max_seconds: float = None):
+        """
+        :param int max_states: maximum number of DFA states before minimization, None for no limit
+        :param float max_seconds: maximum determinization time, None for no limit
+        """
+        self.max_states = max_states
+        self.max_seconds = max_seconds
+
+    def __repr__(self):
+        return 'Budget(max_states={}, max_seconds={})'.format(self.max_states, self.max_seconds)
+
+    def until(self, deadline: float)->'Budget':
+        """
+        Returns a budget with the same state limit and only the time left until a deadline,
+        so several determinizations can share a single time limit.
+
+        :param float deadline: time.perf_counter() when time runs out, None for no time limit
+        :return Budget: budget of the remaining time
+        """
+        return Budget(self.max_states, None if deadline is None else max(0.0, deadline - time.perf_counter()))
+
+    def check(self, states: int, started: float):
+        """
+        Raises a StateExplosionError if the budget is exceeded.
+
+        :param int states: number of DFA states created so far
+        :param float started: time.perf_counter() when the determinization started
+        :return:
+        """
+        seconds = time.perf_counter() - started
+        if self.max_states is not None and states > self.max_states:
+            raise err.StateExplosionError('DFA exceeded {} states'.format(self.max_states), states, seconds)
+        if self.max_seconds is not None and seconds > self.max_seconds:
+            raise err.StateExplosionError('DFA took over {} seconds'.format(self.max_seconds), states, seconds)
+
+def minimize(moves: list, accepting: list)->tuple:
+    """
+    Minimizes a complete DFA given as integer rows by Hopcroft's partition refinement,
+    O(#inputs * #rows * log #rows).
+
+    :param list moves: row -> list of target rows, one per input
+    :param list accepting: row -> True if the row is accepting
+    :return tuple: (row -> block, number of blocks) where blocks are numbered
+                   in breadth-first order from row 0, so row 0 is in block 0
+    """
+    width = len(moves[0]) if moves else 0
+    sources = [[[] for _ in moves] for _ in range(width)] # input -> target -> rows moving into it
+    for row, move in enumerate(moves):
+        for column, target in enumerate(move):
+            sources[column][target].append(row)
+
+    blocks = [block for block in ({row for row, accepted in enumerate(accepting) if accepted},
+                                  {row for row, accepted in enumerate(accepting) if not accepted}) if block]
+    block_of = [0] * len(moves)
+    for index, block in enumerate(blocks):
+        for row in block:
+            block_of[row] = index
+    pending = {(index, column) for index in range(len(blocks)) for column in range(width)}
+    stack = list(pending)
+    while stack:
+        splitter = stack.pop()
+        pending.discard(splitter)
+        index, column = splitter
+        touched = dict() # block -> its rows moving into the splitter
+        for target in blocks[index]:
+            for row in sources[column][target]:
+                touched.setdefault(block_of[row], set()).add(row)
+        for split, rows in touched.items():
+            if len(rows) == len(blocks[split]):
+                continue
+            blocks[split] -= rows
+            blocks.append(rows)
+            new = len(blocks) - 1
+            for row in rows:
+                block_of[row] = new
+            for other in range(width):
+                if (split, other) in pending or len(rows) < len(blocks[split]):
+                    item = (new, other)
+                else:
+                    item = (split, other)
+                pending.add(item)
+                stack.append(item)
+
+    numbers = {block_of[0]: 0}
+    queue = [0]
+    for row in queue:
+        for target in moves[row]:
+            if block_of[target] not in numbers:
+                numbers[block_of[target]] = len(numbers)
+                queue.append(target)
+    return [numbers.get(block) for block in block_of], len(numbers)
+
+class Builder:
+    """
+    Builds a single epsilon NFA out of fragments and converts it to a DFA or an EpsilonNFA.
+    """
+
+    def __init__(self, strategy=None):
+        """
+        :param strategy: decides which sub-expressions are minimised on their own
+                         while building, see grammar.operators.Minimization; None for none
+        """
+        self.transitions = [] # state -> [(first code point, last code point, end state)]
+        self.epsilons = [] # state -> [states]
+        self.strategy = strategy
+
+    @property
+    def size(self)->int:
+        """
+        :return int: number of states
+        """
+        return len(self.transitions)
+
+    def state(self)->int:
+        """
+        Creates a new state.
+
+        :return int: state id
+        """
+        self.transitions.append([])
+        self.epsilons.append([])
+        return len(self.transitions) - 1
+
+    def add(self, start: int, first: int, last: int, end: int):
+        """
+        Adds a transition on an interval of characters.
+
+        :param int start: start state
+        :param int first: first code point of the interval
+        :param int last: last code point of the interval (included)
+        :param int end: end state
+        :return:
+        """
+        self.transitions[start].append((first, last, end))
+
+    def epsilon(self, start: int, end: int):
+        """
+        Adds an epsilon transition.
+
+        :param int start: start state
+        :param int end: end state
+        :return:
+        """
+        self.epsilons[start].append(end)
+
+    def ranges(self, *intervals)->tuple:
+        """
+        Creates a fragment accepting any single character of the given intervals.
+
+        :param intervals: (first, last) code point pairs, both included
+        :return tuple: fragment
+        """
+        start, end = self.state(), self.state()
+        for first, last in ab.normalize(intervals):
+            self.add(start, first, last, end)
+        return start, end
+
+    def symbols(self, *characters)->tuple:
+        """
+        Creates a fragment accepting any single character of the given ones.
+
+        :param characters: characters
+        :return tuple: fragment
+        """
+        return self.ranges(*[(ord(char), ord(char)) for char in characters])
+
+    def concatenate(self, *fragments)->tuple:
+        """
+        Concatenates fragments.
+
+        :param fragments: fragments in order
+        :return tuple: fragment
+        """
+        for (_, end), (start, _) in zip(fragments, fragments[1:]):
+            self.epsilon(end, start)
+        return fragments[0][0], fragments[-1][1]
+
+    def alternate(self, *fragments)->tuple:
+        """
+        Creates a union of fragments.
+
+        :param fragments: fragments
+        :return tuple: fragment
+        """
+        start, end = self.state(), self.state()
+        for item_start, item_end in fragments:
+            self.epsilon(start, item_start)
+            self.epsilon(item_end, end)
+        return start, end
+
+    def star(self, fragment: tuple)->tuple:
+        """
+        Repeats a fragment zero or more times.
+
+        :param tuple fragment: fragment
+        :return tuple: fragment
+        """
+        start, end = self.optional(fragment)
+        self.epsilon(fragment[1], fragment[0])
+        return start, end
+
+    def plus(self, fragment: tuple)->tuple:
+        """
+        Repeats a fragment one or more times.
+
+        :param tuple fragment: fragment
+        :return tuple: fragment
+        """
+        start, end = self.alternate(fragment)
+        self.epsilon(fragment[1], fragment[0])
+        return start, end
+
+    def optional(self, fragment: tuple)->tuple:
+        """
+        Accepts a fragment zero or one time.
+
+        :param tuple fragment: fragment
+        :return tuple: fragment
+        """
+        start, end = self.alternate(fragment)
+        self.epsilon(start, end)
+        return start, end
+
+    def empty(self)->tuple:
+        """
+        Creates a fragment accepting only the empty text.
+
+        :return tuple: fragment
+        """
+        start, end = self.state(), self.state()
+        self.epsilon(start, end)
+        return start, end
+
+    def copy(self, fragment: tuple, first: int, count: int)->tuple:
+        """
+        Copies a fragment made of states first, first + 1... first + count - 1,
+        which must not have transitions to any other state yet.
+
+        :param tuple fragment: fragment
+        :param int first: first state of the fragment
+        :param int count: number of states of the fragment
+        :return tuple: copied fragment
+        """
+        offset = self.size - first
+        for state in range(first, first + count):
+            self.transitions.append([(low, high, end + offset) for low, high, end in self.transitions[state]])
+            self.epsilons.append([end + offset for end in self.epsilons[state]])
+        return fragment[0] + offset, fragment[1] + offset
+
+    def repeat(self, fragment: tuple, first: int, minimum: int, maximum: int = None)->tuple:
+        """
+        Repeats a fragment from minimum to maximum times by copying its states.
+        The fragment has to be made of states first... size - 1, see copy.
+        All optional repetitions skip to one shared end state, so the automaton
+        and its epsilon closures grow linearly with the maximum.
+
+        :param tuple fragment: fragment
+        :param int first: first state of the fragment
+        :param int minimum: minimum number of repetitions
+        :param int maximum: maximum number of repetitions, None for unbounded
+        :return tuple: fragment
+        """
+        count = self.size - first
+        needed = minimum if maximum is None else maximum
+        if needed == 0:
+            return self.star(fragment) if maximum is None else self.empty()
+        copies = [fragment] + [self.copy(fragment, first, count) for _ in range(needed - 1)]
+        if maximum is None:
+            copies[-1] = self.plus(copies[-1])
+        if minimum == needed:
+            return self.concatenate(*copies)
+        if minimum:
+            start, previous = self.concatenate(*copies[:minimum])
+        else:
+            start = previous = self.state()
+        end = self.state()
+        for item_start, item_end in copies[minimum:]:
+            self.epsilon(previous, item_start)
+            self.epsilon(previous, end)
+            previous = item_end
+        self.epsilon(previous, end)
+        return start, end
+
+    def embed(self, rows: tuple)->tuple:
+        """
+        Creates a fragment out of rows made by to_rows, copying them as they are.
+
+        :param tuple rows: (row -> [(first, last, row)], row -> accepting), row 0 is the start
+        :return tuple: fragment
+        """
+        transitions, accepting = rows
+        offset = self.size
+        for items in transitions:
+            self.transitions.append([(first, last, end + offset) for first, last, end in items])
+            self.epsilons.append([])
+        end = self.state()
+        for row, accepted in enumerate(accepting):
+            if accepted:
+                self.epsilon(row + offset, end)
+        return offset, end
+
+    def include(self, other: 'Builder', fragment: tuple)->tuple:
+        """
+        Creates a fragment out of a fragment of another builder, copying all of its states.
+
+        :param Builder other: builder that holds the fragment
+        :param tuple fragment: fragment of the other builder
+        :return tuple: fragment
+        """
+        offset = self.size
+        for transitions, epsilons in zip(other.transitions, other.epsilons):
+            self.transitions.append([(first, last, end + offset) for first, last, end in transitions])
+            self.epsilons.append([end + offset for end in epsilons])
+        return fragment[0] + offset, fragment[1] + offset
+
+    def any(self)->tuple:
+        """
+        Creates a fragment accepting any single character.
+
+        :return tuple: fragment
+        """
+        return self.ranges((0, ab.MAX_CODE_POINT))
+
+    def unanchored(self, fragment: tuple)->tuple:
+        """
+        Prefixes a fragment with any number of any characters, so it accepts
+        every text that ends with a match of the fragment.
+
+        :param tuple fragment: fragment
+        :return tuple: fragment
+        """
+        return self.concatenate(self.star(self.any()), fragment)
+
+    def reverse(self, fragment: tuple)->tuple:
+        """
+        Reverses all transitions in place, so the automaton accepts reversed texts.
+        Any other fragment built so far is reversed as well.
+
+        :param tuple fragment: the whole automaton
+        :return tuple: reversed fragment
+        """
+        transitions = [[] for _ in self.transitions]
+        epsilons = [[] for _ in self.epsilons]
+        for start, items in enumerate(self.transitions):
+            for first, last, end in items:
+                transitions[end].append((first, last, start))
+        for start, ends in enumerate(self.epsilons):
+            for end in ends:
+                epsilons[end].append(start)
+        self.transitions = transitions
+        self.epsilons = epsilons
+        return fragment[1], fragment[0]
+
+    def closure(self, states)->frozenset:
+        """
+        Returns an epsilon closure of states.
+
+        :param states: iterable of states
+        :return frozenset: all states reachable through epsilon transitions
+        """
+        epsilons = self.epsilons
+        reached = set(states)
+        stack = list(reached)
+        while stack:
+            for end in epsilons[stack.pop()]:
+                if end not in reached:
+                    reached.add(end)
+                    stack.append(end)
+        return frozenset(reached)
+
+    def _classes(self)->tuple:
+        """
+        Splits all transition intervals into disjoint atoms and groups atoms
+        covered by exactly the same transitions into equivalence classes.
+        Characters of one class can never be told apart by the automaton.
+
+        :return tuple: (sorted code points where atoms start, class of each atom or None)
+        """
+        bounds = set()
+        for transitions in self.transitions:
+            for first, last, _ in transitions:
+                bounds.add(first)
+                bounds.add(last + 1)
+        bounds = sorted(bounds)
+
+        signatures = [[] for _ in bounds] # atom -> transitions covering it
+        transition = 0
+        for transitions in self.transitions:
+            for first, last, _ in transitions:
+                for atom in range(bisect.bisect_left(bounds, first), bisect.bisect_left(bounds, last + 1)):
+                    signatures[atom].append(transition)
+                transition += 1
+
+        classes = dict() # signature -> class
+        atom_classes = [classes.setdefault(tuple(signature), len(classes)) if signature else None
+                        for signature in signatures]
+        return bounds, atom_classes
+
+    def _expand(self)->tuple:
+        """
+        Groups characters into classes (see _classes) and lists the moves of every state per class.
+        Every class is named by its first character.
+
+        :return tuple: (atom bounds, class of each atom, state -> {class: [states]},
+                        class -> symbol, sorted classes)
+        """
+        bounds, atom_classes = self._classes()
+
+        expanded = [] # state -> {class: [states]}
+        for transitions in self.transitions:
+            classes = dict()
+            for first, last, end in transitions:
+                for atom in range(bisect.bisect_left(bounds, first), bisect.bisect_left(bounds, last + 1)):
+                    ends = classes.setdefault(atom_classes[atom], [])
+                    if not ends or ends[-1] != end:
+                        ends.append(end)
+            expanded.append(classes)
+
+        symbols = dict()
+        for bound, atom_class in zip(bounds, atom_classes):
+            if atom_class is not None and atom_class not in symbols:
+                symbols[atom_class] = chr(bound)
+        return bounds, atom_classes, expanded, symbols, sorted(symbols)
+
+    def _determinize(self, fragment: tuple, budget: Budget = None)->tuple:
+        """
+        Determinizes the built automaton by subset construction over character classes
+        and minimizes it (see minimize).
+        Raises a StateExplosionError as soon as the subset construction exceeds the budget.
+
+        :param tuple fragment: the whole automaton
+        :param Budget budget: limits of the subset construction, None for no limits
+        :return tuple: (atom bounds, class of each atom, class -> symbol, sorted classes,
+                        row -> [row per class], row -> accepting, row -> block, number of blocks)
+        """
+        started = time.perf_counter()
+        start, accepting = fragment
+        bounds, atom_classes, expanded, symbols, inputs = self._expand()
+
+        rows = dict() # subset -> row
+        subsets = []
+        moves = [] # row -> [row per class]
+
+        def row_of(subset: frozenset)->int:
+            if subset not in rows:
+                rows[subset] = len(subsets)
+                subsets.append(subset)
+            return rows[subset]
+
+        row_of(self.closure((start,)))
+        while len(moves) < len(subsets):
+            if budget is not None:
+                budget.check(len(subsets), started)
+            targets = dict()
+            for state in subsets[len(moves)]:
+                for atom_class, ends in expanded[state].items():
+                    targets.setdefault(atom_class, set()).update(ends)
+            moves.append([row_of(self.closure(targets.get(atom_class, ()))) for atom_class in inputs])
+
+        accepted = [accepting in subset for subset in subsets]
+        blocks, count = minimize(moves, accepted)
+        return bounds, atom_classes, symbols, inputs, moves, accepted, blocks, count
+
+    def to_dfa(self, fragment: tuple, budget: Budget = None)->dfa.DFA:
+        """
+        Determinizes the built automaton by subset construction over character classes
+        and minimizes it (see minimize) before any State is created.
+        States are named q0, q1... in breadth-first order; a dead state is kept, so the DFA is complete.
+        Raises a StateExplosionError as soon as the subset construction exceeds the budget.
+
+        :param tuple fragment: the whole automaton
+        :param Budget budget: limits of the subset construction, None for no limits
+        :return DFA: minimal, complete DFA with an alphabet partition
+        """
+        bounds, atom_classes, symbols, inputs, moves, accepted, blocks, count = self._determinize(fragment, budget)
+        states = [None] * count
+        for row, block in enumerate(blocks):
+            if states[block] is None:
+                states[block] = st.State('q{}'.format(block), int(accepted[row]))
+        for row, block in enumerate(blocks):
+            state = states[block]
+            if not state.transitions:
+                for atom_class, target in zip(inputs, moves[row]):
+                    state.transitions[symbols[atom_class]] = {states[blocks[target]]}
+        automaton = dfa.DFA({state.name: state for state in states},
+                            [symbols[atom_class] for atom_class in inputs], states[0])
+        automaton.partition = ab.Partition(bounds, [None if atom_class is None else symbols[atom_class]
+                                                    for atom_class in atom_classes])
+        return automaton
+
+    def to_rows(self, fragment: tuple, budget: Budget = None)->tuple:
+        """
+        Determinizes and minimizes the built automaton into compact rows of code point
+        intervals, which any builder can embed (see embed) without determinizing it again.
+        Rows from which nothing is accepted are left out. Raises a StateExplosionError like to_dfa.
+
+        :param tuple fragment: the whole automaton
+        :param Budget budget: limits of the subset construction, None for no limits
+        :return tuple: (row -> [(first, last, row)], row -> accepting), row 0 is the start
+        """
+        bounds, atom_classes, symbols, inputs, moves, accepted, blocks, count = self._determinize(fragment, budget)
+        columns = {atom_class: column for column, atom_class in enumerate(inputs)}
+        block_moves = [None] * count
+        block_accepted = [False] * count
+        for row, block in enumerate(blocks):
+            block_moves[block] = moves[row]
+            block_accepted[block] = accepted[row]
+
+        predecessors = [set() for _ in range(count)]
+        for block, move in enumerate(block_moves):
+            for target in move:
+                predecessors[blocks[target]].add(block)
+        live = {block for block in range(count) if block_accepted[block]}
+        stack = list(live)
+        while stack:
+            for previous in predecessors[stack.pop()]:
+                if previous not in live:
+                    live.add(previous)
+                    stack.append(previous)
+        numbers = {block: number for number, block in enumerate(sorted(live))}
+
+        atoms = [(bound, (bounds[index + 1] if index + 1 < len(bounds) else ab.MAX_CODE_POINT + 1) - 1,
+                  columns[atom_class]) for index, (bound, atom_class) in enumerate(zip(bounds, atom_classes))
+                 if atom_class is not None]
+        rows = []
+        for block in sorted(live):
+            transitions = []
+            for first, last, column in atoms:
+                target = blocks[block_moves[block][column]]
+                if target in live:
+                    if transitions and transitions[-1][1] == first - 1 and transitions[-1][2] == numbers[target]:
+                        transitions[-1] = (transitions[-1][0], last, numbers[target])
+                    else:
+                        transitions.append((first, last, numbers[target]))
+            rows.append(transitions)
+        if not rows: # nothing is accepted at all
+            return [[]], [False]
+        return rows, [block_accepted[block] for block in sorted(live)]
+
+    def to_epsilon_nfa(self, fragment: tuple, epsilon: str = '$')->nfa.EpsilonNFA:
+        """
+        Converts the built automaton into an EpsilonNFA with states named s0, s1... by their ids.
+        EpsilonNFA inputs are characters, so every interval is expanded into its characters.
+
+        :param tuple fragment: the whole automaton
+        :param str epsilon: epsilon symbol, must not be one of the inputs
+        :return EpsilonNFA: epsilon NFA
+        """
+        start, accepting = fragment
+        states = [st.State('s{}'.format(index), int(index == accepting), epsilon) for index in range(self.size)]
+        inputs = set()
+        for state, transitions, epsilons in zip(states, self.transitions, self.epsilons):
+            for first, last, end in transitions:
+                for code in range(first, last + 1):
+                    state.transitions.setdefault(chr(code), set()).add(states[end])
+                    inputs.add(chr(code))
+            if epsilons:
+                state.transitions[epsilon] = {states[end] for end in epsilons}
+        if epsilon in inputs:
+            raise ValueError('Epsilon symbol {!r} is also an input.'.format(epsilon))
+        return nfa.EpsilonNFA({state.name: state for state in states}, inputs, states[start], epsilon)
@@ -183,6 +183,17 @@ class TuringMachine(dfa.DFA):
         self.tape.add(*entry)
         return super().enter(*entry)
 
+    def _snapshot_state(self):
+        state = super()._snapshot_state()
+        state['tape'] = list(self.tape._container)
+        state['head'] = self.tape._index
+        return state
+
+    def _restore_state(self, state):
+        super()._restore_state(state)
+        self.tape = pk.Tape(*state['tape'])
+        self.tape._index = state['head']
+
     def _access(self, value):
         raise NotImplementedError('Access method is not needed in a Turing machine.')
 
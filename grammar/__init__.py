@@ -1,4 +1,4 @@
 """
 Package that deals with grammars and all mechanisms under them.
 """
-from . import operators, regular_expressions, lexers
\ No newline at end of file
+from . import operators, syntax, optimizer, analysis, matchers, regular_expressions, lexers, streams
\ No newline at end of file
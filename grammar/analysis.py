@@ -0,0 +1,295 @@
+"""
+Defines analyses of operator trees.
+
+properties finds whether an operator matches the empty text, how long its matches
+can be and which characters they can start with. Operators never change once
+created, so the result is computed once and kept on every operator node.
+
+literals finds strings that every match of an operator starts with, ends with
+or contains. A search can then use str.find, which runs in C, to reject texts
+and to skip straight to candidate positions instead of running an automaton
+over every character.
+"""
+import bisect
+import automata.alphabet as ab
+import grammar.operators as operators
+
+class Properties:
+    """
+    Static properties of all matches of an operator.
+    """
+
+    def __init__(self, nullable: bool, min_length: int, max_length: int, first: list):
+        """
+        :param bool nullable: the empty text is matched
+        :param int min_length: length of the shortest match
+        :param int max_length: length of the longest match, None if unbounded
+        :param list first: sorted, disjoint (first, last) code point intervals of characters matches start with
+        """
+        self.nullable = nullable
+        self.min_length = min_length
+        self.max_length = max_length
+        self.first = first
+        self._starts = [first for first, _ in first]
+
+    @property
+    def finite(self)->bool:
+        """
+        :return bool: True if there are finitely many matches
+        """
+        return self.max_length is not None
+
+    def __eq__(self, other):
+        return isinstance(other, Properties) and (self.nullable, self.min_length, self.max_length, self.first) == \
+            (other.nullable, other.min_length, other.max_length, other.first)
+
+    def __repr__(self):
+        return 'Properties(nullable={}, min_length={}, max_length={}, first={})'.format(
+            self.nullable, self.min_length, self.max_length, self.first)
+
+    def starts_with(self, char: str)->bool:
+        """
+        :param str char: a single character
+        :return bool: True if a match can start with the character
+        """
+        index = bisect.bisect_right(self._starts, ord(char)) - 1
+        return index >= 0 and ord(char) <= self.first[index][1]
+
+    def admits(self, text: str, start: int = 0, end: int = None)->bool:
+        """
+        Rules out text[start:end] by its length and its first character in O(log #intervals).
+        A False result is certain, a True one has to be checked by matching.
+
+        :param str text: input text
+        :param int start: index where the part starts
+        :param int end: index where the part ends, the end of the text by default
+        :return bool: False if the part can't be matched
+        """
+        length = (len(text) if end is None else min(end, len(text))) - start
+        if length < self.min_length or self.max_length is not None and length > self.max_length:
+            return False
+        return length == 0 or self.starts_with(text[start])
+
+def properties(item)->Properties:
+    """
+    Finds static properties of a string or an operator, computing them only once per operator.
+
+    :param item: a string or an operator
+    :return Properties: properties of all matches
+    """
+    if isinstance(item, str):
+        return Properties(not item, len(item), len(item), [(ord(item[0]), ord(item[0]))] if item else [])
+    if item._properties is None:
+        item._properties = _properties(item)
+    return item._properties
+
+def _properties(item)->Properties:
+    """
+    :param Operator item: an operator
+    :return Properties: properties of all matches, see properties
+    """
+    if isinstance(item, (operators.Collation, operators.CharacterClass)):
+        return Properties(False, 1, 1, item.intervals)
+    if isinstance(item, operators.Concatenation):
+        parts = [properties(sub_item) for sub_item in item._items]
+        first = []
+        for part in parts:
+            first += part.first
+            if not part.nullable:
+                break
+        return Properties(all(part.nullable for part in parts), sum(part.min_length for part in parts),
+                          _sum([part.max_length for part in parts]), ab.normalize(first))
+    if isinstance(item, operators.Alternation):
+        parts = [properties(sub_item) for sub_item in item._items]
+        maximum = [part.max_length for part in parts]
+        return Properties(any(part.nullable for part in parts), min(part.min_length for part in parts),
+                          None if None in maximum else max(maximum),
+                          ab.normalize(interval for part in parts for interval in part.first))
+
+    inner = properties(item._item)
+    if isinstance(item, operators.Single):
+        return inner
+    if isinstance(item, operators.Repetition):
+        minimum, maximum = item.minimum, item.maximum
+    elif isinstance(item, operators.KleeneStar):
+        minimum, maximum = 0, None
+    elif isinstance(item, operators.KleenePlus):
+        minimum, maximum = 1, None
+    elif isinstance(item, operators.QuestionMark):
+        minimum, maximum = 0, 1
+    else:
+        raise TypeError('{} can not be analysed'.format(item.__class__.__name__))
+    if maximum == 0:
+        return Properties(True, 0, 0, [])
+    if inner.max_length == 0:
+        max_length = 0
+    elif maximum is None or inner.max_length is None:
+        max_length = None
+    else:
+        max_length = inner.max_length * maximum
+    return Properties(minimum == 0 or inner.nullable, inner.min_length * minimum, max_length, inner.first)
+
+def _sum(lengths: list)->int:
+    """
+    :param list lengths: lengths, None for unbounded ones
+    :return int: sum of the lengths, None if any is unbounded
+    """
+    return None if None in lengths else sum(lengths)
+
+class Literals:
+    """
+    Strings required by every match of an operator.
+    """
+
+    def __init__(self, exact: str = None, prefix: str = '', suffix: str = '', required: str = ''):
+        """
+        Initialises literals. A known exact string is also the prefix, suffix and required string.
+
+        :param str exact: the only string matched, None if there are more (or none)
+        :param str prefix: string every match starts with
+        :param str suffix: string every match ends with
+        :param str required: longest known string every match contains
+        """
+        if exact is not None:
+            prefix = suffix = required = exact
+        self.exact = exact
+        self.prefix = prefix
+        self.suffix = suffix
+        self.required = max(required, prefix, suffix, key=len)
+
+    def __eq__(self, other):
+        return isinstance(other, Literals) and (self.exact, self.prefix, self.suffix, self.required) == \
+            (other.exact, other.prefix, other.suffix, other.required)
+
+    def __repr__(self):
+        return 'Literals(exact={!r}, prefix={!r}, suffix={!r}, required={!r})'.format(
+            self.exact, self.prefix, self.suffix, self.required)
+
+NONE = Literals() # nothing is required, for example by a nullable operator
+
+def literals(item)->Literals:
+    """
+    Finds strings required by every match of a string or an operator.
+
+    :param item: a string or an operator
+    :return Literals: required strings
+    """
+    if isinstance(item, str):
+        return Literals(item)
+    if isinstance(item, (operators.Single, operators.KleenePlus)):
+        inner = literals(item._item)
+        if isinstance(item, operators.Single):
+            return inner
+        # repetitions are not known, but every one of them starts and ends the same way.
+        return Literals(None, inner.prefix, inner.suffix, inner.required)
+    if isinstance(item, (operators.Collation, operators.CharacterClass)):
+        intervals = item.intervals
+        if len(intervals) == 1 and intervals[0][0] == intervals[0][1]:
+            return Literals(chr(intervals[0][0]))
+        return NONE
+    if isinstance(item, operators.Concatenation):
+        result = Literals('')
+        for sub_item in item._items:
+            result = _concatenate(result, literals(sub_item))
+        return result
+    if isinstance(item, operators.Alternation):
+        return _alternate([literals(sub_item) for sub_item in item._items])
+    if isinstance(item, operators.Repetition) and item.minimum:
+        inner = literals(item._item)
+        result = inner
+        for _ in range(item.minimum - 1):
+            result = _concatenate(result, inner)
+        return result if item.maximum == item.minimum else _concatenate(result, NONE)
+    return NONE
+
+def _concatenate(first: Literals, second: Literals)->Literals:
+    """
+    :param Literals first: literals of the first part
+    :param Literals second: literals of the second part
+    :return Literals: literals of both parts one after another
+    """
+    if first.exact is not None and second.exact is not None:
+        return Literals(first.exact + second.exact)
+    prefix = first.prefix if first.exact is None else first.exact + second.prefix
+    suffix = second.suffix if second.exact is None else first.suffix + second.exact
+    return Literals(None, prefix, suffix, max(first.required, second.required, first.suffix + second.prefix,
+                                              key=len))
+
+def _alternate(alternatives: list)->Literals:
+    """
+    :param list alternatives: literals of all alternatives
+    :return Literals: literals of any one of the alternatives
+    """
+    exact = {alternative.exact for alternative in alternatives}
+    if len(exact) == 1 and None not in exact:
+        return alternatives[0]
+    prefixes = [alternative.prefix for alternative in alternatives]
+    suffixes = [alternative.suffix[::-1] for alternative in alternatives]
+    return Literals(None, _common_prefix(prefixes), _common_prefix(suffixes)[::-1])
+
+def _common_prefix(texts: list)->str:
+    """
+    :param list texts: strings
+    :return str: longest common prefix of all strings
+    """
+    shortest = min(texts, key=len)
+    for index, char in enumerate(shortest):
+        if any(text[index] != char for text in texts):
+            return shortest[:index]
+    return shortest
+
+def strings(item, limit: int)->frozenset:
+    """
+    Lists all strings matched by a string or an operator, if there are only a few.
+
+    :param item: a string or an operator
+    :param int limit: maximum number of strings
+    :return frozenset: all matched strings or None if there are more than limit (or infinitely many)
+    """
+    if isinstance(item, str):
+        result = {item}
+    elif isinstance(item, operators.Single):
+        return strings(item._item, limit)
+    elif isinstance(item, (operators.Collation, operators.CharacterClass)):
+        if sum(last - first + 1 for first, last in item.intervals) > limit:
+            return None
+        result = set(item.all_characters)
+    elif isinstance(item, operators.QuestionMark):
+        inner = strings(item._item, limit - 1)
+        if inner is None:
+            return None
+        result = inner | {''}
+    elif isinstance(item, operators.Alternation):
+        result = set()
+        for sub_item in item._items:
+            inner = strings(sub_item, limit)
+            if inner is None:
+                return None
+            result |= inner
+            if len(result) > limit:
+                return None
+    elif isinstance(item, operators.Concatenation):
+        result = {''}
+        for sub_item in item._items:
+            inner = strings(sub_item, limit)
+            if inner is None or len(result) * len(inner) > limit:
+                return None
+            result = {first + second for first in result for second in inner}
+    elif isinstance(item, operators.Repetition) and item.maximum is not None:
+        inner = strings(item._item, limit)
+        if inner is None:
+            return None
+        result = set()
+        repeated = {''}
+        for count in range(item.maximum + 1):
+            if count >= item.minimum:
+                result |= repeated
+            if len(result) > limit:
+                return None
+            if count < item.maximum:
+                if len(repeated) * len(inner) > limit:
+                    return None
+                repeated = {first + second for first in repeated for second in inner}
+    else: # unbounded repetitions
+        return None
+    return frozenset(result) if len(result) <= limit else None
@@ -0,0 +1,310 @@
+"""
+Defines caches of compiled regexes: a bounded in-process LRU cache
+and a content-addressed on-disk cache.
+
+Compiled automata are keyed by a hash of the regex text, the artifact format and
+the version of regex semantics, so a changed expression never loads a stale
+automaton, a format change never loads an incompatible artifact and a parser or
+compiler change never loads an automaton of what the text used to mean.
+"""
+import collections
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import automata.binary as bn
+import automata.dfa as dfa
+
+SEMANTICS = 2 # bump whenever the parser or the compiler gives a regex text another meaning
+FORMAT = 'lingua-dfa-binary-{}-semantics-{}'.format(bn.VERSION, SEMANTICS) # part of every cache key
+SUFFIX = '.dfa'
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024 # bytes
+DEFAULT_MAX_ENTRIES = 512 # compiled regexes kept in memory
+
+def default_directory()->str:
+    """
+    Returns the default cache directory.
+    LINGUA_CACHE_DIR environment variable takes precedence over the user cache directory.
+
+    :return str: cache directory path
+    """
+    directory = os.environ.get('LINGUA_CACHE_DIR')
+    if directory:
+        return directory
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'lingua')
+
+class LRUCache:
+    """
+    Bounded, thread-safe least recently used cache with hit, miss and eviction counters.
+
+    Values are created outside the lock, so a slow creation doesn't block other
+    threads; two threads missing the same key at once may both create the value,
+    and the first one stored wins.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialises an empty cache.
+
+        :param int max_size: maximum number of entries, 0 disables caching
+        """
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self)->int:
+        """
+        :return int: maximum number of entries
+        """
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int):
+        """
+        Changes the maximum number of entries, evicting entries over the new limit.
+
+        :param int max_size: maximum number of entries, 0 disables caching
+        :return:
+        """
+        with self._lock:
+            self._max_size = max_size
+            self._evict()
+
+    def _evict(self):
+        """
+        Removes least recently used entries over the size limit. The lock must be held.
+
+        :return:
+        """
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        """
+        Returns a cached value and marks it as recently used.
+
+        :param key: hashable key
+        :param default: value returned on a miss
+        :return: cached value or default
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Stores a value, evicting the least recently used entry if the cache is full.
+
+        :param key: hashable key
+        :param value: value
+        :return:
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_or_create(self, key, create):
+        """
+        Returns a cached value, creating and storing it on a miss.
+
+        :param key: hashable key
+        :param create: function without arguments that creates the value
+        :return: cached or created value
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = create()
+            with self._lock:
+                value = self._entries.setdefault(key, value)
+                self._entries.move_to_end(key)
+                self._evict()
+        return value
+
+    def clear(self):
+        """
+        Removes all entries and resets the counters.
+
+        :return:
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self)->dict:
+        """
+        :return dict: hits, misses, evictions, current and maximum size
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entries), 'max_size': self._max_size}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+class CompileCache:
+    """
+    On-disk cache of compiled regex automata.
+
+    Artifacts are written to a temporary file and atomically renamed, so concurrent
+    processes never read a partially written artifact. When the cache grows over
+    its size limit the least recently used artifacts are removed.
+    All file system errors are ignored: an unusable cache only means compiling again.
+    """
+
+    def __init__(self, directory: str = None, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Initialises a cache. The directory is created on first store.
+
+        :param str directory: cache directory, see default_directory
+        :param int max_size: maximum total size of all artifacts in bytes
+        """
+        self.directory = directory or default_directory()
+        self.max_size = max_size
+
+    @staticmethod
+    def key(text: str)->str:
+        """
+        Returns the key of a regex text.
+
+        :param str text: regex text
+        :return str: hexadecimal key
+        """
+        return hashlib.sha256((FORMAT + '\0' + text).encode()).hexdigest()
+
+    def _path(self, text: str)->str:
+        return os.path.join(self.directory, self.key(text) + SUFFIX)
+
+    def load(self, text: str):
+        """
+        Loads a compiled automaton of a regex text.
+
+        :param str text: regex text
+        :return DFA: compiled automaton or None if it's not cached
+        """
+        path = self._path(text)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            os.utime(path) # marks the artifact as recently used
+        except OSError:
+            return None
+        try:
+            return bn.loads(data)
+        except (ValueError, struct.error): # damaged artifact, compile again
+            return None
+
+    def map(self, text: str):
+        """
+        Memory-maps a compiled automaton of a regex text without deserializing it.
+        The returned view should be closed when it's no longer used.
+
+        :param str text: regex text
+        :return MappedDFA: mapped automaton or None if it's not cached
+        """
+        try:
+            return bn.MappedDFA(self._path(text))
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def store(self, text: str, automaton: dfa.DFA):
+        """
+        Stores a compiled automaton of a regex text.
+
+        :param str text: regex text
+        :param DFA automaton: compiled automaton
+        :return:
+        """
+        data = bn.dumps(automaton)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(descriptor, 'wb') as file:
+                    file.write(data)
+                os.replace(temporary, self._path(text))
+            except BaseException:
+                os.remove(temporary)
+                raise
+        except OSError:
+            return
+        self._evict()
+
+    def _artifacts(self)->list:
+        """
+        Returns all artifacts, least recently used first.
+
+        :return list: (modification time, size, path) tuples
+        """
+        artifacts = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return artifacts
+        for name in names:
+            if not name.endswith(SUFFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError: # removed by another process
+                continue
+            artifacts.append((stat.st_mtime, stat.st_size, path))
+        return sorted(artifacts)
+
+    @property
+    def size(self)->int:
+        """
+        :return int: total size of all artifacts in bytes
+        """
+        return sum(size for _, size, _ in self._artifacts())
+
+    def _evict(self):
+        """
+        Removes least recently used artifacts until the cache fits its size limit.
+
+        :return:
+        """
+        artifacts = self._artifacts()
+        total = sum(size for _, size, _ in artifacts)
+        for _, size, path in artifacts:
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """
+        Removes all artifacts.
+
+        :return:
+        """
+        for _, _, path in self._artifacts():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+CACHE = CompileCache()
+COMPILED = LRUCache()
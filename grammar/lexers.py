@@ -2,8 +2,16 @@
 Defines all Lexer implementations.
 """
 import abc
+import json
+import struct
+import automata.binary as bn
+import automata.tables as tb
 import grammar.regular_expressions as rgx
 
+BINARY_HEADER = struct.Struct('<4sHxxI') # magic, version and regex count of a lexer bundle
+BINARY_MAGIC = b'LNGL'
+BINARY_VERSION = 1
+
 class BasicToken:
     """
     Defines a interface that all tokens have to follow.
@@ -65,6 +73,7 @@ class Lexer:
             except AssertionError as e:
                 print(type(regex), e)
         self._ignored = set()
+        self._candidates = dict() # first character -> [(regex, min lookahead)], see _starting_with
 
     def add_ignored_characters(self, *ignored):
         """
@@ -124,6 +133,49 @@ class Lexer:
     #         tokens.append(Token(current_regex.name, text[start_index:]))
     #     return tokens
 
+    def dumps(self)->bytes:
+        """
+        Serializes a lexer (all regexes in precedence order and ignored characters)
+        into a binary bundle. See RegEx.dumps for the regex format.
+        Raises a ValueError if a regex runs a lazy DFA.
+
+        :return bytes: binary lexer bundle
+        """
+        return BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(self._regexes)) + \
+            bn.frame(json.dumps(sorted(self._ignored)), *[regex.dumps() for regex in self._regexes])
+
+    @staticmethod
+    def loads(data)->'Lexer':
+        """
+        Deserializes a lexer bundle created by dumps without compiling any regex.
+
+        :param data: buffer protocol object containing a lexer bundle
+        :return Lexer: lexer
+        """
+        magic, version, count = BINARY_HEADER.unpack_from(data, 0)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError('Not a lexer bundle of version {}.'.format(BINARY_VERSION))
+        (ignored, *regexes), _ = bn.unframe(data, BINARY_HEADER.size, count + 1)
+        lexer = Lexer(*[rgx.RegEx.loads(regex) for regex in regexes])
+        return lexer.add_ignored_characters(*json.loads(str(ignored, 'utf-8')))
+
+    def _starting_with(self, char: str)->list:
+        """
+        Returns regexes that can match a text starting with a character, in precedence order.
+        Found once per character from static properties of the regexes (see grammar.analysis),
+        so a scan doesn't run regexes that can't match at all.
+
+        :param str char: first character of a text
+        :return list: (regex, min lookahead) pairs
+        """
+        candidates = self._candidates.get(char)
+        if candidates is None:
+            candidates = [(regex, regex.min_lookahead) for regex in self._regexes
+                          if regex.nullable or regex.properties.starts_with(char)]
+            if len(self._candidates) < tb.MAX_CACHED_CHARACTERS:
+                self._candidates[char] = candidates
+        return candidates
+
     def _backtrack(self, tokens):
         """
         Backtracks through tokens and tries to merge them together.
@@ -180,11 +232,11 @@ class Lexer:
             char = text[i]
             if start_index == -1:
                 continue_flag = False
-                for regex in self._regexes:
-                    result = regex.check(text[i: i + regex.min_lookahead])
+                for regex, lookahead in self._starting_with(char):
+                    result = regex.check(text[i: i + lookahead])
                     if result:
                         start_index = i
-                        i += regex.min_lookahead - 1
+                        i += lookahead - 1
                         # print('found', "'"+text[start_index:i + 1]+"'")
                         current_regex = regex
                         continue_flag = True
@@ -197,7 +249,7 @@ class Lexer:
                 if current_regex.check(text[start_index:i + 1]):
                     continue_flag = True
                 else:
-                    for regex in self._regexes:
+                    for regex, _ in self._starting_with(text[start_index]):
                         if regex.check(text[start_index:i + 1]) and regex != current_regex:
                             continue_flag = True
                             current_regex = regex
@@ -0,0 +1,64 @@
+"""
+Defines specialized matchers for regexes of trivial shapes.
+
+Most regexes of a lexer are plain literals, a few alternative literals or
+repeated character classes. Checking them doesn't need an automaton at all:
+    - a literal is compared with ==
+    - a few literals (or a small character class) are looked up in a frozenset
+    - a repeated small character class is stripped off the text with str.strip
+All of these run in C, unlike the per-character loop of a transition table.
+"""
+import functools
+import operator
+import grammar.analysis as an
+import grammar.operators as operators
+
+MAX_STRINGS = 256 # strings of a finite regex kept in a set
+MAX_CLASS_SIZE = 256 # characters of a repeated class passed to str.strip
+
+def matcher(item):
+    """
+    Creates a specialized full-match function of a regex, if its shape allows one.
+
+    :param item: root operator
+    :return: function taking a str and returning a bool, or None if an automaton is needed
+    """
+    matched = an.strings(item, MAX_STRINGS)
+    if matched is not None:
+        if len(matched) == 1:
+            literal, = matched
+            return functools.partial(operator.eq, literal)
+        return matched.__contains__
+    if isinstance(item, operators.Single):
+        return matcher(item._item) if isinstance(item._item, operators.Operator) else None
+    if isinstance(item, (operators.KleeneStar, operators.KleenePlus)):
+        characters = _characters(item._item)
+        if characters is None:
+            return None
+        if isinstance(item, operators.KleeneStar):
+            return functools.partial(_repeated, characters, True)
+        return functools.partial(_repeated, characters, False)
+    return None
+
+def _characters(item)->str:
+    """
+    :param item: a string or an operator
+    :return str: all characters of a single character or a small class, None for anything else
+    """
+    if isinstance(item, str):
+        return item if len(item) == 1 else None
+    if isinstance(item, (operators.Collation, operators.CharacterClass)) and \
+            sum(last - first + 1 for first, last in item.intervals) <= MAX_CLASS_SIZE:
+        return ''.join(item.all_characters)
+    return None
+
+def _repeated(characters: str, empty: bool, text: str)->bool:
+    """
+    Checks if a text is made only of given characters.
+
+    :param str characters: allowed characters
+    :param bool empty: an empty text is accepted
+    :param str text: input text
+    :return bool: True if accepted, False if not
+    """
+    return not text.strip(characters) and (empty or text != '')
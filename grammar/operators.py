@@ -1,13 +1,25 @@
 """
 Defines all operator abstractions and their respective default operators.
+
+Operators never change once created. intern hash-conses operator trees, so structurally
+identical sub-expressions of all regexes in a process are one shared operator, and a
+sub-expression used more than once is compiled only once (see Operator._embed).
+
+By default an operator tree is built into one epsilon NFA that is determinized and
+minimised as a whole. A Minimization strategy compiles bottom-up instead: chosen
+sub-expressions are determinized and minimised on their own first, so the automata
+combined above them (and the peak memory of compiling) stay small.
 """
 import abc
+import threading
+import time
+import weakref
 import automata.nfa as nfa
-import automata.dfa as dfa
-import form.generators as generator
+import automata.alphabet as ab
+import automata.thompson as th
+import automata.lazy as lz
+import grammar.analysis as an
 import misc.errors as err
-import misc.helper as helper
-import automata.cast_api as api
 
 class Operator(abc.ABC):
     """
@@ -19,8 +31,27 @@ class Operator(abc.ABC):
     # if it's empty the operator takes in any type
     _item_types = set()
 
+    # limits of determinization in execute, None disables them.
+    budget = th.Budget(max_states=20000, max_seconds=10.0)
+    # compile strategy of execute, see Minimization. None builds a single epsilon NFA.
+    strategy = None
+
     def __init__(self, operator):
         self._operator = operator
+        self._properties = None # static properties, computed on first use by grammar.analysis
+        self._interned = False # True for the shared operator of its structure, see intern
+        self._uses = 0 # number of places an interned operator is used in
+        self._rows = None # compiled rows (see Builder.to_rows) or False if it isn't worth it, see _embed
+        self._size = None # number of states of the operator's own fragment, see _embed
+
+    def _key(self)->tuple:
+        """
+        Returns a structural key. Sub-operators are compared by identity, so
+        the key identifies the whole structure once sub-operators are interned.
+
+        :return tuple: hashable key
+        """
+        return self.__class__, self._operator
 
     @property
     def valid_item_types(self):
@@ -53,40 +84,134 @@ class Operator(abc.ABC):
                 item.__class__.__name__))
 
     @abc.abstractmethod
+    def _build(self, builder: th.Builder)->tuple:
+        """
+        Builds the operator in place into a Thompson builder.
+
+        :param Builder builder: builder that holds the whole automaton
+        :return tuple: (start state, end state) fragment
+        """
+        pass
+
     def _assemble(self)->nfa.EpsilonNFA:
         """
         Assembles the operator into an Epsilon NFA
 
-        :return:
+        :return EpsilonNFA: epsilon NFA with states named by their ids
         """
-        pass
+        builder = th.Builder()
+        return builder.to_epsilon_nfa(self._build(builder))
 
-    def execute(self)->dfa.DFA:
+    def execute(self, reverse: bool = False, unanchored: bool = False, budget: th.Budget = None,
+                strategy: 'Minimization' = None):
         """
         Executes the Operator: returns a DFA that describes the operation results.
 
-        :return DFA: minimised DFA
+        If determinization exceeds the budget, a LazyDFA (see automata.lazy) is returned
+        instead. It accepts the same texts, creates DFA states only as texts reach them
+        and its cause is a StateExplosionError naming the sub-expression that blew up.
+
+        :param bool reverse: the DFA accepts reversed texts
+        :param bool unanchored: the DFA accepts every text ending with a match, as if prefixed with .*
+        :param Budget budget: limits of determinization, Operator.budget by default
+        :param Minimization strategy: sub-expressions minimised on their own, Operator.strategy by default
+        :return DFA: minimised DFA or LazyDFA
         """
         # import misc.visual as vis
         # vis.save_graph(self._assemble())
-        dfa_output = api.epsilon_nfa_to_dfa(self._assemble())
-        dfa_output.minimize()
+        budget = self.budget if budget is None else budget
+        builder = th.Builder(self.strategy if strategy is None else strategy)
+        fragment = self._fragment(builder, reverse, unanchored)
+        try:
+            dfa_output = builder.to_dfa(fragment, budget) # already minimal
+        except err.StateExplosionError as error:
+            error.item = self._culprit(reverse, unanchored, budget)
+            return lz.LazyDFA(builder, fragment, budget.max_states, error)
+        dfa_output.compress_alphabet()
         for index, state in enumerate(sorted(list(dfa_output.states))):
             dfa_output.rename_state(state.name, str(index))
         dfa_output._alias.clear()
         return dfa_output
 
+    def _fragment(self, builder: th.Builder, reverse: bool, unanchored: bool)->tuple:
+        """
+        Builds the operator into a builder for execute.
+
+        :param Builder builder: empty builder
+        :param bool reverse: the automaton accepts reversed texts
+        :param bool unanchored: the automaton accepts every text ending with a match
+        :return tuple: the whole automaton
+        """
+        fragment = self._build(builder)
+        if reverse:
+            fragment = builder.reverse(fragment)
+        if unanchored:
+            fragment = builder.unanchored(fragment)
+        return fragment
+
+    def _culprit(self, reverse: bool, unanchored: bool, budget: th.Budget, deadline: float = None):
+        """
+        Finds the smallest sub-expression whose own DFA exceeds the budget.
+        Called once this operator's DFA exceeded it. All attempts share a single deadline,
+        budget.max_seconds from the first call, so the whole search takes no longer than
+        one determinization; once it passes, the smallest culprit found so far is returned.
+
+        :param bool reverse: DFAs accept reversed texts
+        :param bool unanchored: DFAs accept every text ending with a match
+        :param Budget budget: limits of determinization
+        :param float deadline: time.perf_counter() when the search stops, set by the first call
+        :return Operator: this operator or one of its sub-expressions
+        """
+        if deadline is None and budget.max_seconds is not None:
+            deadline = time.perf_counter() + budget.max_seconds
+        for item in _operands(self):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            builder = th.Builder()
+            try:
+                builder.to_dfa(item._fragment(builder, reverse, unanchored), budget.until(deadline))
+            except err.StateExplosionError:
+                return item._culprit(reverse, unanchored, budget, deadline)
+        return self
+
+    def _embed(self, builder: th.Builder, min_states: int = 0)->tuple:
+        """
+        Builds the operator into a builder out of its compiled rows, compiling them on first use.
+        The rows are minimised, so they're never bigger than the operator's own fragment;
+        if they would be, or their DFA exceeds the budget, the operator is built as usual.
+
+        :param Builder builder: builder that holds the whole automaton
+        :param int min_states: fragments smaller than this are built as usual, not compiled
+        :return tuple: fragment
+        """
+        if self._rows is False or self._size is not None and self._size < min_states:
+            return self._build(builder)
+        if self._rows is None:
+            own = th.Builder(builder.strategy)
+            fragment = self._build(own)
+            self._size = own.size
+            if own.size < min_states:
+                return builder.include(own, fragment)
+            try:
+                rows = own.to_rows(fragment, self.budget)
+                self._rows = rows if len(rows[0]) < own.size else False
+            except err.StateExplosionError:
+                self._rows = False
+            if self._rows is False:
+                return builder.include(own, fragment)
+        return builder.embed(self._rows)
+
     @property
-    @abc.abstractmethod
     def min_length(self)->int:
         """
         Property that returns a minimum length for a defined operator.
+        Computed once, see grammar.analysis.properties.
 
         For example Kleene star has minimum length 0, while Single 'ab' has length 2.
 
         :return int: minimum length of an operator
         """
-        pass
+        return an.properties(self).min_length
 
 class UnaryOperator(Operator):
     """
@@ -100,6 +225,9 @@ class UnaryOperator(Operator):
     def __repr__(self):
         return '{' + '{} {}{}'.format(self.__class__.__name__, self._item, self._operator) + '}'
 
+    def _key(self)->tuple:
+        return self.__class__, self._operator, self._item
+
 class Single(UnaryOperator):
     """
     Defines a Single operator, meaning exactly one repetitions.
@@ -113,25 +241,8 @@ class Single(UnaryOperator):
     def __init__(self, item):
         super().__init__(item, '')
 
-    def _assemble(self)->nfa.EpsilonNFA:
-        if isinstance(self._item, str):
-            enfa = nfa.EpsilonNFA.factory(
-                """s0,s1
-{0}
-s1
-s0
-s0,{0}->s1""".format(*helper.escape_string(self._item)),
-            generator.StandardFormatGenerator())
-        elif isinstance(self._item, Operator):
-            enfa = self._item._assemble()
-        return enfa
-    @property
-    def min_length(self):
-        if isinstance(self._item, str):
-            return len(self._item)
-        elif isinstance(self._item, Operator):
-            return self._item.min_length
-        raise TypeError('Item type is not accepted by {}'.format(self.__class__.__name__))
+    def _build(self, builder: th.Builder)->tuple:
+        return _build_item(builder, self._item)
 
 class BinaryOperator(Operator):
     """
@@ -145,6 +256,9 @@ class BinaryOperator(Operator):
         self._first = first
         self._last = last
 
+    def _key(self)->tuple:
+        return self.__class__, self._first, self._last
+
     def __repr__(self):
         return '{' + '{} {}{}{}'.format(self.__class__.__name__,
                                             str(self._first).replace('\t', '\t'*2),
@@ -169,6 +283,9 @@ class GeneralOperator(Operator):
                 item_list.append(item)
         self._items = item_list
 
+    def _key(self)->tuple:
+        return (self.__class__, self._operator) + tuple(self._items)
+
     def __repr__(self):
         result = ''
         for item in self._items:
@@ -199,27 +316,121 @@ class Collation(BinaryOperator):
         """
         return [chr(i) for i in range(ord(self._first), ord(self._last) + 1)]
 
-    def _assemble(self)->nfa.EpsilonNFA:
-        result = ''
-        inputs = ''
-        for char in self.all_characters:
-            result += 'c0,{}->c1\n'.format(*helper.escape_string(char))
-            inputs += char + ','
-        result = result[:-1]
-        inputs = inputs[:-1]
+    @property
+    def intervals(self)->list:
+        """
+        :return list: the collation as a single (first, last) code point interval
+        """
+        return [(ord(self._first), ord(self._last))]
+
+    def _build(self, builder: th.Builder)->tuple:
+        return builder.ranges(*self.intervals)
+
+class CharacterClass(GeneralOperator):
+    """
+    Defines a set of characters, any single one of which is accepted.
+    It is created by the optimizer (see grammar.optimizer) out of alternations
+    of single characters and collations, and assembles into just two states.
+    Characters are kept as sorted, disjoint intervals, so wide classes stay small.
+
+    Example:
+        [abx-z] = 'a', 'b', 'x', 'y', 'z'
+    """
+    _item_types = {str, tuple}
+    def __init__(self, *items):
+        """
+        :param items: characters and (first, last) character pairs
+        """
+        intervals = ab.normalize((ord(item[0]), ord(item[-1])) for item in items)
+        super().__init__('', *[(chr(first), chr(last)) for first, last in intervals])
 
-        enfa = nfa.EpsilonNFA.factory(
-            """c0,c1
-{}
-c1
-c0
-{}""".format(inputs, result),
-        generator.StandardFormatGenerator())
-        return enfa
+    @property
+    def intervals(self)->list:
+        """
+        :return list: sorted, disjoint (first, last) code point intervals
+        """
+        return [(ord(first), ord(last)) for first, last in self._items]
 
     @property
-    def min_length(self):
-        return 1
+    def all_characters(self)->list:
+        """
+        Returns a list of all characters included in the class.
+
+        :return list: all characters included
+        """
+        return [chr(code) for first, last in self.intervals for code in range(first, last + 1)]
+
+    def __repr__(self):
+        return '{' + '{} [{}]'.format(self.__class__.__name__, ''.join(
+            first if first == last else first + '-' + last for first, last in self._items)) + '}'
+
+    def _build(self, builder: th.Builder)->tuple:
+        return builder.ranges(*self.intervals)
+
+def _operands(item)->list:
+    """
+    Returns the operators an operator is made of; characters are left out.
+
+    :param Operator item: an operator
+    :return list: sub-operators
+    """
+    if isinstance(item, UnaryOperator):
+        items = [item._item]
+    elif isinstance(item, GeneralOperator):
+        items = item._items
+    else:
+        items = []
+    return [sub_item for sub_item in items if isinstance(sub_item, Operator)]
+
+def _build_item(builder: th.Builder, item)->tuple:
+    """
+    Builds a string (a sequence of characters) or an operator.
+
+    :param Builder builder: builder that holds the whole automaton
+    :param item: a string or an operator
+    :return tuple: fragment
+    """
+    if isinstance(item, str):
+        return builder.concatenate(*[builder.symbols(char) for char in item])
+    if item._uses > 1:
+        return item._embed(builder)
+    if builder.strategy is not None and builder.strategy.chooses(item):
+        return item._embed(builder, builder.strategy.min_states)
+    return item._build(builder)
+
+_interned = weakref.WeakValueDictionary() # structural key -> shared operator
+_interning = threading.Lock()
+
+def intern(item):
+    """
+    Hash-conses an operator tree: returns the shared operator of the same structure,
+    interning its sub-operators first. Operators of the tree that are not yet shared
+    become shared, so the tree must not be used by anything else yet.
+    Shared operators are dropped once no tree uses them anymore.
+
+    :param item: a string or an operator
+    :return: the string or the shared operator
+    """
+    if not isinstance(item, Operator) or item._interned:
+        if isinstance(item, Operator):
+            with _interning:
+                item._uses += 1
+        return item
+    if isinstance(item, UnaryOperator):
+        item._item = intern(item._item)
+    elif isinstance(item, GeneralOperator):
+        item._items = [intern(sub_item) for sub_item in item._items]
+    key = item._key()
+    with _interning:
+        shared = _interned.get(key)
+        if shared is None:
+            item._interned = True
+            shared = _interned[key] = item
+        else: # the item is dropped, its sub-operators are used by the shared one already
+            for sub_item in _operands(item):
+                sub_item._uses -= 1
+        shared._uses += 1
+    return shared
 
 class Alternation(GeneralOperator):
     """
@@ -233,36 +444,8 @@ class Alternation(GeneralOperator):
     def __init__(self, *items):
         super().__init__('|', *items)
 
-    def _assemble(self)->nfa.EpsilonNFA:
-        enfas = []
-        for item in self._items:
-            if isinstance(item, str):
-                enfas.append(nfa.EpsilonNFA.factory(
-                    """u0,u1
-{0}
-u1
-u0
-u0,{0}->u1""".format(*helper.escape_string(item)),
-                generator.StandardFormatGenerator()))
-            elif isinstance(item, Operator):
-                enfas.append(item._assemble())
-
-        result = enfas[0]
-        for i in range(1, len(enfas)):
-            result = result + enfas[i]
-        return result
-
-    @property
-    def min_length(self):
-        lengths = []
-        for item in self._items:
-            if isinstance(item, str):
-                lengths.append(len(item))
-            elif isinstance(item, Operator):
-                lengths.append(item.min_length)
-            else:
-                raise TypeError
-        return min(lengths)
+    def _build(self, builder: th.Builder)->tuple:
+        return builder.alternate(*[_build_item(builder, item) for item in self._items])
 
 class Concatenation(GeneralOperator):
     """
@@ -278,24 +461,8 @@ class Concatenation(GeneralOperator):
     def __init__(self, *items):
         super().__init__('', *items)
 
-    def _assemble(self)->nfa.EpsilonNFA:
-        enfas = []
-        for item in self._items:
-            if isinstance(item, str):
-                enfas.append(nfa.EpsilonNFA.factory(
-                    """c0,c1
-{0}
-c1
-c0
-c0,{0}->c1""".format(*helper.escape_string(item)),
-                    generator.StandardFormatGenerator()))
-            elif isinstance(item, Operator):
-                enfas.append(item._assemble())
-
-        result = enfas[0]
-        for i in range(1, len(enfas)):
-            result = result * enfas[i]
-        return result
+    def _build(self, builder: th.Builder)->tuple:
+        return builder.concatenate(*[_build_item(builder, item) for item in self._items])
 
     def __repr__(self):
         result = ''
@@ -304,18 +471,6 @@ c0,{0}->c1""".format(*helper.escape_string(item)),
         # result = result[:-1]
         return '{' + '{} {}'.format(self.__class__.__name__, result) + '}'
 
-    @property
-    def min_length(self):
-        length = 0
-        for item in self._items:
-            if isinstance(item, str):
-                length += len(item)
-            elif isinstance(item, Operator):
-                length += item.min_length
-            else:
-                raise TypeError
-        return length
-
 class KleeneStar(UnaryOperator):
     """
     Defines a Kleene star operator, meaning zero or more repetitions.
@@ -331,22 +486,8 @@ class KleeneStar(UnaryOperator):
     def __init__(self, item):
         super().__init__(item, '*')
 
-    def _assemble(self)->nfa.EpsilonNFA:
-        if isinstance(self._item, str):
-            item_enfa = nfa.EpsilonNFA.factory(
-                """ks0,ks1
-{0}
-ks1
-ks0
-ks0,{0}->ks1""".format(*helper.escape_string(self._item)),
-            generator.StandardFormatGenerator())
-        elif isinstance(self._item, Operator):
-            item_enfa = self._item._assemble()
-        return item_enfa.kleene_operator()
-
-    @property
-    def min_length(self):
-        return 0
+    def _build(self, builder: th.Builder)->tuple:
+        return builder.star(_build_item(builder, self._item))
 
 class KleenePlus(UnaryOperator):
     """
@@ -363,29 +504,8 @@ class KleenePlus(UnaryOperator):
     def __init__(self, item):
         super().__init__(item, '+')
 
-    def _assemble(self)->nfa.EpsilonNFA:
-        if isinstance(self._item, str):
-            # todo: don't call it through this.
-            enfa = nfa.EpsilonNFA.factory(
-                """kp0,kp1
-{0}
-kp1
-kp0
-kp0,{0}->kp1""".format(*helper.escape_string(self._item)),
-            generator.StandardFormatGenerator())
-        elif isinstance(self._item, Operator):
-            enfa = self._item._assemble()
-        # else is not needed because OperatorInputTypeError would already have been raised
-        # if item is not a string or an Operator.
-        return enfa.deepcopy() * enfa.kleene_operator()
-
-    @property
-    def min_length(self):
-        if isinstance(self._item, str):
-            return len(self._item)
-        elif isinstance(self._item, Operator):
-            return self._item.min_length
-        raise TypeError
+    def _build(self, builder: th.Builder)->tuple:
+        return builder.plus(_build_item(builder, self._item))
 
 class QuestionMark(UnaryOperator):
     """
@@ -403,24 +523,70 @@ class QuestionMark(UnaryOperator):
     def __init__(self, item):
         super().__init__(item, '?')
 
-    def _assemble(self)->nfa.EpsilonNFA:
-        if isinstance(self._item, str):
-            item_enfa = nfa.EpsilonNFA.factory(
-                """qm0,qm1
-{0}
-qm1
-qm0
-qm0,{0}->qm1
-qm0,$->qm1""".format(*helper.escape_string(self._item)),
-            generator.StandardFormatGenerator())
-        elif isinstance(self._item, Operator):
-            start_enfa = nfa.EpsilonNFA.factory(
-                """qm\n\nqm\nqm\n""",
-            generator.StandardFormatGenerator())
-            end_enfa = start_enfa.deepcopy()
-            item_enfa = start_enfa*end_enfa + self._item._assemble()
-        return item_enfa
+    def _build(self, builder: th.Builder)->tuple:
+        return builder.optional(_build_item(builder, self._item))
 
-    @property
-    def min_length(self):
-        return 0
+class Repetition(UnaryOperator):
+    """
+    Defines a bounded repetition, meaning from minimum to maximum repetitions.
+    It can take in a character or an already defined operator.
+    The item is built once and its states are copied for every other repetition.
+
+    Example:
+        'a{2,3}' = 'aa', 'aaa'
+        'a{2}' = 'aa'
+        'a{2,}' = 'aa', 'aaa', 'aaaa', ...
+    """
+    _item_types = {str, Operator}
+
+    def __init__(self, item, minimum: int, maximum: int = None):
+        """
+        :param item: a character or an operator
+        :param int minimum: minimum number of repetitions
+        :param int maximum: maximum number of repetitions, None for unbounded
+        """
+        if minimum < 0 or maximum is not None and maximum < minimum:
+            raise ValueError('Invalid repetition bounds {{{},{}}}.'.format(minimum, maximum))
+        if maximum == minimum:
+            operator = '{' + str(minimum) + '}'
+        else:
+            operator = '{' + '{},{}'.format(minimum, '' if maximum is None else maximum) + '}'
+        super().__init__(item, operator)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def _build(self, builder: th.Builder)->tuple:
+        first = builder.size
+        fragment = _build_item(builder, self._item)
+        return builder.repeat(fragment, first, self.minimum, self.maximum)
+
+class Minimization:
+    """
+    Bottom-up compile strategy, see Operator.execute.
+
+    Repetitions (*, +, {m,n}) and alternations of many items are determinized and
+    minimised on their own as soon as they're built, and only their minimal automata
+    are combined into the automaton above them. The result is the same minimal DFA,
+    but intermediate automata are smaller than Thompson construction makes them.
+    """
+    _repetitions = (KleeneStar, KleenePlus, Repetition)
+
+    def __init__(self, min_states: int = 32, min_alternatives: int = 4):
+        """
+        :param int min_states: sub-expressions whose own epsilon NFA has fewer states are left as they are
+        :param int min_alternatives: alternations of fewer items are left as they are
+        """
+        self.min_states = min_states
+        self.min_alternatives = min_alternatives
+
+    def __repr__(self):
+        return 'Minimization(min_states={}, min_alternatives={})'.format(self.min_states, self.min_alternatives)
+
+    def chooses(self, item: Operator)->bool:
+        """
+        :param Operator item: a sub-expression
+        :return bool: True if it's worth minimising on its own
+        """
+        if isinstance(item, self._repetitions):
+            return True
+        return isinstance(item, Alternation) and len(item._items) >= self.min_alternatives
@@ -0,0 +1,196 @@
+"""
+Defines an optimizer of operator trees.
+
+The optimizer rewrites a tree into a smaller tree accepting the same language,
+before it is assembled into an Epsilon NFA:
+    - Single wrappers are removed and nested concatenations and alternations are flattened
+    - common literal prefixes of alternatives are factored out: ab|ac -> a(b|c)
+    - single characters, collations and classes among alternatives are merged
+      into one CharacterClass: a|[0-9]|b -> [0-9ab]
+    - nested quantifiers are simplified: (x*)* -> x*, (x+)? -> x*, (x?)+ -> x*
+    - repetitions with simple bounds become quantifiers: x{0,} -> x*, x{1,1} -> x
+"""
+import grammar.operators as operators
+
+QUANTIFIERS = (operators.KleeneStar, operators.KleenePlus, operators.QuestionMark)
+
+def optimize(operator: operators.Operator)->operators.Operator:
+    """
+    Optimizes an operator tree. The original tree is not changed.
+
+    :param Operator operator: root operator
+    :return Operator: optimized root operator
+    """
+    result = _optimize(operator)
+    return operators.Single(result) if isinstance(result, str) else result
+
+def _optimize(item):
+    """
+    Optimizes a character or an operator.
+
+    :param item: a character or an operator
+    :return: optimized character or operator
+    """
+    if isinstance(item, str):
+        return item
+    if isinstance(item, operators.Single):
+        return _optimize(item._item)
+    if isinstance(item, operators.Concatenation):
+        return _concatenate([_optimize(sub_item) for sub_item in item._items])
+    if isinstance(item, operators.Alternation):
+        return _alternate([_optimize(sub_item) for sub_item in item._items])
+    if isinstance(item, QUANTIFIERS):
+        return _quantify(type(item), _optimize(item._item))
+    if isinstance(item, operators.Repetition):
+        return _repeat(_optimize(item._item), item.minimum, item.maximum)
+    return item
+
+def _repeat(item, minimum: int, maximum: int):
+    """
+    Applies a bounded repetition, using a quantifier instead where one has the same bounds.
+
+    :param item: a character or an operator
+    :param int minimum: minimum number of repetitions
+    :param int maximum: maximum number of repetitions, None for unbounded
+    :return: repeated item
+    """
+    if (minimum, maximum) == (1, 1):
+        return item
+    for quantifier, bounds in ((operators.KleeneStar, (0, None)), (operators.KleenePlus, (1, None)),
+                               (operators.QuestionMark, (0, 1))):
+        if (minimum, maximum) == bounds:
+            return _quantify(quantifier, item)
+    return operators.Repetition(item, minimum, maximum)
+
+def _quantify(quantifier: type, item):
+    """
+    Applies a quantifier, merging it with a quantifier of the item.
+
+    :param type quantifier: KleeneStar, KleenePlus or QuestionMark
+    :param item: a character or an operator
+    :return: quantified item
+    """
+    if isinstance(item, QUANTIFIERS):
+        inner = type(item)
+        if inner is not quantifier:
+            # x** = x*, x++ = x+ and x?? = x?, any other pair accepts any number of repetitions.
+            item = operators.KleeneStar(item._item)
+        return item
+    return quantifier(item)
+
+def _sequence(item)->list:
+    """
+    :param item: a character or an operator
+    :return list: items of a concatenation or the item itself
+    """
+    return list(item._items) if isinstance(item, operators.Concatenation) else [item]
+
+def _concatenate(items: list):
+    """
+    Concatenates items, flattening nested concatenations.
+
+    :param list items: characters and operators
+    :return: a single item or a Concatenation
+    """
+    flat = []
+    for item in items:
+        flat.extend(_sequence(item))
+    return flat[0] if len(flat) == 1 else operators.Concatenation(*flat)
+
+def _alternate(alternatives: list):
+    """
+    Creates an alternation, flattening nested alternations, factoring
+    common prefixes and merging characters into a class.
+
+    :param list alternatives: characters and operators
+    :return: a single item or an Alternation
+    """
+    flat = []
+    for alternative in alternatives:
+        if isinstance(alternative, operators.Alternation):
+            flat.extend(alternative._items)
+        else:
+            flat.append(alternative)
+    flat = _merge_characters(_factor(flat))
+    return flat[0] if len(flat) == 1 else operators.Alternation(*flat)
+
+def _factor(alternatives: list)->list:
+    """
+    Factors common literal prefixes out of alternatives starting with the same character.
+    Alternatives are reordered, which doesn't change the language.
+
+    :param list alternatives: characters and operators
+    :return list: factored alternatives
+    """
+    groups = dict() # first character -> sequences starting with it
+    result = []
+    for alternative in alternatives:
+        sequence = _sequence(alternative)
+        first = sequence[0]
+        if isinstance(first, str):
+            if first not in groups:
+                groups[first] = []
+                result.append(first) # placeholder for the group
+            groups[first].append(sequence)
+        else:
+            result.append(alternative)
+
+    for index, item in enumerate(result):
+        if not isinstance(item, str):
+            continue
+        sequences = groups[item]
+        if len(sequences) == 1:
+            result[index] = _concatenate(sequences[0])
+            continue
+        length = 1
+        while all(len(sequence) > length and isinstance(sequence[length], str)
+                  for sequence in sequences) and \
+                len({sequence[length] for sequence in sequences}) == 1:
+            length += 1
+        prefix = sequences[0][:length]
+        rests = [sequence[length:] for sequence in sequences]
+        remaining = [_concatenate(rest) for rest in rests if rest]
+        if not remaining:
+            result[index] = _concatenate(prefix)
+            continue
+        rest = _alternate(remaining)
+        if len(remaining) < len(rests): # one of the alternatives was the prefix itself
+            rest = _quantify(operators.QuestionMark, rest)
+        result[index] = _concatenate(prefix + [rest])
+    return result
+
+def _merge_characters(alternatives: list)->list:
+    """
+    Merges single characters, collations and classes into one CharacterClass
+    placed where the first of them was.
+
+    :param list alternatives: characters and operators
+    :return list: alternatives with at most one character set
+    """
+    members = []
+    result = []
+    index = None
+    for alternative in alternatives:
+        if isinstance(alternative, str) and len(alternative) == 1 or \
+                isinstance(alternative, (operators.Collation, operators.CharacterClass)):
+            if index is None:
+                index = len(result)
+                result.append(None)
+            members.append(alternative)
+        else:
+            result.append(alternative)
+
+    if len(members) == 1:
+        result[index] = members[0]
+    elif members:
+        pairs = []
+        for member in members:
+            if isinstance(member, str):
+                pairs.append(member)
+            else:
+                pairs.extend((chr(first), chr(last)) for first, last in member.intervals)
+        merged = operators.CharacterClass(*pairs)
+        if merged.intervals[0][0] == merged.intervals[-1][1]: # a single character
+            merged = merged._items[0][0]
+        result[index] = merged
+    return result
@@ -1,17 +1,32 @@
 """
 Defines a regular expression type and all default regular expression checkers.
 """
+import collections.abc
+import multiprocessing
 import os
-import xml.dom.minidom as dom
-import os.path as pth
 import json
+import struct
+import threading
+from xml.etree import ElementTree
 import grammar.operators as operators
+import grammar.cache as ch
+import grammar.syntax as sx
+import grammar.optimizer as opt
+import grammar.analysis as an
+import grammar.matchers as mt
 import form.generators as generator
+import automata.alphabet as ab
 import automata.dfa as dfa
+import automata.binary as bn
+import automata.lazy as lz
 import form.compositors as com
 
 dirname = os.path.dirname(__file__)
 
+BINARY_HEADER = struct.Struct('<4sH2x') # magic and version of a binary regex
+BINARY_MAGIC = b'LNGR'
+BINARY_VERSION = 1
+
 class RegEx(object):
     """
     Defines a class that handles all regular expression needs.
@@ -20,18 +35,13 @@ class RegEx(object):
     #todo: fix nfa to dfa casting and add save method that does: operator->e_nfa->nfa->dfa->minimised dfa
     #todo: multiple collation [a-z,A-Z]
     #todo: anchoring
-    #todo: {min, max} repetitions
     #todo: advanced collation with ^ (not operator) and . (any character)
-    # all these things are going to be implemented when the parser is done.
-    # they all require a pretty advanced parser, this structure cannot safely support these features.
-    unary_operators = {'+': operators.KleenePlus,
-                       '?': operators.QuestionMark,
-                       '*': operators.KleeneStar,
-                       '': operators.Single}
-    binary_operators = {'|': operators.Alternation,
-                        '': operators.Concatenation}
-
+    # all these things can now be added to the parser in grammar.syntax.
 
+    # on-disk cache of compiled automata, None disables caching.
+    cache = ch.CACHE
+    # in-process cache of parsed and compiled regexes, None disables caching.
+    compiled = ch.COMPILED
 
     def __init__(self, text: str, name: str = 'placeholder', auto_execute: bool = True):
         """
@@ -43,6 +53,9 @@ class RegEx(object):
             * - 0 or more occurrences
             ? - 0 or 1 occurrence
             + - 1 or more occurrences
+            {m} - exactly m occurrences
+            {m,} - m or more occurrences
+            {m,n} - from m to n occurrences (bounds up to 1000)
         UNION:
             a|b - a or b
         Concatenation:
@@ -68,24 +81,127 @@ class RegEx(object):
 
         self._text = text
 
-        self._groups = self._extract_bracket(text)
-        self._groups = self._process(self._groups)
-        if auto_execute:
-            self.automaton = self._groups.execute()
+        self._row = None # stream position in the compiled table, see feed.
+
+        self._search_tables = None # compiled on first search, see finditer.
+        self._literals = None # found on first search, see literals.
+
+        if auto_execute and self.compiled is not None:
+            # compiled regexes are shared, which is safe since matching never changes them.
+            self._groups, self.automaton = self.compiled.get_or_create(text, self._parse_and_compile)
+        else:
+            self._groups = self._parse()
+            if auto_execute:
+                self.automaton = self._compile()
+        self._matcher = mt.matcher(self._groups) # specialized check of a trivial regex or None
         # self.save()
 
+    def _parse(self)->operators.Operator:
+        """
+        Parses the regex text into optimized operators, shared with identical sub-expressions
+        of all other regexes (see operators.intern).
+        Raises a RegexSyntaxError (a ValueError) with the error position if the text is invalid.
+
+        :return Operator: root operator
+        """
+        return operators.intern(opt.optimize(sx.parse(self._text)))
+
+    def _parse_and_compile(self)->tuple:
+        """
+        Parses and compiles the regex text, used on an in-process cache miss.
+
+        :return tuple: (root operator, minimised DFA)
+        """
+        self._groups = self._parse()
+        return self._groups, self._compile()
+
+    def _compile(self)->dfa.DFA:
+        """
+        Compiles the parsed operators to a DFA, going through the on-disk cache.
+        A pattern whose DFA is too big gets a LazyDFA instead (see Operator.execute), which isn't cached.
+
+        :return DFA: minimised DFA or LazyDFA
+        """
+        if self.cache is None:
+            return self._groups.execute()
+        automaton = self.cache.load(self._text)
+        if automaton is None:
+            automaton = self._groups.execute()
+            if isinstance(automaton, dfa.DFA):
+                self.cache.store(self._text, automaton)
+        return automaton
+
+    @property
+    def properties(self)->an.Properties:
+        """
+        Returns static properties of all matches, computed once per operator tree.
+
+        :return Properties: nullability, length bounds and first characters, see grammar.analysis
+        """
+        return an.properties(self._groups)
+
     @property
-    def min_lookahead(self):
-        return self._groups.min_length
+    def min_lookahead(self)->int:
+        """
+        :return int: length of the shortest match
+        """
+        return self.properties.min_length
+
+    @property
+    def max_lookahead(self)->int:
+        """
+        :return int: length of the longest match, None if unbounded
+        """
+        return self.properties.max_length
+
+    @property
+    def nullable(self)->bool:
+        """
+        :return bool: True if the empty text is matched
+        """
+        return self.properties.nullable
+
+    @property
+    def finite(self)->bool:
+        """
+        :return bool: True if there are finitely many matches
+        """
+        return self.properties.finite
+
+    def admits(self, text: str, start: int = 0, end: int = None)->bool:
+        """
+        Cheaply rules out text[start:end] by its length and first character, without matching.
+        A False result is certain, a True one has to be checked.
+
+        :param str text: input text
+        :param int start: index where the part starts
+        :param int end: index where the part ends, the end of the text by default
+        :return bool: False if the part can't be matched
+        """
+        return self.properties.admits(text, start, end)
+
+    @property
+    def character_intervals(self)->list:
+        """
+        Returns all valid characters defined in this regex as code point intervals.
+
+        :return list: sorted, disjoint (first, last) code point pairs, both included
+        """
+        partition = self.automaton.partition
+        if partition is None:
+            return ab.normalize((ord(char), ord(char)) for char in self.automaton.inputs)
+        return ab.normalize((first, last) for first, last, _ in partition.intervals())
 
     @property
     def valid_characters(self)->set:
         """
         Returns all valid characters defined in this regex.
+        Every character of every class is included, so a wide class makes a large set;
+        character_intervals describes the same characters compactly.
 
         :return set: a set of all valid characters
         """
-        return self.automaton.inputs
+        return {chr(code) for first, last in self.character_intervals for code in range(first, last + 1)}
 
     @property
     def name(self)->str:
@@ -106,7 +222,7 @@ class RegEx(object):
 
         :return: check function
         """
-        return self.check
+        return self._matcher or self.check
 
     def check(self, text)->bool:
         """
@@ -115,247 +231,231 @@ class RegEx(object):
         :param str text: input text
         :return bool: True if accepted, False if not
         """
-        #resetting before everything somehow fixed the 't' bug. Don't know how.
-        self.automaton.reset()
-        for char in text:
-            if not char in self.valid_characters:
-                return False
-            self.automaton.enter(char)
-        is_ok = self.automaton.accepted
-        # self.automaton.reset()
-        return is_ok
-
-    def _process(self, group: list)->operators.Operator:
-        """
-        Completely processes a text and returns a single Operator
-        for a specified list of items.
-
-        :param list group: a list of items
-        :return Operator: single operator
-        """
-        group = self._escape_characters(group)
-        group = self._collate(group)
-        group = self._process_sublists(group)
-        group = self._to_unary_operators(group)
-        group = self._concatenate(group)
-        group = self._alternate(group)
-        group = self._clean(group)
-
-        if len(group) > 1:
-            # print(group)
-            raise ValueError('Parsing failed.')
-        return group[0]
-
-    def _escape_characters(self, group: list)->list:
-        """
-        Escapes characters after \ symbol to a Single operator.
-
-        :param list group: a list of items
-        :return list: a processed list of items
-        """
-
-        copied_group = group.copy()
-        compressed = 0
-
-        for i, item in enumerate(group):
-            if i >= len(group) - compressed:
-                break
-            if item == '\\':
-                copied_group[i - compressed : i + 2 - compressed] = \
-                    [operators.Single(copied_group[i + 1 - compressed])]
-                compressed += 1
-        return copied_group
-
-    def _extract_bracket(self, text: str)->list:
-        """
-        Extracts all individual brackets in a list.
-
-        :param str text: text to be extracted
-        :return list: list of all extracted brackets.
-        """
-        par_count = 0
-        lpar_index = -1
-        rpar_index = -1
-        result = []
-        # print(text)
-        for i, char in enumerate(text):
-            if char == '(':
-                if i > 0:
-                    if text[i - 1] == '\\':
-                        result.append(char)
-                        continue
-                par_count += 1
-                if lpar_index == -1:
-                    lpar_index = i
-            elif char == ')':
-                if i > 0:
-                    if text[i - 1] == '\\':
-                        result.append(char)
-                        continue
-                par_count -= 1
-                rpar_index = i
-            else:
-                if not lpar_index >= 0:
-                    result.append(char)
-            # print('\t', char, lpar_index, rpar_index, par_count, result, i)
-            if par_count == 0 and lpar_index >= 0 and rpar_index >= 0:
-                result.append(self._extract_bracket(text[lpar_index+1:rpar_index]))
-                lpar_index = -1
-                rpar_index = -1
-        if par_count != 0:
-            raise ValueError('Unbalanced parentheses.')
-        # print("exiting", text, result)
-        return result
+        if self._matcher is not None:
+            return self._matcher(text)
+        # the compiled table is read-only, so an automaton shared through the cache
+        # can be checked from many regexes and threads at once.
+        return self.automaton.table.match(text)
 
-    @staticmethod
-    def _collate(group: list)->list:
+    def feed(self, chunk: str)->bool:
         """
-        Processes all collate operators found within a list (string to operator)
+        Feeds a chunk of text, continuing the match from the previous chunk.
+        Independent of check, which always starts from scratch.
 
-        :param list group: a list of items
-        :return list: a list where all string like collates where processed to operators
+        :param str chunk: next part of the text
+        :return bool: True if the text fed so far is accepted
         """
+        table = self.automaton.table
+        self._row = table.run(table.start if self._row is None else self._row, chunk)
+        return table.accepts(self._row)
 
-        copied_groups = group.copy()
-
-        lpar_index = -1 # [ symbol
-        dash_index = -1 # - symbol
-
-        compressed = 0
+    @property
+    def accepting(self)->bool:
+        """
+        Returns if the text fed so far is accepted. O(1).
 
-        for i, item in enumerate(group):
-            if item == '[':
-                lpar_index = i
-            elif item == '-':
-                dash_index = i
-            elif item == ']':
-                if dash_index != -1:
-                    collation = operators.Collation(*copied_groups[lpar_index+1-compressed:i-compressed:2])
-                    copied_groups[lpar_index-compressed:i+1-compressed] = [collation]
-                    compressed += 4
-                else:
-                    raise ValueError('Collation parsing failed, missing "-" character')
-        return copied_groups
+        :return bool: True if accepted, False if not
+        """
+        table = self.automaton.table
+        return table.accepts(table.start if self._row is None else self._row)
 
-    def _process_sublists(self, group: list)->list:
+    def finish(self)->bool:
         """
-        Processes all sublists to operators.
+        Ends a stream started with feed and resets it.
 
-        :param list group: a list of items
-        :return list: processed list of items without sublists
+        :return bool: True if the whole stream was accepted
         """
+        accepted = self.accepting
+        self._row = None
+        return accepted
 
-        copied_groups = group.copy()
+    def snapshot(self)->bytes:
+        """
+        Serializes the stream position (see feed) so it can be resumed in another process.
 
-        for i, item in enumerate(group):
-            if isinstance(item, list):
-                item = self._process(item)
-                copied_groups[i] = item
-        return copied_groups
+        :return bytes: stream snapshot
+        """
+        return json.dumps({'fingerprint': self.automaton.fingerprint, 'row': self._row},
+                          separators=(',', ':')).encode()
 
-    def _to_unary_operators(self, group: list)->list:
+    def restore(self, snapshot: bytes):
         """
-        Processes all unary operators from string representation to operator object.
+        Restores a stream position created by snapshot.
+        Raises a ValueError if the snapshot was taken on a different regex.
 
-        :param list group: a list of items
-        :return list: processed list of items
+        :param bytes snapshot: stream snapshot
+        :return:
         """
+        data = json.loads(snapshot.decode())
+        if data['fingerprint'] != self.automaton.fingerprint:
+            raise ValueError('Snapshot does not belong to regex {}.'.format(self.name))
+        self._row = data['row']
 
-        copied_groups = group.copy()
+    def match_buffer(self, buffer)->bool:
+        """
+        Checks if a whole buffer (bytes, bytearray, memoryview, mmap) is accepted by a regex.
+        Bytes are read as latin-1 characters and the buffer is never copied.
 
-        compressed = 0
+        :param buffer: buffer protocol object
+        :return bool: True if accepted, False if not
+        """
+        return self.automaton.match_buffer(buffer)
 
-        for i, item in enumerate(group):
-            if isinstance(item, list):
-                copied_groups[i - compressed] = self._process(item)
-                continue
-            elif item in self.unary_operators:
-                copied_groups[i - 1 - compressed : i + 1 - compressed] = \
-                    [self.unary_operators[item](copied_groups[i - 1 - compressed])]
-                compressed += 1
-        return copied_groups
+    def _searchers(self)->tuple:
+        """
+        Compiles the search automata on first use: an unanchored one that finds
+        where matches end and an unanchored reversed one that finds where they start.
 
-    def _concatenate(self, group: list)->list:
+        :return tuple: (forward table, reverse table)
         """
-        Processes all concatenations to operators.
+        if self._search_tables is None:
+            self._search_tables = (self._groups.execute(unanchored=True).table,
+                                   self._groups.execute(reverse=True, unanchored=True).table)
+        return self._search_tables
 
-        :param list group: a list of items
-        :return list: processed list of items
+    @property
+    def literals(self)->an.Literals:
         """
+        Returns strings required by every match, found on first use.
 
-        copied_groups = group.copy()
+        :return Literals: required strings, see grammar.analysis
+        """
+        if self._literals is None:
+            self._literals = an.literals(self._groups)
+        return self._literals
 
-        compressed = 0
+    def finditer(self, text: str):
+        """
+        Finds all non-overlapping matches in a text from left to right.
+        Every match is leftmost-longest: it starts as early as possible and
+        is as long as possible from its start. Empty matches are found too.
 
-        for i, item in enumerate(group):
-            next_char = '' if i + 1 >= len(group) else group[i + 1]
+        A text that doesn't contain a string required by every match is rejected by str.find.
+        If every match starts with a known prefix, only occurrences of the prefix are tried.
+        Otherwise the last match end is found by the last occurrence of a known suffix or
+        by a forward pass, one backward pass from there marks every index where a match starts
+        and every match is then extended by the compiled automaton, which stops at the last
+        match end or as soon as no longer match is possible. The extensions share the states
+        they reach after their matches (see TransitionTable.longest), so searching stays
+        linear in the length of the text even if the automaton stays alive after every match.
 
-            if isinstance(item, list):
-                processed = self._process(item)
-                copied_groups[i - compressed] = processed
-                continue
-            elif item not in self.binary_operators and (next_char not in self.binary_operators):
-                # print("concatenating", item, next_char)
-                copied_groups[i - compressed : i + 2 - compressed] = \
-                    [operators.Concatenation(copied_groups[i - compressed],
-                                             copied_groups[i + 1 - compressed])]
-                compressed += 1
+        :param str text: input text
+        :return: generator of (start, end) spans
+        """
+        literals = self.literals
+        if literals.required not in text:
+            return
+        if literals.prefix:
+            yield from self._finditer_prefix(text, literals.prefix)
+            return
+        forward, backward = self._searchers()
+        if literals.suffix:
+            last = text.rfind(literals.suffix)
+            if last >= 0:
+                last += len(literals.suffix)
+        else:
+            last = forward.longest(text)
+        if last < 0:
+            return
+        starts = backward.accepted_suffixes(text, last)
+        table = self.automaton.table
+        seen = set()
+        position = 0
+        while True:
+            start = starts.find(1, position)
+            if start < 0:
+                return
+            end = table.longest(text, start, last, seen)
+            yield start, end
+            position = end if end > start else start + 1
+
+    def _finditer_prefix(self, text: str, prefix: str):
+        """
+        Finds all matches of a regex whose every match starts with a prefix,
+        running the compiled automaton only from occurrences of the prefix.
 
-            # print(item, copied_groups)
-        return copied_groups
+        :param str text: input text
+        :param str prefix: non-empty prefix of every match
+        :return: generator of (start, end) spans
+        """
+        table = self.automaton.table
+        seen = set()
+        position = 0
+        while True:
+            start = text.find(prefix, position)
+            if start < 0:
+                return
+            end = table.longest(text, start, seen=seen)
+            if end < 0:
+                position = start + 1
+            else:
+                yield start, end
+                position = end
 
-    def _alternate(self, group: list)->list:
+    def contains(self, text: str)->bool:
         """
-        Processes all alternations to operators.
+        Checks if any part of a text matches. Texts without a required string
+        are rejected by str.find, others take a single forward pass.
 
-        :param list group: a list of items
-        :return list: processed list of items
+        :param str text: input text
+        :return bool: True if there is a match, False if not
         """
+        literals = self.literals
+        if literals.required not in text:
+            return False
+        if literals.prefix:
+            return next(self._finditer_prefix(text, literals.prefix), None) is not None
+        return self._searchers()[0].longest(text) >= 0
 
-        copied_groups = group.copy()
-
-        compressed = 0
-
-        for i, item in enumerate(group):
-
-            if isinstance(item, list):
-                processed = self._process(item)
-                copied_groups[i - compressed] = processed
-                continue
-            elif item in self.binary_operators:
-                copied_groups[i - 1 - compressed: i + 2 - compressed] = \
-                    [self.binary_operators[item](copied_groups[i - 1 - compressed],
-                                                 copied_groups[i + 1 - compressed])]
-                compressed += 2
-        return copied_groups
+    def search(self, text: str):
+        """
+        Finds the leftmost-longest match in a text, see finditer.
 
-    def _clean(self, group: list)->list:
+        :param str text: input text
+        :return: (start, end) span or None if there is no match
         """
-        Final cleanup, replaces all loose characters with Single operators.
+        return next(self.finditer(text), None)
 
-        :param list group: a list of items
-        :return list: a processed list of items
+    def findall(self, text: str)->list:
         """
+        Finds all non-overlapping matches in a text, see finditer.
 
-        for i, item in enumerate(group):
-            if isinstance(item, str):
-                group[i] = operators.Single(item)
-        return group
+        :param str text: input text
+        :return list: matched texts
+        """
+        return [text[start:end] for start, end in self.finditer(text)]
 
     def export(self):
         """
         Exports a regex into a JSON file.
+        Raises a ValueError if the regex runs a lazy DFA.
 
         :param regex: regular expression to be exported
         :param file: export destination
         :return:
         """
+        self._check_saveable()
         inner = dict()
         inner['text'] = self._text
         inner['name'] = self._name
         inner['automaton'] = com.StandardCompositor(self.automaton).composite_automaton()
+        if self.automaton.partition is not None:
+            inner['partition'] = self.automaton.partition.to_list()
         with open(dirname + '/compiled_regexes/' + inner['name'].upper() + '.regex', 'w') as file:
             json.dump(inner, file, indent=4)
+
+    def _check_saveable(self):
+        """
+        Raises a ValueError if the regex runs a LazyDFA: its full DFA exceeded the budget
+        (see Operator.execute), so there is no compiled automaton to save.
+
+        :return:
+        """
+        if isinstance(self.automaton, lz.LazyDFA):
+            raise ValueError('Regex {} runs a lazy DFA and can\'t be saved: {}. Compile it with a larger '
+                             'Operator.budget to save it.'.format(self._name, self.automaton.cause)) \
+                from self.automaton.cause
+
     @staticmethod
     def load(file):
         """
@@ -368,6 +468,36 @@ class RegEx(object):
             data = json.load(file)
             regex = RegEx(data['text'], data['name'], False)
             regex.automaton = dfa.DFA.factory(data['automaton'], generator.StandardFormatGenerator())
+            if 'partition' in data:
+                regex.automaton.partition = ab.Partition.from_list(data['partition'])
+        return regex
+
+    def dumps(self)->bytes:
+        """
+        Serializes a regex (name, text and compiled automaton) into a compact binary format.
+        See automata.binary for the automaton format.
+        Raises a ValueError if the regex runs a lazy DFA.
+
+        :return bytes: binary regex
+        """
+        self._check_saveable()
+        return BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION) + \
+            bn.frame(self._name, self._text, bn.dumps(self.automaton))
+
+    @staticmethod
+    def loads(data):
+        """
+        Deserializes a regex created by dumps without compiling it again.
+
+        :param data: buffer protocol object containing a binary regex
+        :return RegEx: regex object
+        """
+        magic, version = BINARY_HEADER.unpack_from(data, 0)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            raise ValueError('Not a binary regex of version {}.'.format(BINARY_VERSION))
+        (name, text, automaton), _ = bn.unframe(data, BINARY_HEADER.size, 3)
+        regex = RegEx(str(text, 'utf-8'), str(name, 'utf-8'), False)
+        regex.automaton = bn.loads(automaton)
         return regex
 
 def check_check(rgx, *tests):
@@ -381,26 +511,125 @@ def check_check(rgx, *tests):
     for test in tests:
         print(test, rgx.check(test))
 
-REGEXES = dict()
-def prepare_regexes():
+class RegexRegistry(collections.abc.Mapping):
     """
-    Loads and creates all regexes defined in preloaded_regexes.xml
+    Lazy, thread-safe registry of named regexes defined in an XML file.
 
+    Nothing is parsed or compiled on creation. Definitions are read on first use
+    and every regex is created the first time it's accessed, loading its automaton
+    from the compile cache when possible.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialises a registry.
+
+        :param str path: path to an XML file with <regex name="..." expr="..."/> definitions
+        """
+        self._path = path
+        self._definitions = None
+        self._regexes = dict()
+        self._lock = threading.RLock()
+
+    @property
+    def definitions(self)->dict:
+        """
+        Returns all regex definitions, reading the XML file on first use.
+
+        :return dict: regex name -> regex text
+        """
+        if self._definitions is None:
+            with self._lock:
+                if self._definitions is None:
+                    definitions = dict()
+                    for rgx in ElementTree.parse(self._path).getroot().iter('regex'):
+                        definitions[rgx.get('name')] = rgx.get('expr')
+                    self._definitions = definitions
+        return self._definitions
+
+    def __getitem__(self, name: str)->RegEx:
+        regex = self._regexes.get(name)
+        if regex is None:
+            if name not in self.definitions:
+                raise KeyError(name)
+            with self._lock:
+                regex = self._regexes.get(name)
+                if regex is None:
+                    regex = self._regexes[name] = RegEx(self.definitions[name], name)
+        return regex
+
+    def __iter__(self):
+        return iter(self.definitions)
+
+    def __len__(self):
+        return len(self.definitions)
+
+    def __contains__(self, name):
+        return name in self.definitions
+
+    def warm_up(self, *names, jobs: int = 1):
+        """
+        Loads or compiles regexes ahead of time.
+
+        With more than one job, regexes are compiled by a pool of processes that send
+        back binary regexes (see RegEx.dumps), which are loaded in definition order,
+        so the registry doesn't depend on the number of processes. A regex that can't
+        be sent back (an invalid or a lazily determinized one) is compiled here.
+        Starting the pool and loading sent back regexes costs tens of milliseconds, so
+        more jobs only pay off for registries that take longer than that to compile
+        (see misc.benchmark.warm_up).
+
+        :param names: names of regexes to prepare, all of them if none are given
+        :param int jobs: number of processes, None for all cores
+        :return RegexRegistry: this registry
+        """
+        names = names or list(self.definitions)
+        pending = [name for name in dict.fromkeys(names) if name in self.definitions and name not in self._regexes]
+        jobs = jobs or os.cpu_count() or 1
+        if jobs > 1 and len(pending) > 1:
+            jobs = min(jobs, len(pending))
+            with multiprocessing.Pool(jobs) as pool:
+                # results come in order and are loaded while later ones are still compiling.
+                compiled = pool.imap(_compile_definition, [(name, self.definitions[name]) for name in pending],
+                                     max(1, len(pending) // (4 * jobs)))
+                for name, data in compiled:
+                    if data is None:
+                        continue
+                    regex = RegEx.loads(data)
+                    with self._lock:
+                        regex = self._regexes.setdefault(name, regex)
+                    if RegEx.compiled is not None:
+                        RegEx.compiled.put(regex._text, (regex._groups, regex.automaton))
+        for name in names:
+            self[name]
+        return self
+
+def _compile_definition(definition: tuple)->tuple:
+    """
+    Compiles a single regex in a worker process of RegexRegistry.warm_up.
+
+    :param tuple definition: (name, text)
+    :return tuple: (name, binary regex or None if it has to be compiled by the caller)
+    """
+    name, text = definition
+    try:
+        regex = RegEx(text, name)
+    except ValueError: # the caller raises it with its own traceback
+        return name, None
+    if not isinstance(regex.automaton, dfa.DFA):
+        return name, None
+    return name, regex.dumps()
+
+REGEXES = RegexRegistry(dirname + '/' + 'preloaded_regexes.xml')
+def prepare_regexes(jobs: int = 1):
+    """
+    Loads and creates all regexes defined in preloaded_regexes.xml.
+    Not needed before using REGEXES, which prepares regexes on first access.
+
+    :param int jobs: number of compiling processes, None for all cores, see RegexRegistry.warm_up
     :return:
     """
-    # print("PREPARING REGEXES..")
-    doc = dom.parse(dirname + '/' + 'preloaded_regexes.xml')
-    rgxs = doc.getElementsByTagName('regex')
-    for rgx in rgxs:
-        name, expr = rgx.attributes['name'].value, rgx.attributes['expr'].value
-        if pth.isfile(dirname + '/' + 'compiled_regexes/{}.regex'.format(name)):
-            print('LOADING {}..'.format(name))
-            REGEXES[name] = RegEx.load(name)
-        else:
-            print('CREATING {}..'.format(name))
-            REGEXES[name] = RegEx(expr, name)
-            REGEXES[name].export()
-prepare_regexes()
+    REGEXES.warm_up(jobs=jobs)
 # print(json.dumps({'%s' % type(NUMBER._groups).__name__ : process_operator(NUMBER._groups)}, indent=4))
 # print(process_operator(WHILE))
 # # FOR REALLY SMALL CHARACTER VOCABULARY LOADING IS 3-4 TIMES SLOWER, FOR BIG VOCABULARY
@@ -0,0 +1,127 @@
+"""
+Defines asyncio adapters for matching and lexing streams.
+
+All adapters take an asyncio.StreamReader (or anything with an async read(n) method)
+or any async iterator of bytes or str chunks. Chunks are read only when the consumer
+asks for more results, so a slow consumer applies backpressure to the source.
+Work is done in slices and control is returned to the event loop between slices,
+so one huge chunk doesn't stall other tasks.
+"""
+import asyncio
+import codecs
+
+CHUNK_SIZE = 64 * 1024 # bytes requested from a reader at once
+SLICE_SIZE = 1024 # characters processed between two event loop yields
+MAX_BUFFER = 64 * 1024 # characters a lexer may hold back waiting for a token to end
+
+async def _chunks(source, encoding: str = 'utf-8', chunk_size: int = CHUNK_SIZE):
+    """
+    Reads decoded text chunks from a source.
+
+    :param source: StreamReader-like object or an async iterator of bytes or str
+    :param str encoding: encoding used to decode bytes
+    :param int chunk_size: number of bytes read at once from a reader
+    :return: async iterator of str chunks
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    if hasattr(source, 'read'):
+        while True:
+            chunk = await source.read(chunk_size)
+            if not chunk:
+                break
+            yield decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+    else:
+        async for chunk in source:
+            yield decoder.decode(chunk) if isinstance(chunk, (bytes, bytearray)) else chunk
+    rest = decoder.decode(b'', final=True)
+    if rest:
+        yield rest
+
+async def _slices(source, encoding: str, chunk_size: int, slice_size: int):
+    """
+    Splits decoded chunks into slices and yields control to the event loop after each one.
+
+    :param source: StreamReader-like object or an async iterator of bytes or str
+    :param str encoding: encoding used to decode bytes
+    :param int chunk_size: number of bytes read at once from a reader
+    :param int slice_size: maximum slice length
+    :return: async iterator of str slices
+    """
+    async for chunk in _chunks(source, encoding, chunk_size):
+        for start in range(0, len(chunk), slice_size):
+            yield chunk[start:start + slice_size]
+            await asyncio.sleep(0)
+
+async def accepts(matcher, source, encoding: str = 'utf-8',
+                  chunk_size: int = CHUNK_SIZE, slice_size: int = SLICE_SIZE)->bool:
+    """
+    Checks if a whole stream is accepted, in constant memory.
+
+    :param matcher: a RegEx or a finite automaton (anything with feed and finish)
+    :param source: StreamReader-like object or an async iterator of bytes or str
+    :param str encoding: encoding used to decode bytes
+    :param int chunk_size: number of bytes read at once from a reader
+    :param int slice_size: characters processed between two event loop yields
+    :return bool: True if accepted, False if not
+    """
+    async for text in _slices(source, encoding, chunk_size, slice_size):
+        matcher.feed(text)
+    return matcher.finish()
+
+async def match_lines(matcher, source, encoding: str = 'utf-8',
+                      chunk_size: int = CHUNK_SIZE, slice_size: int = SLICE_SIZE):
+    """
+    Checks every line of a stream and yields (line index, accepted) pairs.
+    Lines are fed to the matcher piece by piece, so they can be of any length.
+    Lines are separated by '\\n', which is not a part of the line.
+
+    :param matcher: a RegEx or a finite automaton (anything with feed and finish)
+    :param source: StreamReader-like object or an async iterator of bytes or str
+    :param str encoding: encoding used to decode bytes
+    :param int chunk_size: number of bytes read at once from a reader
+    :param int slice_size: characters processed between two event loop yields
+    :return: async iterator of (int, bool) tuples
+    """
+    index = 0
+    pending = False # True if the last line has been started but not finished
+    async for text in _slices(source, encoding, chunk_size, slice_size):
+        *lines, last = text.split('\n')
+        for line in lines:
+            matcher.feed(line)
+            yield index, matcher.finish()
+            index += 1
+        if last:
+            matcher.feed(last)
+            pending = True
+        else:
+            pending = False
+    if pending:
+        yield index, matcher.finish()
+
+async def scan(lexer, source, encoding: str = 'utf-8', chunk_size: int = CHUNK_SIZE,
+               slice_size: int = SLICE_SIZE, max_buffer: int = MAX_BUFFER):
+    """
+    Scans a stream with a Lexer and yields tokens as soon as they are complete.
+
+    The last token of the text read so far might continue in the next chunk, so its
+    text is held back and scanned again. A token longer than max_buffer is split.
+
+    :param Lexer lexer: a lexer
+    :param source: StreamReader-like object or an async iterator of bytes or str
+    :param str encoding: encoding used to decode bytes
+    :param int chunk_size: number of bytes read at once from a reader
+    :param int slice_size: characters processed between two event loop yields
+    :param int max_buffer: maximum number of characters held back
+    :return: async iterator of tokens
+    """
+    carry = ''
+    async for text in _slices(source, encoding, chunk_size, slice_size):
+        tokens = lexer._internal_scan(carry + text)
+        if tokens and len(tokens[-1].token_value) <= max_buffer:
+            carry = tokens.pop().token_value
+        else:
+            carry = ''
+        for token in lexer._clean_ignored(tokens):
+            yield token
+    for token in lexer.scan(carry) if carry else ():
+        yield token
@@ -0,0 +1,238 @@
+"""
+Defines a single-pass regular expression parser.
+
+The parser reads a regex text once, left to right, and builds a tree of
+grammar.operators. Groups are kept on an explicit stack instead of recursion,
+so parsing is linear in the length of the text and nesting depth is unlimited.
+
+Grammar (from the lowest precedence):
+    alternation     concatenation ('|' concatenation)*
+    concatenation   repetition repetition*
+    repetition      atom ('*' | '+' | '?' | '{' number (',' number?)? '}')*
+    atom            character | '\\' character | '[' character '-' character ']' | '(' alternation ')'
+
+A '{' that doesn't start a valid bound is an ordinary character. Texts with a
+valid bound such as a{2}, a{2,} or a{1,3} matched themselves literally before
+bounded repetitions existed and now repeat their item instead, which is why
+grammar.cache.SEMANTICS was bumped with them.
+"""
+import grammar.operators as operators
+import misc.errors as err
+
+UNARY_OPERATORS = {'*': operators.KleeneStar,
+                   '+': operators.KleenePlus,
+                   '?': operators.QuestionMark}
+MAX_REPETITION = 1000 # largest bound of a repetition, its item is copied that many times
+
+class _Group:
+    """
+    A group being parsed: finished alternatives and items of the current one.
+    """
+    __slots__ = ('start', 'alternatives', 'items')
+
+    def __init__(self, start: int):
+        """
+        :param int start: position of the opening parenthesis, -1 for the whole text
+        """
+        self.start = start
+        self.alternatives = []
+        self.items = []
+
+def _concatenate(items: list):
+    """
+    :param list items: characters and operators
+    :return: a single item or a Concatenation of all items
+    """
+    return items[0] if len(items) == 1 else operators.Concatenation(*items)
+
+def _alternate(alternatives: list):
+    """
+    :param list alternatives: characters and operators
+    :return: a single item or an Alternation of all items
+    """
+    return alternatives[0] if len(alternatives) == 1 else operators.Alternation(*alternatives)
+
+class Parser:
+    """
+    Parses regex texts into operator trees.
+    Raises a RegexSyntaxError with the position of the first error.
+    """
+
+    def __init__(self, text: str):
+        """
+        :param str text: regex text
+        """
+        self.text = text
+        self.position = 0
+
+    def _error(self, message: str, position: int = None):
+        """
+        Creates a syntax error at a position (the current position by default).
+
+        :param str message: error description
+        :param int position: position in the text
+        :return RegexSyntaxError: error to be raised
+        """
+        return err.RegexSyntaxError(message, self.text, self.position if position is None else position)
+
+    def _character(self)->str:
+        """
+        Reads a single, possibly escaped, character.
+
+        :return str: character
+        """
+        text = self.text
+        if self.position >= len(text):
+            raise self._error('Unexpected end of expression')
+        char = text[self.position]
+        if char == '\\':
+            self.position += 1
+            if self.position >= len(text):
+                raise self._error('Nothing to escape', self.position - 1)
+            char = text[self.position]
+        self.position += 1
+        return char
+
+    def _expect(self, char: str):
+        """
+        Reads an exact character.
+
+        :param str char: expected character
+        :return:
+        """
+        if self.position >= len(self.text) or self.text[self.position] != char:
+            raise self._error('Expected {!r}'.format(char))
+        self.position += 1
+
+    def _bound(self)->str:
+        """
+        Reads a collation bound; '-' and ']' have to be escaped.
+
+        :return str: character
+        """
+        if self.text[self.position:self.position + 1] in ('-', ']'):
+            raise self._error('Expected a character')
+        return self._character()
+
+    def _collation(self)->operators.Collation:
+        """
+        Reads a collation after its opening bracket.
+
+        :return Collation: collation
+        """
+        start = self.position - 1
+        first = self._bound()
+        self._expect('-')
+        last = self._bound()
+        self._expect(']')
+        if first > last:
+            raise self._error('Empty collation [{}-{}]'.format(first, last), start)
+        return operators.Collation(first, last)
+
+    def _number(self)->int:
+        """
+        Reads a decimal number.
+
+        :return int: number or None if there are no digits at the current position
+        """
+        start = self.position
+        while self.position < len(self.text) and self.text[self.position] in '0123456789':
+            self.position += 1
+        return int(self.text[start:self.position]) if self.position > start else None
+
+    def _repetition(self)->tuple:
+        """
+        Reads repetition bounds {m}, {m,} or {m,n} at the current position.
+        The position doesn't change if there is no valid bound.
+
+        :return tuple: (minimum, maximum or None if unbounded) or None if there is no bound
+        """
+        start = self.position
+        self.position += 1
+        minimum = maximum = self._number()
+        if minimum is not None and self.text[self.position:self.position + 1] == ',':
+            self.position += 1
+            maximum = self._number()
+        if minimum is None or self.text[self.position:self.position + 1] != '}':
+            self.position = start
+            return None
+        self.position += 1
+        if maximum is not None and maximum < minimum:
+            raise self._error('Invalid repetition bounds', start)
+        if max(minimum, maximum or 0) > MAX_REPETITION:
+            raise self._error('Repetition bound over {}'.format(MAX_REPETITION), start)
+        return minimum, maximum
+
+    def _finish(self, group: _Group):
+        """
+        Ends a group at the current position.
+
+        :param _Group group: group to end
+        :return: a character or an operator
+        """
+        if not group.items:
+            raise self._error('Empty alternative')
+        group.alternatives.append(_concatenate(group.items))
+        return _alternate(group.alternatives)
+
+    def parse(self)->operators.Operator:
+        """
+        Parses the whole text.
+
+        :return Operator: root operator
+        """
+        text = self.text
+        stack = [_Group(-1)]
+        while self.position < len(text):
+            char = text[self.position]
+            group = stack[-1]
+            if char == '(':
+                stack.append(_Group(self.position))
+                self.position += 1
+            elif char == ')':
+                if len(stack) == 1:
+                    raise self._error('Unbalanced parentheses')
+                item = self._finish(stack.pop())
+                stack[-1].items.append(item)
+                self.position += 1
+            elif char == '|':
+                if not group.items:
+                    raise self._error('Empty alternative')
+                group.alternatives.append(_concatenate(group.items))
+                group.items = []
+                self.position += 1
+            elif char in UNARY_OPERATORS:
+                if not group.items:
+                    raise self._error('Nothing to repeat')
+                group.items[-1] = UNARY_OPERATORS[char](group.items[-1])
+                self.position += 1
+            elif char == '{':
+                start = self.position
+                bounds = self._repetition()
+                if bounds is None:
+                    group.items.append(self._character())
+                elif not group.items:
+                    raise self._error('Nothing to repeat', start)
+                else:
+                    group.items[-1] = operators.Repetition(group.items[-1], *bounds)
+            elif char == '[':
+                self.position += 1
+                group.items.append(self._collation())
+            elif char == ']':
+                raise self._error('Unbalanced brackets')
+            else:
+                group.items.append(self._character())
+
+        if len(stack) > 1:
+            raise self._error('Unbalanced parentheses', stack[-1].start)
+        root = self._finish(stack[0])
+        return operators.Single(root) if isinstance(root, str) else root
+
+def parse(text: str)->operators.Operator:
+    """
+    Parses a regex text into an operator tree.
+
+    :param str text: regex text
+    :return Operator: root operator
+    """
+    return Parser(text).parse()
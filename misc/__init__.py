@@ -1,4 +1,4 @@
 """
 Holds all modules that don't belong to a specific package.
 """
-from . import errors, command_testers, helper
+from . import errors, command_testers, helper, daemon, grep
@@ -0,0 +1,142 @@
+"""
+Defines compile benchmarks of regex strategies (see grammar.operators.Minimization).
+
+Every pattern is parsed into a fresh, unshared operator tree and compiled once per
+strategy, so no compiled rows are reused between measurements. Time is measured with
+time.perf_counter and peak memory with tracemalloc, which slows compiling down but
+affects every strategy the same way.
+
+Registries are warmed up with compile caches disabled, so every pattern is compiled
+by every measurement, see warm_up.
+
+Searches are measured on generated texts of several megabytes once the search automata
+are compiled, see search.
+"""
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+from xml.etree import ElementTree
+import grammar.operators as operators
+import grammar.optimizer as opt
+import grammar.regular_expressions as rgx
+import grammar.syntax as sx
+
+STRATEGIES = {'whole': None, 'bottom-up': operators.Minimization()}
+
+def preloaded()->dict:
+    """
+    :return dict: name -> text of every regex in preloaded_regexes.xml
+    """
+    return dict(rgx.REGEXES.definitions)
+
+def synthetic(size: int = 8)->dict:
+    """
+    Creates larger patterns built the way big lexer rules are: repeated and
+    alternated copies of identifiers, numbers and vocabularies of words.
+
+    :param int size: number of repetitions in every pattern
+    :return dict: name -> text
+    """
+    identifier = '([a-z]|[A-Z]|_)([a-z]|[A-Z]|[0-9]|_)*'
+    number = '(([0-9]+.[0-9]*)|([0-9]*.[0-9]+))'
+    words = '|'.join(''.join(word) for word in itertools.islice(itertools.product('abcdefgh', repeat=4), 0, None, 37))
+    return {
+        'ARGUMENTS': '{0}( *, *{0}){{0,{1}}}'.format(identifier, size),
+        'ASSIGNMENTS': '({0} *= *({1}|{0}) *;? *){{1,{2}}}'.format(identifier, number, size),
+        'NESTED': '(' * size + '(ab|cd)*x' + ')+' * size,
+        'WORDS': '(({}) ){{1,{}}}'.format(words, size),
+        'PHRASES': '((({}) )+[0-9]){{1,{}}}'.format(words, size),
+    }
+
+def searches(size: int)->dict:
+    """
+    Creates search benchmarks: patterns matched in a generated source text and a pattern
+    whose automaton stays alive long after every match, which made searching quadratic.
+
+    :param int size: number of characters of every text
+    :return dict: name -> (regex text, text)
+    """
+    lines = ''.join('value_{0} = compute(x{0}, {0}.5) + {1}; # ERROR {1}\n'.format(index, index % 97)
+                    for index in range(1000))
+    source = (lines * (size // len(lines) + 1))[:size]
+    return {
+        'INTEGER': ('[0-9]+', source),
+        'IDENTIFIER': ('([a-z]|[A-Z]|_)([a-z]|[A-Z]|[0-9]|_)*', source),
+        'ERROR': ('ERROR [0-9]+', source),
+        'ABSENT': ('[0-9]+ms', source),
+        'UNBOUNDED': ('[a-x]|[a-y][a-y]*z', 'x' * size),
+    }
+
+def search(benchmarks: dict):
+    """
+    Finds all matches of every pattern in its text once.
+    Compiling the pattern and its search automata isn't measured.
+
+    :param dict benchmarks: name -> (regex text, text), see searches
+    :return: generator of (name, seconds, number of matches)
+    """
+    for name, (pattern, text) in benchmarks.items():
+        regex = rgx.RegEx(pattern)
+        regex.findall(text[:1000])
+        started = time.perf_counter()
+        matches = sum(1 for _ in regex.finditer(text))
+        yield name, time.perf_counter() - started, matches
+
+def measure(text: str, strategy)->tuple:
+    """
+    Compiles a pattern once.
+
+    :param str text: regex text
+    :param Minimization strategy: compile strategy, None for a single epsilon NFA
+    :return tuple: (seconds, peak bytes, number of DFA states)
+    """
+    tree = opt.optimize(sx.parse(text))
+    tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        automaton = tree.execute(strategy=strategy)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return seconds, peak, automaton.table.size
+
+def run(patterns: dict, strategies: dict = None):
+    """
+    Measures every pattern with every strategy.
+
+    :param dict patterns: name -> regex text
+    :param dict strategies: strategy name -> strategy, STRATEGIES by default
+    :return: generator of (pattern name, strategy name, seconds, peak bytes, DFA states)
+    """
+    for name, text in patterns.items():
+        for label, strategy in (STRATEGIES if strategies is None else strategies).items():
+            yield (name, label) + measure(text, strategy)
+
+def warm_up(patterns: dict, jobs: int)->float:
+    """
+    Compiles all patterns as a registry once, see RegexRegistry.warm_up.
+
+    :param dict patterns: name -> regex text
+    :param int jobs: number of compiling processes
+    :return float: seconds, including starting the pool and loading sent back regexes
+    """
+    root = ElementTree.Element('regexes')
+    for name, text in patterns.items():
+        ElementTree.SubElement(root, 'regex', name=name, expr=text)
+    descriptor, path = tempfile.mkstemp(suffix='.xml')
+    os.close(descriptor)
+    caches = rgx.RegEx.cache, rgx.RegEx.compiled
+    rgx.RegEx.cache = rgx.RegEx.compiled = None
+    try:
+        ElementTree.ElementTree(root).write(path)
+        registry = rgx.RegexRegistry(path)
+        registry.definitions # reading the file isn't measured
+        started = time.perf_counter()
+        registry.warm_up(jobs=jobs)
+        return time.perf_counter() - started
+    finally:
+        rgx.RegEx.cache, rgx.RegEx.compiled = caches
+        os.remove(path)
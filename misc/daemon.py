@@ -0,0 +1,267 @@
+"""
+Defines a local matching daemon and its client.
+
+The daemon keeps the library imported and compiled regexes in memory and
+serves requests over a Unix domain socket, so a request costs only the
+simulation itself instead of interpreter startup and imports.
+
+Protocol: every message is a frame made of a 4 byte big-endian length followed
+by that many bytes of UTF-8 encoded JSON. A client sends a request frame
+{"command": ..., ...} and receives a response frame {"ok": true, "output": ...}
+or {"ok": false, "error": ...}. Many requests can be sent over one connection
+and every connection is served by its own thread.
+"""
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import threading
+
+DEFAULT_SOCKET = os.path.join(os.path.expanduser('~'), '.lingua.sock')
+MAX_FRAME = 64 * 1024 * 1024
+MAX_REGEXES = 256 # compiled regexes kept by a daemon
+
+_HEADER = struct.Struct('>I')
+
+def send_frame(sock: socket.socket, message: dict):
+    """
+    Sends a single framed message.
+
+    :param socket sock: connected socket
+    :param dict message: JSON-serializable message
+    :return:
+    """
+    payload = json.dumps(message).encode()
+    if len(payload) > MAX_FRAME:
+        raise ValueError('Frame of {} bytes is too large.'.format(len(payload)))
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+def _receive_exactly(sock: socket.socket, size: int)->bytes:
+    """
+    Receives exactly size bytes.
+
+    :param socket sock: connected socket
+    :param int size: number of bytes
+    :return bytes: received bytes, empty if the connection closed before the first byte
+    """
+    data = bytearray()
+    while len(data) < size:
+        part = sock.recv(size - len(data))
+        if not part:
+            if data:
+                raise ConnectionError('Connection closed in the middle of a frame.')
+            return b''
+        data += part
+    return bytes(data)
+
+def _receive_payload(sock: socket.socket):
+    """
+    Receives the payload of a single frame.
+
+    :param socket sock: connected socket
+    :return bytes: payload or None if the connection was closed
+    """
+    header = _receive_exactly(sock, _HEADER.size)
+    if not header:
+        return None
+    size, = _HEADER.unpack(header)
+    if size > MAX_FRAME:
+        raise ValueError('Frame of {} bytes is too large.'.format(size))
+    payload = _receive_exactly(sock, size)
+    if len(payload) != size:
+        raise ConnectionError('Connection closed in the middle of a frame.')
+    return payload
+
+def receive_frame(sock: socket.socket):
+    """
+    Receives a single framed message.
+
+    :param socket sock: connected socket
+    :return dict: message or None if the connection was closed
+    """
+    payload = _receive_payload(sock)
+    return None if payload is None else json.loads(payload.decode())
+
+class Client:
+    """
+    Thin daemon client. Keeps a single connection open for all requests.
+    """
+
+    def __init__(self, path: str = DEFAULT_SOCKET):
+        """
+        Connects to a daemon.
+
+        :param str path: daemon socket path
+        """
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+
+    def request(self, command: str, **arguments):
+        """
+        Sends a request and waits for the output.
+        Raises a RuntimeError if the daemon failed to process the request.
+
+        :param str command: command name (see Daemon.commands)
+        :param arguments: command arguments
+        :return: command output
+        """
+        arguments['command'] = command
+        send_frame(self._socket, arguments)
+        response = receive_frame(self._socket)
+        if response is None:
+            raise ConnectionError('Daemon closed the connection.')
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response['output']
+
+    def close(self):
+        """
+        Closes the connection.
+
+        :return:
+        """
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class _Handler(socketserver.BaseRequestHandler):
+    """
+    Serves all requests of a single connection.
+    """
+
+    def handle(self):
+        while True:
+            try:
+                payload = _receive_payload(self.request)
+            except (ConnectionError, ValueError):
+                return
+            if payload is None:
+                return
+            try:
+                request = json.loads(payload.decode())
+            except ValueError as error: # the frame was complete, so the connection can go on
+                send_frame(self.request, {'ok': False, 'error': 'Invalid JSON: {}'.format(error)})
+                continue
+            send_frame(self.request, self.server.daemon.dispatch(request))
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves every connection in its own thread, so an idle client doesn't block others.
+    """
+    daemon_threads = True
+    block_on_close = False
+
+def _remove_stale(path: str):
+    """
+    Removes a socket file left behind by a daemon that is no longer running.
+    Raises a FileExistsError if the path is not a socket or a daemon still listens on it.
+
+    :param str path: socket path
+    :return:
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError('{} exists and is not a socket.'.format(path))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.remove(path)
+            return
+    raise FileExistsError('A daemon is already listening on {}.'.format(path))
+
+class Daemon:
+    """
+    Matching daemon. Connections are served concurrently but requests are executed
+    one at a time, so automata and regexes are never used by two requests at once.
+    """
+
+    def __init__(self, path: str = DEFAULT_SOCKET):
+        """
+        Imports everything needed and binds the daemon socket.
+
+        :param str path: socket path; a stale socket file is removed, anything else raises a FileExistsError
+        """
+        import form.preformat as pf
+        import form.compositors as cs
+        import grammar.cache as ch
+        import grammar.regular_expressions as rgx
+
+        self._regex = rgx
+        self._regexes = ch.LRUCache(MAX_REGEXES)
+        self._lock = threading.Lock()
+
+        self.commands = {
+            'ping': lambda request: 'pong',
+            'shutdown': self._shutdown,
+            'SimEnka': lambda request: cs.StandardCompositor(
+                pf.get_e_nfa(request['text'])).composite_output(),
+            'SimPa': lambda request: cs.StandardPushDownCompositor(
+                pf.get_dpda(request['text'])).composite_output(),
+            'SimTS': lambda request: cs.StandardTuringMachineCompositor(
+                pf.get_turing(request['text'])).composite_output(),
+            'MinDka': lambda request: cs.StandardCompositor(
+                pf.get_dfa_min(request['text'])).composite_automaton(),
+            'RegEx': lambda request: [self._compile(request['pattern']).check(text)
+                                      for text in request['texts']],
+        }
+
+        self.path = path
+        _remove_stale(path)
+        self._server = _Server(path, _Handler)
+        self._server.daemon = self
+
+    def _compile(self, pattern: str):
+        """
+        Returns a compiled regex, compiling it only the first time.
+
+        :param str pattern: regex text
+        :return RegEx: compiled regex
+        """
+        return self._regexes.get_or_create(pattern, lambda: self._regex.RegEx(pattern))
+
+    def _shutdown(self, request):
+        # shutdown blocks until serve_forever returns, so it can't be called from a handler.
+        threading.Thread(target=self._server.shutdown).start()
+        return 'bye'
+
+    def dispatch(self, request: dict)->dict:
+        """
+        Executes a single request.
+
+        :param dict request: request message, any other decoded JSON value gets an error response
+        :return dict: response message
+        """
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': 'Request must be a JSON object, not {}.'.format(type(request).__name__)}
+        name = request.get('command')
+        command = self.commands.get(name) if isinstance(name, str) else None
+        if command is None:
+            return {'ok': False, 'error': 'Unknown command {}.'.format(request.get('command'))}
+        try:
+            with self._lock:
+                return {'ok': True, 'output': command(request)}
+        except Exception as error:
+            return {'ok': False, 'error': '{}: {}'.format(type(error).__name__, error)}
+
+    def serve_forever(self):
+        """
+        Serves requests until a shutdown request is received.
+
+        :return:
+        """
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
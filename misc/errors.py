@@ -15,3 +15,31 @@ class OperatorInputTypeError(RuntimeError):
     is not valid. For more info see grammar.operators package.
     """
     pass
+
+class RegexSyntaxError(ValueError):
+    """
+    Defines an error that is raised when a regular expression can't be parsed.
+    Carries the position of the offending character, see grammar.syntax package.
+    """
+    def __init__(self, message: str, text: str, position: int):
+        super().__init__('{} at position {}: {!r}'.format(message, position, text))
+        self.message = message
+        self.text = text
+        self.position = position
+
+class StateExplosionError(RuntimeError):
+    """
+    Defines an error that is raised when determinizing an automaton exceeds its budget.
+    Carries the sub-expression that caused it once it's known, see grammar.operators package.
+    """
+    def __init__(self, message: str, states: int, seconds: float, item=None):
+        super().__init__(message)
+        self.message = message
+        self.states = states
+        self.seconds = seconds
+        self.item = item
+
+    def __str__(self):
+        if self.item is None:
+            return self.message
+        return '{} caused by {}'.format(self.message, self.item)
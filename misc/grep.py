@@ -0,0 +1,190 @@
+"""
+Defines a parallel grep over memory-mapped files.
+
+Files are memory-mapped and split into chunks that end at newline boundaries.
+Chunks are searched by a pool of processes, every one of which compiles the
+pattern once (loading it from the compile cache when possible), and results
+are put back together in file and line order, so the output never depends
+on the number of processes.
+
+Lines are decoded as UTF-8 (invalid bytes are replaced) and a line matches
+if any part of it matches the pattern.
+"""
+import mmap
+import multiprocessing
+import os
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024 # bytes searched by a single task
+
+_regex = None # pattern compiled in a worker process, see _initialize.
+
+def split(data, size: int = DEFAULT_CHUNK_SIZE)->list:
+    """
+    Splits a buffer into chunks of about the given size, every chunk
+    except the last one ends right after a newline.
+
+    :param data: bytes, mmap or any object with find and len
+    :param int size: minimum chunk size in bytes
+    :return list: (start, end) byte offsets of chunks
+    """
+    chunks = []
+    start = 0
+    length = len(data)
+    while start < length:
+        newline = data.find(b'\n', min(start + size, length) - 1)
+        end = length if newline < 0 else newline + 1
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+def _initialize(pattern: str):
+    """
+    Compiles the pattern in a worker process.
+
+    :param str pattern: regex text
+    :return:
+    """
+    global _regex
+    import grammar.regular_expressions as rgx
+    _regex = rgx.RegEx(pattern)
+
+def _search(task: tuple)->tuple:
+    """
+    Searches a single chunk of a file.
+
+    :param tuple task: (path, start offset, end offset, count only, stop after the first match)
+    :return tuple: (number of lines in the chunk, matches) where matches is a count
+                   or a list of (line index in the chunk, line offset, line) tuples
+    """
+    path, start, end, count, first = task
+    matches = 0 if count else []
+    index = 0
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        position = start
+        while position < end:
+            newline = data.find(b'\n', position, end)
+            stop = end if newline < 0 else newline
+            line = data[position:stop].decode('utf-8', 'replace')
+            if _regex.contains(line):
+                if count:
+                    matches += 1
+                else:
+                    matches.append((index, position, line))
+                if first:
+                    break
+            position = stop + 1
+            index += 1
+        else:
+            return index, matches
+    return None, matches
+
+def _tasks(paths: list, chunk_size: int, count: bool, first: bool, on_error=None)->list:
+    """
+    Splits all files into chunks. A path given more than once is only split once.
+
+    :param list paths: file paths
+    :param int chunk_size: minimum chunk size in bytes
+    :param bool count: tasks only count matching lines
+    :param bool first: tasks stop after the first matching line
+    :param on_error: function called with the path and the OSError of a file that can't be read,
+                     which is then skipped; None raises the error
+    :return list: (path, task) tuples in file order
+    """
+    tasks = []
+    for path in dict.fromkeys(paths): # unique paths in their order
+        try:
+            if os.path.getsize(path) == 0: # empty files can't be mapped
+                continue
+            with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                chunks = split(data, chunk_size)
+        except OSError as error:
+            if on_error is None:
+                raise
+            on_error(path, error)
+            continue
+        tasks.extend((path, (path, start, end, count, first)) for start, end in chunks)
+    return tasks
+
+def _results(pattern: str, tasks: list, jobs: int):
+    """
+    Runs tasks in order, in a pool of processes if more than one job is allowed.
+
+    :param str pattern: regex text
+    :param list tasks: (path, task) tuples
+    :param int jobs: number of processes, None for all cores
+    :return: generator of (path, task result) tuples in task order
+    """
+    import grammar.regular_expressions as rgx
+    rgx.RegEx(pattern) # reports syntax errors early and fills the compile cache for workers
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(tasks) < 2:
+        _initialize(pattern)
+        for path, task in tasks:
+            yield path, _search(task)
+        return
+    with multiprocessing.Pool(min(jobs, len(tasks)), _initialize, (pattern,)) as pool:
+        for (path, _), result in zip(tasks, pool.imap(_search, [task for _, task in tasks])):
+            yield path, result
+
+def grep(pattern: str, paths: list, jobs: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE, on_error=None):
+    """
+    Finds all lines matching a pattern.
+    Raises a RegexSyntaxError if the pattern is invalid.
+
+    :param str pattern: regex text
+    :param list paths: file paths
+    :param int jobs: number of processes, None for all cores
+    :param int chunk_size: minimum chunk size in bytes
+    :param on_error: called with the path and the OSError of an unreadable file, None raises it
+    :return: generator of (path, line number, byte offset, line) tuples in file and line order,
+             line numbers start at 1 and lines are without their line endings
+    """
+    lines = 0
+    previous = None
+    for path, (count, matches) in _results(pattern, _tasks(paths, chunk_size, False, False, on_error), jobs):
+        if path != previous:
+            lines = 0
+            previous = path
+        for index, offset, line in matches:
+            yield path, lines + index + 1, offset, line
+        lines += count
+
+def count(pattern: str, paths: list, jobs: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE, on_error=None)->list:
+    """
+    Counts lines matching a pattern in every file.
+    Raises a RegexSyntaxError if the pattern is invalid.
+
+    :param str pattern: regex text
+    :param list paths: file paths
+    :param int jobs: number of processes, None for all cores
+    :param int chunk_size: minimum chunk size in bytes
+    :param on_error: called with the path and the OSError of an unreadable file, None raises it
+    :return list: (path, number of matching lines) tuples in file order, without unreadable files
+    """
+    counts = dict.fromkeys(paths, 0)
+    def skip(path, error):
+        del counts[path]
+        on_error(path, error)
+    tasks = _tasks(paths, chunk_size, True, False, None if on_error is None else skip)
+    for path, (_, matches) in _results(pattern, tasks, jobs):
+        counts[path] += matches
+    return list(counts.items())
+
+def files(pattern: str, paths: list, jobs: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE, on_error=None)->list:
+    """
+    Finds files containing a line matching a pattern.
+    Every chunk stops searching at its first matching line.
+    Raises a RegexSyntaxError if the pattern is invalid.
+
+    :param str pattern: regex text
+    :param list paths: file paths
+    :param int jobs: number of processes, None for all cores
+    :param int chunk_size: minimum chunk size in bytes
+    :param on_error: called with the path and the OSError of an unreadable file, None raises it
+    :return list: matching file paths in file order
+    """
+    found = []
+    for path, (_, matches) in _results(pattern, _tasks(paths, chunk_size, False, True, on_error), jobs):
+        if matches and (not found or found[-1] != path):
+            found.append(path)
+    return found
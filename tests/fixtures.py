@@ -0,0 +1,25 @@
+"""
+Defines fixtures shared by test modules.
+
+A test module that compiles regexes imports setUpModule and tearDownModule from here,
+so its regexes are always compiled and the user's on-disk compile cache is neither
+read nor filled by the tests.
+"""
+from grammar.cache import CACHE
+from grammar.regular_expressions import RegEx
+
+def setUpModule():
+    """
+    Disables the on-disk compile cache while the tests of a module run.
+
+    :return:
+    """
+    RegEx.cache = None
+
+def tearDownModule():
+    """
+    Restores the on-disk compile cache.
+
+    :return:
+    """
+    RegEx.cache = CACHE
@@ -0,0 +1,31 @@
+"""
+Defines alphabet partition tests.
+"""
+import unittest
+from automata.alphabet import Partition, normalize
+
+class TestPartition(unittest.TestCase):
+
+    def setUp(self):
+        self.partition = Partition([48, 58, 97, 123], ['0', None, 'a', None])
+
+    def test_normalize(self):
+        self.assertEqual(normalize([(5, 9), (1, 2), (3, 3), (8, 12), (20, 20)]), [(1, 3), (5, 12), (20, 20)])
+
+    def test_symbol(self):
+        self.assertEqual(self.partition.symbol('7'), '0')
+        self.assertEqual(self.partition.symbol('q'), 'a')
+        self.assertIsNone(self.partition.symbol(' '))
+        self.assertIsNone(self.partition.symbol('A'))
+        self.assertIsNone(self.partition.symbol('~'))
+        self.assertIsNone(self.partition.symbol('ab'))
+
+    def test_intervals(self):
+        self.assertEqual(self.partition.intervals(), [(48, 57, '0'), (97, 122, 'a')])
+        self.assertEqual(Partition.from_list(self.partition.to_list()), self.partition)
+
+    def test_merge(self):
+        self.assertEqual(Partition([1, 2, 3], ['a', 'a', None]).starts, [1, 3])
+        merged = self.partition.merge({'a': '0'})
+        self.assertEqual(merged.symbol('q'), '0')
+        self.assertEqual(merged.intervals(), [(48, 57, '0'), (97, 122, '0')])
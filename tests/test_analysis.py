@@ -0,0 +1,66 @@
+"""
+Defines operator tree analysis tests.
+"""
+import unittest
+from grammar.analysis import Literals, Properties, literals, properties, strings
+from grammar.optimizer import optimize
+from grammar.syntax import parse
+
+class TestLiterals(unittest.TestCase):
+
+    def _literals(self, text):
+        return literals(optimize(parse(text)))
+
+    def test_exact(self):
+        self.assertEqual(self._literals('while'), Literals('while'))
+        self.assertEqual(self._literals('ab(c|c)[d-d]').exact, 'abcd')
+
+    def test_prefix_and_suffix(self):
+        self.assertEqual(self._literals('ERROR [0-9]+'), Literals(None, 'ERROR ', '', 'ERROR '))
+        self.assertEqual(self._literals('[0-9]+ms'), Literals(None, '', 'ms', 'ms'))
+        self.assertEqual(self._literals('(xab|yab)+'), Literals(None, '', 'ab', 'ab'))
+
+    def test_required(self):
+        tree = self._literals('[a-z]*=(==)+x?')
+        self.assertEqual((tree.prefix, tree.suffix, tree.required), ('', '', '==='))
+        self.assertEqual(self._literals('a*|b').required, '')
+        self.assertEqual(self._literals('(ab){2}').exact, 'abab')
+        self.assertEqual(self._literals('x{2,5}').prefix, 'xx')
+
+class TestStrings(unittest.TestCase):
+
+    def test_finite(self):
+        self.assertEqual(strings(optimize(parse('(a|b)c?')), 10), {'a', 'b', 'ac', 'bc'})
+        self.assertEqual(strings(parse('[0-2]'), 10), {'0', '1', '2'})
+        self.assertEqual(strings(parse('a{1,3}'), 10), {'a', 'aa', 'aaa'})
+
+    def test_limit(self):
+        self.assertIsNone(strings(parse('[0-9][0-9]'), 50))
+        self.assertIsNone(strings(parse('a*'), 50))
+        self.assertIsNone(strings(parse('[0-9]{2,3}'), 50))
+
+class TestProperties(unittest.TestCase):
+
+    def _properties(self, text):
+        return properties(optimize(parse(text)))
+
+    def test_lengths(self):
+        self.assertEqual(self._properties('ab(c|de)f?'), Properties(False, 3, 5, [(97, 97)]))
+        self.assertEqual(self._properties('a?b*[0-9]'), Properties(False, 1, None, [(48, 57), (97, 98)]))
+        self.assertEqual(self._properties('(ab){2,3}|x*'), Properties(True, 0, None, [(97, 97), (120, 120)]))
+        self.assertTrue(self._properties('(a|bc){0,4}').finite)
+        self.assertFalse(self._properties('a+').finite)
+
+    def test_memoized(self):
+        tree = optimize(parse('[a-z]+=[0-9]'))
+        self.assertIs(properties(tree), properties(tree))
+        self.assertIs(tree._items[0]._properties, properties(tree._items[0]))
+
+    def test_admits(self):
+        item = self._properties('[a-c]x{1,2}')
+        self.assertTrue(item.admits('bx'))
+        self.assertTrue(item.admits('..axx', 2))
+        self.assertFalse(item.admits('dx'))
+        self.assertFalse(item.admits('b'))
+        self.assertFalse(item.admits('axxx'))
+        self.assertFalse(item.admits('axx', 0, 1))
@@ -0,0 +1,114 @@
+"""
+Defines binary automaton format tests.
+"""
+import os
+import tempfile
+import unittest
+import automata.binary as binary
+from automata.nfa import NFA, EpsilonNFA
+from automata.pda import DeterministicPDA
+from automata.state import State
+from form.generators import StandardFormatGenerator
+from grammar.lexers import Lexer
+from grammar.regular_expressions import RegEx, REGEXES
+from tests.fixtures import setUpModule, tearDownModule
+
+class TestBinaryFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.definition = """s0,s1,s2
+0,1
+s1,s2
+s0
+s0,0->s1
+s0,1->s2
+s1,1->s2,s0
+s2,0->s1"""
+
+    def _round_trip(self, automaton):
+        data = binary.dumps(automaton)
+        self.assertEqual(len(data) % 4, 0)
+        loaded = binary.loads(data)
+        self.assertIs(type(loaded), type(automaton))
+        self.assertEqual(loaded.fingerprint, automaton.fingerprint)
+        return loaded
+
+    def test_dfa(self):
+        automaton = RegEx('(a|b)*abb', 'abb').automaton
+        loaded = self._round_trip(automaton)
+        self.assertTrue(loaded.output(*'aabb'))
+        loaded = self._round_trip(RegEx('[0-9]+x').automaton)
+        self.assertEqual(loaded.partition, RegEx('[0-9]+x').automaton.partition)
+        self.assertTrue(loaded.table.match('1234x'))
+
+    def test_nfa(self):
+        self._round_trip(NFA.factory(self.definition, StandardFormatGenerator()))
+        loaded = self._round_trip(EpsilonNFA.factory(self.definition, StandardFormatGenerator()))
+        self.assertEqual(loaded.epsilon, '$')
+
+    def test_errors(self):
+        data = binary.dumps(RegEx('[0-9]+').automaton)
+        with self.assertRaises(ValueError):
+            binary.loads(data[:-4])
+        with self.assertRaises(ValueError):
+            binary.loads(b'XXXX' + data[4:])
+        with self.assertRaises(TypeError):
+            start = State('q0', 1)
+            binary.dumps(DeterministicPDA({start.name: start}, set(), start, set(), 'K'))
+
+    def test_regex(self):
+        regex = RegEx.loads(REGEXES['FLOAT'].dumps())
+        self.assertEqual(regex.name, 'FLOAT')
+        self.assertTrue(regex.check('1.5'))
+        self.assertFalse(regex.check('.'))
+
+    def test_lexer(self):
+        lexer = Lexer(REGEXES['WHILE'], REGEXES['VARIABLE']).add_ignored_characters(' ')
+        loaded = Lexer.loads(lexer.dumps())
+        self.assertEqual(str(loaded.scan('while whiles')), str(lexer.scan('while whiles')))
+
+class TestMappedDFA(unittest.TestCase):
+
+    def setUp(self):
+        descriptor, self.path = tempfile.mkstemp(suffix='.dfa')
+        os.close(descriptor)
+        self.regex = RegEx('(a|b)*abb', 'abb')
+        binary.dump(self.regex.automaton, self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_match(self):
+        with binary.MappedDFA(self.path) as mapped:
+            self.assertEqual(mapped.size, self.regex.automaton.table.size)
+            self.assertEqual(mapped.names, self.regex.automaton.table.names)
+            for text in ['abb', 'aabb', 'babb', '', 'ab', 'abba', 'abc']:
+                self.assertEqual(mapped.match(text), self.regex.check(text), text)
+                self.assertEqual(mapped.match_buffer(text.encode()), self.regex.check(text), text)
+            row = mapped.run(mapped.start, 'ba')
+            self.assertTrue(mapped.accepts(mapped.run(row, 'bb')))
+
+    def test_rewrite_while_mapped(self):
+        large = RegEx('(a|b)*a(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)', 'large')
+        self.assertGreater(large.automaton.table.size, 4000)
+        binary.dump(large.automaton, self.path)
+        text = ('ab' * 600 + 'a' + 'b' * 11).encode()
+        with binary.MappedDFA(self.path) as mapped:
+            binary.dump(self.regex.automaton, self.path) # the mapped file is replaced, not truncated
+            self.assertTrue(mapped.match_buffer(text))
+            self.assertFalse(mapped.match_buffer(b'abb'))
+        with binary.MappedDFA(self.path) as mapped:
+            self.assertTrue(mapped.match_buffer(b'abb'))
+
+    def test_errors(self):
+        binary.dump(NFA.factory("""s0
+0
+s0
+s0
+s0,0->s0""", StandardFormatGenerator()), self.path)
+        with self.assertRaises(ValueError):
+            binary.MappedDFA(self.path)
+        with open(self.path, 'wb') as file:
+            file.write(b'LNGA')
+        with self.assertRaises(ValueError):
+            binary.MappedDFA(self.path)
@@ -0,0 +1,136 @@
+"""
+Defines compile cache tests.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from grammar.cache import FORMAT, SEMANTICS, CompileCache, LRUCache
+from grammar.regular_expressions import RegEx
+from tests.fixtures import setUpModule, tearDownModule
+
+class TestCompileCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = CompileCache(self.directory)
+        self.original = RegEx.cache, RegEx.compiled
+        RegEx.cache, RegEx.compiled = self.cache, None
+
+    def tearDown(self):
+        RegEx.cache, RegEx.compiled = self.original
+        shutil.rmtree(self.directory)
+
+    def test_store_load(self):
+        self.assertIsNone(self.cache.load('[0-9]+'))
+        regex = RegEx('[0-9]+')
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        loaded = self.cache.load('[0-9]+')
+        self.assertEqual(loaded.fingerprint, regex.automaton.fingerprint)
+        self.assertTrue(RegEx('[0-9]+').check('123'))
+        self.assertFalse(RegEx('[0-9]+').check('12a'))
+
+    def test_map(self):
+        self.assertIsNone(self.cache.map('[0-9]+'))
+        RegEx('[0-9]+')
+        with self.cache.map('[0-9]+') as mapped:
+            self.assertTrue(mapped.match('123'))
+            self.assertFalse(mapped.match_buffer(b'12a'))
+
+    def test_content_addressed(self):
+        RegEx('a+', 'same_name')
+        regex = RegEx('b+', 'same_name')
+        self.assertTrue(regex.check('bb'))
+        self.assertFalse(regex.check('aa'))
+        self.assertNotEqual(self.cache.key('a+'), self.cache.key('b+'))
+
+    def test_semantics(self):
+        self.assertIn('semantics-{}'.format(SEMANTICS), FORMAT)
+        with mock.patch('grammar.cache.FORMAT', 'lingua-dfa-binary-0-semantics-0'):
+            RegEx('a{2}') # compiled by an older parser, where it meant the literal text
+        self.assertIsNone(self.cache.load('a{2}'))
+        RegEx('a{2}')
+        self.assertIsNotNone(self.cache.load('a{2}'))
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+    def test_eviction(self):
+        RegEx('a+')
+        size = self.cache.size
+        self.cache.max_size = size
+        os.utime(self.cache._path('a+'), (0, 0))
+        RegEx('b+')
+        self.assertIsNone(self.cache.load('a+'))
+        self.assertIsNotNone(self.cache.load('b+'))
+        self.cache.clear()
+        self.assertEqual(self.cache.size, 0)
+
+    def test_unwritable(self):
+        cache = CompileCache(os.path.join(self.directory, 'file'))
+        with open(cache.directory, 'w'):
+            pass
+        RegEx.cache = cache
+        self.assertTrue(RegEx('[a-z]').check('q'))
+        self.assertIsNone(cache.load('[a-z]'))
+
+class TestLRUCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(2)
+
+    def test_counters(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.cache.put('c', 3) # evicts b, a was used more recently
+        self.assertNotIn('b', self.cache)
+        self.assertIn('a', self.cache)
+        self.assertEqual(self.cache.stats, {'hits': 1, 'misses': 1, 'evictions': 1,
+                                            'size': 2, 'max_size': 2})
+        self.cache.max_size = 1
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn('c', self.cache)
+        self.cache.clear()
+        self.assertEqual(self.cache.stats['evictions'], 0)
+
+    def test_get_or_create(self):
+        created = []
+        for _ in range(3):
+            self.assertEqual(self.cache.get_or_create('a', lambda: created.append(1) or 'value'), 'value')
+        self.assertEqual(len(created), 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_disabled(self):
+        self.cache.max_size = 0
+        self.cache.put('a', 1)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_threads(self):
+        self.cache.max_size = 8
+        def work(offset):
+            for index in range(200):
+                key = (index + offset) % 16
+                self.assertEqual(self.cache.get_or_create(key, lambda: key * 2), key * 2)
+        threads = [threading.Thread(target=work, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.hits + self.cache.misses, 800)
+        self.assertLessEqual(len(self.cache), 8)
+
+    def test_regex(self):
+        original = RegEx.compiled
+        RegEx.compiled = LRUCache()
+        try:
+            first = RegEx('(a|b)*c', 'first')
+            second = RegEx('(a|b)*c', 'second')
+            self.assertIs(first.automaton, second.automaton)
+            self.assertEqual(second.name, 'second')
+            self.assertEqual(RegEx.compiled.stats['hits'], 1)
+            self.assertTrue(first.check('abac'))
+            self.assertFalse(second.check('abca'))
+        finally:
+            RegEx.compiled = original
@@ -9,6 +9,8 @@ import automata.cast_api as api
 import grammar.operators as op
 import misc.helper as hel
 import grammar.regular_expressions as rgx
+import grammar.syntax as sx
+from tests.fixtures import setUpModule, tearDownModule
 
 def casting_tester(original, cast, test_func, output_results = False):
     """
@@ -92,6 +94,32 @@ q1,1->q0,q1""", form.generators.StandardFormatGenerator()
         self.cast = api.epsilon_nfa_to_dfa(self.original)
     def test_fa_casts(self):
         casting_tester(self.original, self.cast, self.assertEqual)
+    def test_optional_prefixes(self):
+        # ([a-b])?(b)?c once produced transitions to copies of DFA states instead of the states themselves.
+        built = nfa.EpsilonNFA.factory(
+            """q0,q1,q2,q3
+a,b,c
+q3
+q0
+q0,a->q1
+q0,b->q1
+q0,$->q1
+q1,b->q2
+q1,$->q2
+q2,c->q3""", form.generators.StandardFormatGenerator()
+        )
+        for automaton in (built, sx.parse('([a-b])?(b)?c')._assemble()):
+            cast = api.epsilon_nfa_to_dfa(automaton)
+            for state in cast.states.values():
+                for targets in state.transitions.values():
+                    for target in targets:
+                        self.assertIs(cast.states.get(target.name), target)
+            for text, accepted in [('c', True), ('ac', True), ('bc', True), ('abc', True), ('bbc', True),
+                                   ('ab', False), ('cc', False)]:
+                for char in text:
+                    cast.enter(char)
+                self.assertEqual(cast.accepted, accepted, text)
+                cast.reset()
     def test_regexes(self):
         for regex in rgx.REGEXES.values():
             if regex.name == 'VARIABLE':
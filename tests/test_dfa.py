@@ -1,5 +1,9 @@
+import mmap
+import tempfile
 import unittest
 from misc.command_testers import CommandTester
+from automata.dfa import DFA
+from form.generators import StandardFormatGenerator
 
 class TestDeterministicFA(unittest.TestCase):
 
@@ -9,3 +13,69 @@ class TestDeterministicFA(unittest.TestCase):
     def test_all(self):
 
         self.executor.execute_test('dfa_min', True)
+
+class TestBufferMatching(unittest.TestCase):
+
+    def setUp(self):
+        # accepts all strings over {a, b} ending with 'ab'
+        self.test = DFA.factory("""s0,s1,s2
+a,b
+s2
+s0
+s0,a->s1
+s0,b->s0
+s1,a->s1
+s1,b->s2
+s2,a->s1
+s2,b->s0""", StandardFormatGenerator())
+
+    def test_buffers(self):
+        self.assertTrue(self.test.match_buffer(b'aab'))
+        self.assertTrue(self.test.match_buffer(bytearray(b'babab')))
+        self.assertTrue(self.test.match_buffer(memoryview(b'xxab')[2:]))
+        self.assertFalse(self.test.match_buffer(b'aba'))
+        self.assertFalse(self.test.match_buffer(b''))
+        self.assertFalse(self.test.match_buffer(b'acab'))
+        self.assertEqual(self.test.current, self.test.start_state)
+
+    def test_mmap(self):
+        with tempfile.TemporaryFile() as file:
+            file.write(b'ab' * 4096)
+            file.flush()
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                self.assertTrue(self.test.match_buffer(mapped))
+
+    def test_table(self):
+        table = self.test.table
+        self.assertEqual(table.size, 3)
+        self.assertEqual(table.symbols, ['a', 'b'])
+        self.assertIs(self.test.table, table)
+
+    def test_feed(self):
+        self.assertFalse(self.test.feed('ba'))
+        self.assertFalse(self.test.accepting)
+        self.assertTrue(self.test.feed('b'))
+        self.assertTrue(self.test.accepting)
+        self.assertFalse(self.test.feed(''.join(['a', 'b', 'a'])))
+        self.assertFalse(self.test.finish())
+        self.assertEqual(self.test.current, self.test.start_state)
+        self.assertTrue(self.test.feed('ab'))
+        self.assertTrue(self.test.finish())
+        with self.assertRaises(ValueError):
+            self.test.feed('c')
+
+    def test_snapshot(self):
+        self.test.feed('ba')
+        snapshot = self.test.snapshot()
+        copied = self.test.deepcopy()
+        copied.restore(snapshot)
+        self.assertEqual(copied.current, self.test.current)
+        self.assertTrue(copied.feed('b'))
+
+        other = DFA.factory("""s0
+a
+s0
+s0
+s0,a->s0""", StandardFormatGenerator())
+        with self.assertRaises(ValueError):
+            other.restore(snapshot)
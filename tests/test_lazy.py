@@ -0,0 +1,101 @@
+"""
+Defines lazy DFA and determinization budget tests.
+"""
+import time
+import unittest
+import automata.thompson as th
+import grammar.operators as operators
+from automata.lazy import LazyDFA
+from grammar.optimizer import optimize
+from grammar.lexers import Lexer
+from grammar.regular_expressions import RegEx
+from grammar.syntax import parse
+from misc.errors import StateExplosionError
+from tests.fixtures import setUpModule, tearDownModule
+
+# the DFA of (a|b)*a(a|b){n} has 2 ** (n + 1) states.
+EXPLOSIVE = 'x(y|(a|b)*a(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b)(a|b))'
+
+class TestBudget(unittest.TestCase):
+
+    def test_to_dfa(self):
+        builder = th.Builder()
+        fragment = parse(EXPLOSIVE)._build(builder)
+        with self.assertRaises(StateExplosionError) as context:
+            builder.to_dfa(fragment, th.Budget(max_states=100))
+        self.assertGreater(context.exception.states, 100)
+        self.assertGreater(len(builder.to_dfa(fragment, th.Budget(max_seconds=60)).states), 2 ** 11)
+
+    def test_culprit_deadline(self):
+        tree = optimize(parse('p(q|r(s|x(y|(a|b)*a' + '(a|b)' * 16 + ')))'))
+        started = time.perf_counter()
+        automaton = tree.execute(budget=th.Budget(max_seconds=0.2))
+        # determinizing the whole tree and the culprit search take 0.2 seconds each,
+        # instead of 0.2 seconds for every level of nesting.
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertIsInstance(automaton, LazyDFA)
+        self.assertIsNotNone(automaton.cause.item)
+
+    def test_fallback(self):
+        tree = optimize(parse(EXPLOSIVE))
+        automaton = tree.execute(budget=th.Budget(max_states=100))
+        self.assertIsInstance(automaton, LazyDFA)
+        self.assertIsInstance(automaton.cause, StateExplosionError)
+        self.assertIs(automaton.cause.item, tree._items[1]._items[1])
+        self.assertNotIsInstance(optimize(parse('x(y|z)*')).execute(budget=th.Budget(max_states=100)), LazyDFA)
+
+class TestLazyDFA(unittest.TestCase):
+
+    def setUp(self):
+        self.automaton = optimize(parse(EXPLOSIVE)).execute(budget=th.Budget(max_states=20))
+        self.table = optimize(parse(EXPLOSIVE)).execute(budget=th.Budget()).table
+
+    def test_match(self):
+        for text in ['xy', 'xa' + 'b' * 10, 'xbbab' + 'a' * 10, 'x', 'xa' + 'b' * 9, 'xyy', 'xc']:
+            self.assertEqual(self.automaton.match(text), self.table.match(text), text)
+            self.assertEqual(self.automaton.match_buffer(text.encode()), self.table.match(text), text)
+        self.assertLessEqual(self.automaton.size, 20)
+
+    def test_run(self):
+        row = self.automaton.run(self.automaton.start, 'xaa')
+        self.assertFalse(self.automaton.accepts(row))
+        self.assertTrue(self.automaton.accepts(self.automaton.run(list(row), 'b' * 9)))
+        self.assertEqual(self.automaton.run(row, 'c'), -1)
+
+    def test_search(self):
+        text = 'zzxa' + 'b' * 12
+        self.assertEqual(self.automaton.longest(text, 2), self.table.longest(text, 2))
+        seen, table_seen = set(), set()
+        for start in (0, 2, 2, 3):
+            self.assertEqual(self.automaton.longest(text * 3, start, seen=seen),
+                             self.table.longest(text * 3, start, seen=table_seen))
+        self.assertEqual(len(seen), len(table_seen))
+        self.assertEqual(self.automaton.accepted_suffixes(text, 10), self.table.accepted_suffixes(text, 10))
+
+class TestRegExFallback(unittest.TestCase):
+
+    def setUp(self):
+        self.budget = operators.Operator.budget
+        operators.Operator.budget = th.Budget(max_states=100)
+
+    def tearDown(self):
+        operators.Operator.budget = self.budget
+
+    def test_regex(self):
+        regex = RegEx(EXPLOSIVE + 'z?', 'explosive')
+        self.assertIsInstance(regex.automaton, LazyDFA)
+        self.assertTrue(regex.check('xa' + 'b' * 10 + 'z'))
+        self.assertFalse(regex.check('xb' + 'a' * 10))
+        self.assertEqual(regex.search('..xa' + 'b' * 10 + '.'), (2, 14))
+        regex.feed('xa')
+        other = RegEx(EXPLOSIVE + 'z?', 'explosive')
+        other.restore(regex.snapshot())
+        self.assertTrue(other.feed('b' * 10))
+
+    def test_save(self):
+        regex = RegEx(EXPLOSIVE, 'explosive')
+        for save in (regex.dumps, regex.export, Lexer(regex).dumps):
+            with self.assertRaises(ValueError) as context:
+                save()
+            self.assertIn('explosive', str(context.exception))
+            self.assertIsInstance(context.exception.__cause__, StateExplosionError)
@@ -4,6 +4,7 @@ Defines all lexer tests.
 import unittest
 from grammar.lexers import Token, StandardLexer, UndefinedToken, Lexer
 from grammar.regular_expressions import REGEXES
+from tests.fixtures import setUpModule, tearDownModule
 
 class TestLexer(unittest.TestCase):
 
@@ -97,3 +98,9 @@ class TestLexer(unittest.TestCase):
                               Token(REGEXES['INTEGER'], '965'),
                               Token(REGEXES['LT'], '<'),
                               Token(REGEXES['RPARAM'], ')')]))
+
+    def test_candidates(self):
+        lexer = Lexer(REGEXES['WHILE'], REGEXES['VARIABLE'], REGEXES['INTEGER'])
+        self.assertEqual([regex for regex, _ in lexer._starting_with('w')], [REGEXES['WHILE'], REGEXES['VARIABLE']])
+        self.assertEqual(lexer._starting_with('7'), [(REGEXES['INTEGER'], 1)])
+        self.assertEqual(lexer._starting_with('!'), [])
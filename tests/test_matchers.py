@@ -0,0 +1,42 @@
+"""
+Defines specialized matcher tests.
+"""
+import unittest
+import functools
+from grammar.matchers import matcher
+from grammar.optimizer import optimize
+from grammar.regular_expressions import RegEx
+from grammar.syntax import parse
+from tests.fixtures import setUpModule, tearDownModule
+
+class TestMatchers(unittest.TestCase):
+
+    def _matcher(self, text):
+        return matcher(optimize(parse(text)))
+
+    def test_literal(self):
+        check = self._matcher('while')
+        self.assertIsInstance(check, functools.partial)
+        self.assertTrue(check('while'))
+        self.assertFalse(check('whil'))
+
+    def test_strings(self):
+        check = self._matcher('if|in|is|(a|b)?')
+        for text, accepted in [('in', True), ('b', True), ('', True), ('it', False), ('ab', False)]:
+            self.assertEqual(check(text), accepted, text)
+
+    def test_repeated_class(self):
+        plus = self._matcher('[0-9]+')
+        star = self._matcher('(a|b)*')
+        for text, accepted in [('0', True), ('1234', True), ('', False), ('12a', False), (' 1', False)]:
+            self.assertEqual(plus(text), accepted, text)
+        self.assertTrue(star(''))
+        self.assertTrue(star('abba'))
+        self.assertFalse(star('abc'))
+
+    def test_fallback(self):
+        self.assertIsNone(self._matcher('([a-z]|_)([a-z]|_|[0-9])*'))
+        self.assertIsNone(self._matcher('[\u0000-\uffff]+'))
+        regex = RegEx('[0-9]*.[0-9]+', 'float')
+        self.assertEqual(regex.create_checker(), regex.check)
+        self.assertTrue(regex.check('1.5'))
@@ -3,9 +3,21 @@ Defines miscellaneous tests.
 """
 import unittest
 import os
+import socket
+import tempfile
+import threading
+import misc.benchmark as benchmark
+import misc.daemon as daemon
+import misc.grep as grep
+import misc.errors as errors
+import grammar.regular_expressions as rgx
+import form.compositors as compositors
+import form.preformat as preformat
 import misc.helper as helper
 import automata.nfa as nfa
 import form.generators as generator
+import grammar.cache as ch
+from tests.fixtures import setUpModule, tearDownModule
 
 class TestHelper(unittest.TestCase):
 
@@ -33,3 +45,156 @@ s1,1->s0""", generator.StandardFormatGenerator())
         test = helper.load_object('.\\tester.test')
         os.remove('.\\tester.test')
         self.assertEqual(test, original)
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.sock')
+        self.daemon = daemon.Daemon(self.path)
+        self.thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        with daemon.Client(self.path) as client:
+            self.assertEqual(client.request('shutdown'), 'bye')
+        self.thread.join()
+        os.rmdir(self.directory)
+
+    def test_requests(self):
+        with daemon.Client(self.path) as client:
+            self.assertEqual(client.request('ping'), 'pong')
+            self.assertEqual(client.request('RegEx', pattern='[0-9]+', texts=['12', 'a1', '']),
+                             [True, False, False])
+            text = """s0,s1,s2
+a
+s1,s2
+s0
+s0,a->s1
+s1,a->s2
+s2,a->s1"""
+            self.assertEqual(client.request('MinDka', text=text),
+                             compositors.StandardCompositor(preformat.get_dfa_min(text)).composite_automaton())
+            with self.assertRaises(RuntimeError):
+                client.request('unknown')
+            self.assertEqual(client.request('RegEx', pattern='[0-9]+', texts=['7']), [True])
+
+    def test_bad_requests(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.path)
+            for request in ([1], 'x', None, {'command': ['ping']}):
+                daemon.send_frame(sock, request)
+                response = daemon.receive_frame(sock)
+                self.assertFalse(response['ok'])
+                self.assertIn('error', response)
+            sock.sendall(b'\0\0\0\1{')
+            self.assertFalse(daemon.receive_frame(sock)['ok'])
+            daemon.send_frame(sock, {'command': 'ping'})
+            self.assertEqual(daemon.receive_frame(sock), {'ok': True, 'output': 'pong'})
+
+    def test_concurrent_clients(self):
+        with daemon.Client(self.path) as first, daemon.Client(self.path) as second:
+            self.assertEqual(second.request('ping'), 'pong')
+            self.assertEqual(first.request('ping'), 'pong')
+
+    def test_socket_in_use(self):
+        with self.assertRaises(FileExistsError):
+            daemon.Daemon(self.path)
+        with daemon.Client(self.path) as client:
+            self.assertEqual(client.request('ping'), 'pong')
+
+    def test_stale_socket(self):
+        path = os.path.join(self.directory, 'stale.sock')
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+        other = daemon.Daemon(path)
+        other._server.server_close()
+        os.remove(path)
+
+        with open(path, 'w') as file:
+            file.write('not a socket')
+        with self.assertRaises(FileExistsError):
+            daemon.Daemon(path)
+        self.assertTrue(os.path.isfile(path))
+        os.remove(path)
+
+class TestGrep(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = [os.path.join(self.directory, name) for name in ('a.log', 'b.log', 'empty.log')]
+        lines = ['line {}{}'.format(index, ' ERROR 7' if index % 10 == 3 else '') for index in range(200)]
+        with open(self.paths[0], 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+        with open(self.paths[1], 'wb') as file:
+            file.write(b'ok\nERROR 12\xff')
+        open(self.paths[2], 'w').close()
+
+    def tearDown(self):
+        for path in self.paths:
+            os.remove(path)
+        os.rmdir(self.directory)
+
+    def test_split(self):
+        data = b'ab\ncd\nef\n\ngh'
+        chunks = grep.split(data, 3)
+        self.assertEqual(chunks, [(0, 3), (3, 6), (6, 9), (9, 12)])
+        self.assertEqual(b''.join(data[start:end] for start, end in chunks), data)
+
+    def test_grep(self):
+        results = list(grep.grep('ERROR [0-9]+', self.paths, 1, 64))
+        self.assertEqual(len(results), 21)
+        self.assertEqual(results[0], (self.paths[0], 4, 21, 'line 3 ERROR 7'))
+        self.assertEqual(results[-1], (self.paths[1], 2, 3, 'ERROR 12\ufffd'))
+        self.assertEqual(list(grep.grep('ERROR [0-9]+', self.paths, 3, 64)), results)
+
+    def test_modes(self):
+        self.assertEqual(grep.count('ERROR', self.paths, 2, 64),
+                         [(self.paths[0], 20), (self.paths[1], 1), (self.paths[2], 0)])
+        self.assertEqual(grep.files('ok|line 19', self.paths, 2, 64), self.paths[:2])
+        with self.assertRaises(errors.RegexSyntaxError):
+            grep.files('[a-', self.paths)
+
+    def test_repeated_paths(self):
+        paths = [self.paths[1], self.paths[0], self.paths[1]]
+        self.assertEqual(grep.count('ERROR', paths, 2, 64), [(self.paths[1], 1), (self.paths[0], 20)])
+        self.assertEqual(grep.files('ERROR', paths, 2, 64), self.paths[1::-1])
+        self.assertEqual(len(list(grep.grep('ERROR', paths, 2, 64))), 21)
+
+    def test_unreadable_paths(self):
+        missing = os.path.join(self.directory, 'missing.log')
+        paths = [missing, self.paths[1], self.directory]
+        with self.assertRaises(FileNotFoundError):
+            grep.count('ERROR', paths)
+        failed = []
+        report = lambda path, error: failed.append((path, type(error)))
+        self.assertEqual(grep.count('ERROR', paths, 1, 64, report), [(self.paths[1], 1)])
+        self.assertEqual(failed, [(missing, FileNotFoundError), (self.directory, IsADirectoryError)])
+        self.assertEqual(grep.files('ERROR', paths, 1, 64, report), [self.paths[1]])
+        self.assertEqual(len(list(grep.grep('ERROR', paths, 1, 64, report))), 1)
+        self.assertEqual(len(failed), 6)
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_run(self):
+        patterns = benchmark.synthetic(2)
+        results = list(benchmark.run({'WORDS': patterns['WORDS'], 'INTEGER': '[0-9]+'}))
+        self.assertEqual([result[:2] for result in results], [('WORDS', 'whole'), ('WORDS', 'bottom-up'),
+                                                              ('INTEGER', 'whole'), ('INTEGER', 'bottom-up')])
+        self.assertEqual(results[0][4], results[1][4])
+        self.assertIn('INTEGER', benchmark.preloaded())
+
+    def test_search(self):
+        benchmarks = benchmark.searches(5000)
+        self.assertEqual({len(text) for _, text in benchmarks.values()}, {5000})
+        results = {name: matches for name, _, matches in benchmark.search(benchmarks)}
+        self.assertEqual(results['ABSENT'], 0)
+        self.assertEqual(results['UNBOUNDED'], 5000)
+        self.assertGreater(results['INTEGER'], results['ERROR'])
+
+    def test_warm_up(self):
+        patterns = {'INTEGER': '[0-9]+', 'WORD': '[a-z]+'}
+        for jobs in (1, 2):
+            self.assertGreater(benchmark.warm_up(patterns, jobs), 0)
+        self.assertIs(rgx.RegEx.compiled, ch.COMPILED) # restored after every measurement
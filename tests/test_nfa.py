@@ -71,6 +71,26 @@ s0,0->s1""", StandardFormatGenerator()).kleene_operator()
         self.assertTrue(kleene.enter('0'))
         self.assertTrue(kleene.enter('0'))
 
+    def test_feed(self):
+        self.assertFalse(self.test.accepting)
+        self.assertTrue(self.test.feed('0'))
+        self.assertTrue(self.test.feed('1'))
+        self.assertTrue(self.test.feed('01'))
+        self.assertFalse(self.test.feed('1'))
+        self.assertFalse(self.test.finish())
+        self.assertTrue(self.test.feed('010'))
+        self.assertTrue(self.test.finish())
+        self.assertEqual(self.test.records.size, 0)
+
+    def test_snapshot(self):
+        self.test.feed('01')
+        copied = self.test.deepcopy()
+        copied.restore(self.test.snapshot())
+        self.assertEqual(copied.current, self.test.current)
+        self.assertEqual(copied.feed('0'), self.test.feed('0'))
+        with self.assertRaises(ValueError):
+            self.test2.restore(self.test.snapshot())
+
     def test_cast_to_nfa(self):
         cast = epsilon_nfa_to_nfa(self.test)
         self.assertEqual(cast.accepted, self.test.accepted)
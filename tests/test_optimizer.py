@@ -0,0 +1,53 @@
+"""
+Defines operator tree optimizer tests.
+"""
+import unittest
+import grammar.operators as operators
+from grammar.optimizer import optimize
+from grammar.syntax import parse
+
+class TestOptimizer(unittest.TestCase):
+
+    def _same_language(self, text, samples):
+        original = parse(text).execute().table
+        optimized = optimize(parse(text)).execute().table
+        for sample in samples:
+            self.assertEqual(original.match(sample), optimized.match(sample), (text, sample))
+
+    def test_character_class(self):
+        tree = optimize(parse('a|b|[0-2]|c'))
+        self.assertIsInstance(tree, operators.CharacterClass)
+        self.assertEqual(tree.all_characters, ['0', '1', '2', 'a', 'b', 'c'])
+        self.assertIsInstance(optimize(parse('[a-z]')), operators.Collation)
+        self.assertIsInstance(optimize(parse('a|a')), operators.Single)
+
+    def test_prefixes(self):
+        tree = optimize(parse('while|where|when'))
+        self.assertIsInstance(tree, operators.Concatenation)
+        self.assertEqual(tree._items[:2], ['w', 'h'])
+        self.assertIsInstance(tree._items[2], operators.Alternation)
+        tree = optimize(parse('ab|abc'))
+        self.assertIsInstance(tree._items[-1], operators.QuestionMark)
+        self._same_language('while|where|when|w', ['w', 'wh', 'when', 'whe', 'while', 'where'])
+        self._same_language('ab|abc|abd|x(y|z)', ['ab', 'abc', 'abd', 'abcd', 'xy', 'xz', 'x'])
+
+    def test_quantifiers(self):
+        self.assertIsInstance(optimize(parse('(a*)*')), operators.KleeneStar)
+        self.assertIsInstance(optimize(parse('(a+)+')), operators.KleenePlus)
+        self.assertIsInstance(optimize(parse('(a?)?')), operators.QuestionMark)
+        tree = optimize(parse('((a+)?)+'))
+        self.assertIsInstance(tree, operators.KleeneStar)
+        self.assertEqual(tree._item, 'a')
+        self._same_language('((a+)?)+b', ['', 'b', 'ab', 'aab', 'a'])
+
+    def test_repetitions(self):
+        self.assertIsInstance(optimize(parse('a{0,}')), operators.KleeneStar)
+        self.assertIsInstance(optimize(parse('(a+){0,1}')), operators.KleeneStar)
+        self.assertIsInstance(optimize(parse('a{1}')), operators.Single)
+        self.assertIsInstance(optimize(parse('a{2,3}')), operators.Repetition)
+        self._same_language('(a|b){2,3}', ['a', 'ab', 'aba', 'abab'])
+
+    def test_flatten(self):
+        tree = optimize(parse('(a(b(cd)))e'))
+        self.assertEqual(tree._items, ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(tree.min_length, 5)
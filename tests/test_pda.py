@@ -1,4 +1,7 @@
+import os
 import unittest
+from form.preformat import get_dpda
+from form.readers import Reader
 from misc.command_testers import CommandTester
 
 class TestDeterministicPDA(unittest.TestCase):
@@ -9,3 +12,20 @@ class TestDeterministicPDA(unittest.TestCase):
     def test_all(self):
 
         self.executor.execute_test('dpda', True)
+
+class TestSnapshot(unittest.TestCase):
+
+    def test_snapshot(self):
+        text = Reader.read_file(os.path.join(os.path.dirname(__file__), 'pushfiletest.in'))
+        pda = get_dpda(text)
+        pda.reset()
+        pda.enter('a', 'a')
+        snapshot = pda.snapshot()
+
+        restored = get_dpda(text)
+        restored.reset()
+        restored.restore(snapshot)
+        self.assertEqual(restored.current, pda.current)
+        self.assertEqual(restored.stack, pda.stack)
+        self.assertEqual(restored.enter('b'), pda.enter('b'))
+        self.assertEqual(restored.accepted, pda.accepted)
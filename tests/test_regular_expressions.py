@@ -0,0 +1,213 @@
+"""
+Defines regular expression tests.
+"""
+import unittest
+import os
+import tempfile
+import threading
+from grammar.operators import intern
+from grammar.optimizer import optimize
+from grammar.regular_expressions import RegEx, RegexRegistry, REGEXES
+from grammar.syntax import parse
+from tests.fixtures import setUpModule, tearDownModule
+
+class TestRegEx(unittest.TestCase):
+
+    def setUp(self):
+        self.regex = RegEx('([a-z]|_)([a-z]|[0-9]|_)*', 'identifier')
+
+    def test_buffer(self):
+        self.assertTrue(self.regex.match_buffer(b'snake_case_2'))
+        self.assertFalse(self.regex.match_buffer(bytearray(b'2snakes')))
+        self.assertFalse(self.regex.match_buffer(b''))
+
+    def test_feed(self):
+        self.assertFalse(self.regex.accepting)
+        self.assertTrue(self.regex.feed('sn'))
+        self.assertTrue(self.regex.feed('ake_'))
+        self.assertTrue(self.regex.check('a'))
+        self.assertTrue(self.regex.feed('case'))
+        self.assertFalse(self.regex.feed(' '))
+        self.assertFalse(self.regex.feed('word'))
+        self.assertFalse(self.regex.finish())
+        self.assertFalse(self.regex.feed('9'))
+        self.assertFalse(self.regex.finish())
+        self.assertTrue(self.regex.feed('_9'))
+        self.assertTrue(self.regex.finish())
+
+    def test_snapshot(self):
+        self.regex.feed('snake')
+        other = RegEx('([a-z]|_)([a-z]|[0-9]|_)*', 'identifier')
+        other.restore(self.regex.snapshot())
+        self.assertTrue(other.feed('_case'))
+        self.assertFalse(other.feed('!'))
+        with self.assertRaises(ValueError):
+            RegEx('[0-9]+').restore(self.regex.snapshot())
+
+    def test_properties(self):
+        self.assertEqual((self.regex.min_lookahead, self.regex.max_lookahead), (1, None))
+        self.assertFalse(self.regex.nullable)
+        self.assertFalse(self.regex.finite)
+        self.assertFalse(self.regex.admits('2snakes'))
+        self.assertTrue(self.regex.admits('_snake'))
+        self.assertTrue(RegEx('(ab)?').nullable)
+
+class TestSharing(unittest.TestCase):
+
+    def setUp(self):
+        # a cached automaton is loaded instead of compiled, so nothing would be shared.
+        self.original = RegEx.cache, RegEx.compiled
+        RegEx.cache, RegEx.compiled = None, None
+
+    def tearDown(self):
+        RegEx.cache, RegEx.compiled = self.original
+
+    def test_intern(self):
+        first = RegEx('[0-9]+(x|y)', 'first')
+        second = RegEx('z*[0-9]+', 'second')
+        shared = first._groups._items[0]
+        self.assertIs(second._groups._items[1], shared)
+        self.assertIs(intern(optimize(parse('[0-9]+'))), shared)
+        self.assertGreater(shared._uses, 1)
+        self.assertTrue(second.check('zz12'))
+        self.assertTrue(RegEx('(q[0-9]+)?[0-9]+', 'third').check('q12'))
+        self.assertFalse(RegEx('(q[0-9]+)?[0-9]+', 'third').check('q'))
+        self.assertIsNotNone(shared._rows)
+
+class TestIntervals(unittest.TestCase):
+
+    def test_valid_characters(self):
+        regex = RegEx('[a-z]+', 'lowercase')
+        self.assertEqual(regex.valid_characters, set('abcdefghijklmnopqrstuvwxyz'))
+        self.assertEqual(regex.character_intervals, [(ord('a'), ord('z'))])
+        regex = RegEx('[0-9]|x|[a-c]', 'mixed')
+        self.assertEqual(regex.valid_characters, set('0123456789abcx'))
+        self.assertEqual(RegEx('[\u0000-\uffff]', 'wide').character_intervals, [(0, 0xffff)])
+
+    def test_wide_class(self):
+        regex = RegEx('[\u0000-\uffff]+x', 'wide')
+        self.assertLessEqual(len(regex.automaton.inputs), 3)
+        self.assertTrue(regex.check('\u4e2d\u0000x'))
+        self.assertTrue(regex.check('xx'))
+        self.assertFalse(regex.check('\U0001f600x'))
+        self.assertTrue(regex.match_buffer(b'\xff\x00x'))
+        regex.automaton.reset()
+        regex.automaton.enter('\u4e2d')
+        self.assertFalse(regex.automaton.accepted)
+
+    def test_overlapping(self):
+        regex = RegEx('([a-m]|[h-z])[0-9]|q[5-7]', 'overlapping')
+        for text, accepted in [('a0', True), ('k5', True), ('z9', True), ('q6', True), ('q', False), ('A0', False)]:
+            self.assertEqual(regex.check(text), accepted, text)
+
+    def test_equivalence_classes(self):
+        regex = RegEx('([a-z]|[A-Z]|_)([a-z]|[A-Z]|_|[0-9])*', 'identifier')
+        self.assertEqual(len(regex.automaton.inputs), 2)
+        self.assertEqual(regex.automaton.table.width, 2)
+        for text, accepted in [('x', True), ('_Ab9', True), ('Z_z', True), ('9a', False), ('a-b', False)]:
+            self.assertEqual(regex.check(text), accepted, text)
+
+class CountedText(str):
+    """
+    A text that counts how many characters were read one by one.
+    """
+    reads = 0
+
+    def __getitem__(self, index):
+        self.reads += 1
+        return super().__getitem__(index)
+
+class TestSearch(unittest.TestCase):
+
+    def test_finditer(self):
+        regex = RegEx('[0-9]+(.[0-9]+)?', 'number')
+        self.assertEqual(list(regex.finditer('x = 3.14 + 42;')), [(4, 8), (11, 13)])
+        self.assertEqual(regex.findall('1.5.7 and 12'), ['1.5', '7', '12'])
+        self.assertEqual(regex.search('no digits'), None)
+        self.assertEqual(regex.search('a1b'), (1, 2))
+        self.assertTrue(regex.contains('a1b'))
+        self.assertFalse(regex.contains('ab.'))
+
+    def test_leftmost_longest(self):
+        self.assertEqual(RegEx('ab|bcde').findall('abcde'), ['ab'])
+        self.assertEqual(RegEx('b|abcd').findall('abce'), ['b'])
+        self.assertEqual(RegEx('a|ab|abc').findall('abcab'), ['abc', 'ab'])
+
+    def test_literals(self):
+        regex = RegEx('ERROR [0-9]+', 'error')
+        self.assertEqual(regex.findall('ERROR x ERROR 12 ERROR 3.'), ['ERROR 12', 'ERROR 3'])
+        self.assertFalse(regex.contains('ERROR x'))
+        regex = RegEx('[a-z]+ms', 'milliseconds')
+        self.assertEqual(regex.findall('12ms abms ms xms1'), ['abms', 'xms'])
+        self.assertTrue(regex.contains('xms'))
+
+    def test_empty_matches(self):
+        self.assertEqual(list(RegEx('a*').finditer('aab')), [(0, 2), (2, 2), (3, 3)])
+        self.assertEqual(RegEx('a*').findall(''), [''])
+
+    def test_unbounded_extensions(self):
+        # every x matches, but the automaton stays alive until the end waiting for a z.
+        for pattern in ['x|x[a-y]*z', '[a-x]|[a-y][a-y]*z']:
+            regex = RegEx(pattern)
+            for size in (1000, 4000):
+                text = CountedText('x' * size)
+                self.assertEqual(regex.findall(text), ['x'] * size)
+                self.assertLess(text.reads, 40 * size, pattern)
+            self.assertEqual(regex.findall('xxzxx' * 3), ['xxz', 'xxxxz', 'xxxxz', 'x', 'x'])
+            self.assertEqual(regex.findall('x' * 100 + 'z'), ['x' * 100 + 'z'])
+        regex = RegEx('xy|x[a-y]*z')
+        text = CountedText('x' * 4000 + 'y')
+        self.assertEqual(regex.findall(text), ['xy'])
+        self.assertLess(text.reads, 40 * 4000)
+
+    def test_wide_characters(self):
+        self.assertEqual(RegEx('\u4e2d+').findall('\u4e2d\u4e2dx\U0001f600\u4e2d'),
+                         ['\u4e2d\u4e2d', '\u4e2d'])
+
+class TestRegexRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = RegexRegistry(REGEXES._path)
+
+    def test_lazy(self):
+        self.assertEqual(self.registry._regexes, {})
+        self.assertIn('WHILE', self.registry)
+        self.assertEqual(len(self.registry), len(REGEXES))
+        self.assertEqual(self.registry._regexes, {})
+        self.assertTrue(self.registry['WHILE'].check('while'))
+        self.assertEqual(list(self.registry._regexes), ['WHILE'])
+        with self.assertRaises(KeyError):
+            self.registry['NOT_DEFINED']
+
+    def test_warm_up(self):
+        self.registry.warm_up('AS', 'IF')
+        self.assertEqual(set(self.registry._regexes), {'AS', 'IF'})
+
+    def test_parallel(self):
+        self.registry.warm_up('FLOAT', 'AS', 'INTEGER', 'VARIABLE', jobs=2)
+        self.assertEqual(list(self.registry._regexes), ['FLOAT', 'AS', 'INTEGER', 'VARIABLE'])
+        self.assertTrue(self.registry['FLOAT'].check('3.14'))
+        self.assertFalse(self.registry['INTEGER'].check('3.14'))
+        sequential = RegexRegistry(REGEXES._path).warm_up('FLOAT', 'VARIABLE')
+        for name in ['FLOAT', 'VARIABLE']:
+            self.assertEqual(self.registry[name].automaton.fingerprint, sequential[name].automaton.fingerprint)
+
+    def test_parallel_errors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'regexes.xml')
+            with open(path, 'w') as file:
+                file.write('<regexes><regex name="A" expr="a+"/><regex name="B" expr="(b"/></regexes>')
+            registry = RegexRegistry(path)
+            with self.assertRaises(ValueError):
+                registry.warm_up(jobs=2)
+            self.assertTrue(registry['A'].check('aa'))
+
+    def test_threads(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.registry['INTEGER']))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(regex) for regex in results}), 1)
@@ -0,0 +1,80 @@
+"""
+Defines asyncio stream adapter tests.
+"""
+import asyncio
+import unittest
+import grammar.streams as streams
+from grammar.lexers import Lexer, StandardLexer
+from grammar.regular_expressions import RegEx, REGEXES
+from tests.fixtures import setUpModule, tearDownModule
+
+def run(adapter, *args, chunks=(), **kwargs):
+    """
+    Runs an adapter over a StreamReader that contains all chunks.
+    The reader has to be created inside a running event loop.
+
+    :param adapter: stream adapter
+    :param args: adapter arguments preceding the source
+    :param chunks: bytes chunks
+    :param kwargs: adapter keyword arguments
+    :return: adapter result, or a list of all results for async iterators
+    """
+    async def main():
+        stream = asyncio.StreamReader()
+        for chunk in chunks:
+            stream.feed_data(chunk)
+        stream.feed_eof()
+        result = adapter(*args, stream, **kwargs)
+        if hasattr(result, '__aiter__'):
+            return [item async for item in result]
+        return await result
+    return asyncio.run(main())
+
+async def iterate(*chunks):
+    """
+    Async iterator over chunks.
+
+    :param chunks: bytes or str chunks
+    :return: async iterator
+    """
+    for chunk in chunks:
+        await asyncio.sleep(0)
+        yield chunk
+
+async def collect(iterator)->list:
+    """
+    Collects all items of an async iterator.
+
+    :param iterator: async iterator
+    :return list: all items
+    """
+    return [item async for item in iterator]
+
+class TestStreams(unittest.TestCase):
+
+    def setUp(self):
+        self.regex = RegEx('[0-9]+', 'digits')
+
+    def test_accepts(self):
+        self.assertTrue(run(streams.accepts, self.regex, chunks=(b'123', b'456')))
+        self.assertFalse(asyncio.run(streams.accepts(self.regex, iterate('12', 'a'))))
+        self.assertTrue(asyncio.run(streams.accepts(self.regex, iterate(b'9' * 5000), slice_size=7)))
+
+    def test_match_lines(self):
+        lines = run(streams.match_lines, self.regex,
+                    chunks=(b'12\nab', b'c\n', b'3', b'4\n\n99'), chunk_size=3)
+        self.assertEqual(lines, [(0, True), (1, False), (2, True), (3, False), (4, True)])
+
+    def test_decoding(self):
+        regex = RegEx('č+', 'c')
+        encoded = 'čč'.encode()
+        self.assertTrue(asyncio.run(streams.accepts(regex, iterate(encoded[:1], encoded[1:]))))
+
+    def test_scan(self):
+        lexer = StandardLexer()
+        text = 'while var>=56.65:\n\tprint( 965<)'
+        tokens = run(streams.scan, lexer, chunks=(text.encode(),), slice_size=4)
+        self.assertEqual(str(tokens), str(lexer.scan(text)))
+        tokens = asyncio.run(collect(streams.scan(
+            Lexer(REGEXES['VARIABLE']), iterate('ab', 'cd', 'ef'), max_buffer=3)))
+        self.assertEqual([token.token_value for token in tokens], ['abcd', 'ef'])
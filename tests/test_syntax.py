@@ -0,0 +1,57 @@
+"""
+Defines regex parser tests.
+"""
+import unittest
+import grammar.operators as operators
+from grammar.syntax import parse
+from grammar.regular_expressions import RegEx
+from misc.errors import RegexSyntaxError
+from tests.fixtures import setUpModule, tearDownModule
+
+class TestParser(unittest.TestCase):
+
+    def test_tree(self):
+        self.assertIsInstance(parse('a'), operators.Single)
+        self.assertIsInstance(parse('ab|c'), operators.Alternation)
+        self.assertIsInstance(parse('(a|b)c'), operators.Concatenation)
+        self.assertIsInstance(parse('a*'), operators.KleeneStar)
+        self.assertIsInstance(parse('[a-z]'), operators.Collation)
+        self.assertEqual(parse('a|b|c')._items, ['a', 'b', 'c'])
+        self.assertEqual(parse('\\(\\|')._items, ['(', '|'])
+        self.assertEqual(parse('(ab)c').min_length, 3)
+
+    def test_matching(self):
+        regex = RegEx('x(y(z|w)*)+\\.?', 'nested')
+        for text in ['xy', 'xyzw', 'xyyzy', 'xy.']:
+            self.assertTrue(regex.check(text), text)
+        for text in ['x', 'xz', 'xy..', 'y']:
+            self.assertFalse(regex.check(text), text)
+
+    def test_repetition(self):
+        tree = parse('[0-9]{4}-[0-9]{2}')
+        self.assertIsInstance(tree._items[0], operators.Repetition)
+        self.assertEqual((tree._items[0].minimum, tree._items[0].maximum), (4, 4))
+        self.assertEqual(tree.min_length, 7)
+        self.assertEqual((parse('a{2,}').minimum, parse('a{2,}').maximum), (2, None))
+        self.assertEqual(parse('a{,2}')._items, ['a', '{', ',', '2', '}'])
+        regex = RegEx('(ab){1,3}c{2,}', 'bounded')
+        for text in ['abcc', 'ababcc', 'abababccc']:
+            self.assertTrue(regex.check(text), text)
+        for text in ['cc', 'abc', 'ababababcc']:
+            self.assertFalse(regex.check(text), text)
+
+    def test_errors(self):
+        cases = {'': 0, '(a': 0, 'a(b|c': 1, 'a)': 1, '*a': 0, 'a|*': 2, 'a||b': 2,
+                 '()': 1, '[a-]': 3, '[ab]': 2, '[z-a]': 0, 'a]': 1, 'a\\': 1,
+                 '{2}': 0, 'a{3,2}': 1, 'a{1001}': 1}
+        for text, position in cases.items():
+            with self.assertRaises(RegexSyntaxError, msg=text) as context:
+                parse(text)
+            self.assertEqual(context.exception.position, position, text)
+        with self.assertRaises(ValueError):
+            RegEx('(a|b')
+
+    def test_deep_nesting(self):
+        depth = 10000
+        tree = parse('(' * depth + 'a' + ')' * depth + 'b')
+        self.assertEqual(tree.min_length, 2)
@@ -0,0 +1,103 @@
+"""
+Defines Thompson construction tests.
+"""
+import unittest
+from automata.thompson import Builder
+from grammar.operators import Minimization
+from grammar.optimizer import optimize
+from grammar.regular_expressions import RegEx
+from grammar.syntax import parse
+from tests.fixtures import setUpModule, tearDownModule
+
+class TestBuilder(unittest.TestCase):
+
+    def setUp(self):
+        # (ab|c)*d
+        self.builder = Builder()
+        builder = self.builder
+        self.fragment = builder.concatenate(
+            builder.star(builder.alternate(builder.concatenate(builder.symbols('a'), builder.symbols('b')),
+                                           builder.symbols('c'))),
+            builder.symbols('d'))
+
+    def test_dfa(self):
+        automaton = self.builder.to_dfa(self.fragment)
+        self.assertEqual(automaton.inputs, {'a', 'b', 'c', 'd'})
+        for text, accepted in [('d', True), ('abcd', True), ('ccabd', True), ('ad', False), ('abc', False)]:
+            self.assertEqual(automaton.table.match(text), accepted, text)
+
+    def test_classes(self):
+        builder = Builder()
+        fragment = builder.concatenate(builder.ranges((97, 99), (100, 102)), builder.symbols('x', 'y'))
+        automaton = builder.to_dfa(fragment)
+        self.assertEqual(automaton.inputs, {'a', 'x'})
+        self.assertEqual(automaton.partition.symbol('e'), 'a')
+        self.assertEqual(automaton.partition.symbol('y'), 'x')
+        self.assertTrue(automaton.table.match('fy'))
+
+    def test_reverse(self):
+        automaton = self.builder.to_dfa(self.builder.unanchored(self.builder.reverse(self.fragment)))
+        for text, accepted in [('d', True), ('dcba', True), ('xxdbac', True), ('dbc', False), ('da', False)]:
+            self.assertEqual(automaton.table.match(text), accepted, text)
+
+    def test_epsilon_nfa(self):
+        automaton = self.builder.to_epsilon_nfa(self.fragment)
+        self.assertEqual(len(automaton.states), self.builder.size)
+        automaton.enter(*'abcd')
+        self.assertTrue(automaton.accepted)
+        with self.assertRaises(ValueError):
+            self.builder.to_epsilon_nfa(self.fragment, 'a')
+
+    def test_linear(self):
+        text = '|'.join('x{}y'.format(char) for char in 'abcdefghijklmnopqrstuvwxyz')
+        builder = Builder()
+        parse(text)._build(builder)
+        self.assertLess(builder.size, 8 * 26)
+
+    def test_repeat(self):
+        builder = Builder()
+        parse('a{2,1000}')._build(builder)
+        self.assertLess(builder.size, 4 * 1000)
+        automaton = builder.to_dfa(parse('(ab|c){1,3}d')._build(builder))
+        for text, accepted in [('abd', True), ('cabcd', True), ('d', False), ('ccccd', False)]:
+            self.assertEqual(automaton.table.match(text), accepted, text)
+
+    def test_rows(self):
+        rows = self.builder.to_rows(self.fragment)
+        self.assertEqual(rows, ([[(97, 97, 1), (99, 99, 0), (100, 100, 2)], [(98, 98, 0)], []],
+                                [False, False, True]))
+        builder = Builder()
+        automaton = builder.to_dfa(builder.concatenate(builder.symbols('x'), builder.embed(rows)))
+        for text, accepted in [('xd', True), ('xabcd', True), ('d', False), ('xabd', True), ('xbd', False)]:
+            self.assertEqual(automaton.table.match(text), accepted, text)
+
+    def test_include(self):
+        builder = Builder()
+        automaton = builder.to_dfa(builder.concatenate(builder.symbols('x'), builder.include(self.builder, self.fragment)))
+        self.assertTrue(automaton.table.match('xabd'))
+        self.assertFalse(automaton.table.match('abd'))
+
+    def test_epsilon_symbol(self):
+        regex = RegEx('\\$+a')
+        self.assertTrue(regex.check('$$a'))
+        self.assertFalse(regex.check('a'))
+
+class TestMinimization(unittest.TestCase):
+
+    def test_same_dfa(self):
+        strategy = Minimization(min_states=4, min_alternatives=2)
+        for text in ['((ab|cd)*x(ef|g)+){1,5}y', '(while|for|if) *([a-z]|_)+', 'a(b|c)?d*']:
+            whole = optimize(parse(text)).execute()
+            bottom_up = optimize(parse(text)).execute(strategy=strategy)
+            self.assertEqual(len(whole.states), len(bottom_up.states), text)
+            for sample in ['abxefy', 'cdabxggxey', 'for  x_', 'ifwhile', 'abdd', 'ad', 'acbd']:
+                self.assertEqual(whole.table.match(sample), bottom_up.table.match(sample), sample)
+
+    def test_smaller_builds(self):
+        tree = optimize(parse('x(([a-z]|[0-9])+ ){1,20}'))
+        builder = Builder(Minimization())
+        tree._build(builder)
+        plain = Builder()
+        optimize(parse('x(([a-z]|[0-9])+ ){1,20}'))._build(plain)
+        self.assertLess(builder.size, plain.size)
+        self.assertIsNotNone(tree._items[1]._rows)
@@ -4,6 +4,7 @@ Tests all Turing machine implementations.
 import unittest
 import automata.turing as tr
 from misc.command_testers import CommandTester
+from form.generators import StandardTuringMachineFormatGenerator
 
 class TestTuringMachine(unittest.TestCase):
     def setUp(self):
@@ -13,3 +14,29 @@ class TestTuringMachine(unittest.TestCase):
 
         self.executor.execute_test('turing', True)
 
+    def test_snapshot(self):
+        machine = tr.TuringMachine.factory("""q0,q1
+a
+a,B
+B
+aaa
+q1
+q0
+0
+q0,a->q0,a,R
+q0,B->q1,B,R""", StandardTuringMachineFormatGenerator())
+        machine.enter('a', 'a')
+        snapshot = machine.snapshot()
+        restored = tr.TuringMachine.factory("""q0,q1
+a
+a,B
+B
+aaa
+q1
+q0
+0
+q0,a->q0,a,R
+q0,B->q1,B,R""", StandardTuringMachineFormatGenerator())
+        restored.restore(snapshot)
+        self.assertEqual(restored.current, machine.current)
+        self.assertEqual(repr(restored.tape), repr(machine.tape))